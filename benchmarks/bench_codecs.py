@@ -0,0 +1,146 @@
+"""
+Benchmark of the PersistenceManager codecs on agent-shaped payloads.
+
+Measures encode and decode time (best of ``--repeat`` runs) and encoded
+size for every codec usable with the installed packages. Throughput is
+reported against the size of a plain pickle of the payload, so the MB/s
+figures of different codecs are comparable.
+
+Run it as a module from the repository root, or as a script from
+anywhere (the script puts the repository root on ``sys.path``):
+
+    python -m benchmarks.bench_codecs [--scale 1.0] [--repeat 5] [--levels] [--codecs json,pickle+zstd]
+    python benchmarks/bench_codecs.py [options]
+"""
+
+from typing import Any, Callable, Dict, List
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import pickle
+import random
+import sys
+import time
+import uuid
+
+import numpy as np
+
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cmate.storage.codecs import available_codecs, get_codec
+
+_WORDS = ("file function import class module analysis dependency request response token "
+          "context workspace test error cache event handler state navigation component").split()
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+def audit_log(rng: random.Random, scale: float) -> List[Dict[str, Any]]:
+    """Entries as appended by AgentCoordinator.process_request"""
+    start = datetime(2024, 1, 1)
+    return [{
+        "request_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "request": {
+            "type": rng.choice(["analyze", "modify", "navigate", "test"]),
+            "data": {"path": f"src/module_{rng.randrange(300)}.py", "prompt": _text(rng, 20)}
+        },
+        "timestamp": (start + timedelta(seconds=i * 7)).isoformat()
+    } for i in range(int(5000 * scale))]
+
+def analysis_results(rng: random.Random, scale: float) -> Dict[str, Any]:
+    """Per-file analysis summaries (imports, functions, classes, metrics)"""
+    results = {}
+    for i in range(int(500 * scale)):
+        results[f"src/package_{i % 20}/module_{i}.py"] = {
+            "imports": [f"package_{rng.randrange(20)}.module_{rng.randrange(500)}" for _ in range(rng.randrange(3, 15))],
+            "functions": [{
+                "name": f"function_{j}",
+                "lineno": rng.randrange(1, 2000),
+                "args": [f"arg_{k}" for k in range(rng.randrange(0, 5))],
+                "complexity": rng.randrange(1, 25),
+                "docstring": _text(rng, 12)
+            } for j in range(rng.randrange(2, 20))],
+            "classes": [f"Class{j}" for j in range(rng.randrange(0, 5))],
+            "metrics": {"lines": rng.randrange(20, 3000), "maintainability": rng.random() * 100}
+        }
+    return results
+
+def conversation_history(rng: random.Random, scale: float) -> List[Dict[str, Any]]:
+    """Chat turns with long prose and code content"""
+    history = []
+    for i in range(int(200 * scale)):
+        content = _text(rng, rng.randrange(50, 400))
+        if i % 3 == 2:
+            content += "\n```python\n" + "\n".join(
+                f"def function_{j}(value):\n    return value * {j}" for j in range(rng.randrange(5, 40))
+            ) + "\n```"
+        history.append({
+            "role": "assistant" if i % 2 else "user",
+            "content": content,
+            "timestamp": datetime(2024, 1, 1, 12, 0, i % 60).isoformat(),
+            "tokens": rng.randrange(20, 2000)
+        })
+    return history
+
+def embedding_matrix(rng: random.Random, scale: float) -> Dict[str, Any]:
+    """Chunk embeddings as kept by the embedding index"""
+    rows = int(2000 * scale)
+    vectors = np.random.default_rng(rng.randrange(2 ** 32)).standard_normal((rows, 384)).astype(np.float32)
+    return {"paths": [f"src/module_{i}.py" for i in range(rows)], "vectors": vectors}
+
+PAYLOADS: Dict[str, Callable[[random.Random, float], Any]] = {
+    "audit_log": audit_log,
+    "analysis_results": analysis_results,
+    "conversation_history": conversation_history,
+    "embedding_matrix": embedding_matrix
+}
+
+def _best(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(specs: List[str], scale: float, repeat: int) -> None:
+    rng = random.Random(42)
+    for name, factory in PAYLOADS.items():
+        data = factory(rng, scale)
+        reference = len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"\n{name}: {reference / 1e6:.2f} MB as pickle")
+        print(f"  {'codec':<20}{'size MB':>10}{'ratio':>8}{'encode MB/s':>14}{'decode MB/s':>14}")
+        for spec in specs:
+            codec = get_codec(spec)
+            try:
+                payload = codec.encode(data)
+            except Exception as e:
+                print(f"  {spec:<20}  cannot encode: {e}")
+                continue
+            buffer = bytearray(payload)
+            encode = _best(lambda: codec.encode(data), repeat)
+            decode = _best(lambda: codec.decode(buffer), repeat)
+            print(f"  {spec:<20}{len(payload) / 1e6:>10.2f}{len(payload) / reference:>8.2f}"
+                  f"{reference / 1e6 / encode:>14.1f}{reference / 1e6 / decode:>14.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="payload size multiplier")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is reported)")
+    parser.add_argument("--codecs", help="comma-separated codec specs (default: every available codec)")
+    parser.add_argument("--levels", action="store_true", help="also run each compressor at a fast and a strong level")
+    args = parser.parse_args()
+    if args.codecs:
+        specs = [spec.strip() for spec in args.codecs.split(",")]
+    else:
+        specs = available_codecs()
+        if args.levels:
+            levels = {"zlib": (1, 9), "zstd": (1, 19), "lz4": (0, 12)}
+            specs += [f"{spec}:{level}" for spec in list(specs) if "+" in spec
+                      for level in levels[spec.split("+")[1]]]
+    print(f"Codecs: {', '.join(specs)}")
+    run(specs, args.scale, args.repeat)
+
+if __name__ == "__main__":
+    main()
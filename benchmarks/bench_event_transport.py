@@ -0,0 +1,127 @@
+"""
+Benchmark of EventBus fan-out across processes through the event broker.
+
+Starts a broker process, ``--subscribers`` processes that each count the
+events arriving on their EventBus, and ``--publishers`` processes that
+each publish ``--events`` events as fast as the bus accepts them. Reports
+publish throughput and delivered events/sec (every subscriber receives
+every event), plus delivery latency percentiles.
+
+    python -m benchmarks.bench_event_transport [--publishers 2] [--subscribers 2] [--events 20000]
+        [--batch-sizes 1,64,256] [--payload-bytes 200] [--address temp/bench_events.sock]
+"""
+
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+import cmate.utils.logger  # noqa: F401  (adds Logger.success used by the EventBus)
+from cmate.core.event_bus import EventBus
+from cmate.core.event_transport import SocketTransport, run_broker
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def _subscriber(address: str, batch_size: int, expected: int, ready: Any, go: Any, results: Any) -> None:
+    bus = EventBus(max_queue_size=100000, transport=SocketTransport(address, batch_size=batch_size))
+    latencies: List[float] = []
+    done = asyncio.Event()
+
+    def on_events(events: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        latencies.extend(now - event["data"]["sent_at"] for event in events)
+        if len(latencies) >= expected:
+            done.set()
+
+    bus.subscribe("bench.*", on_events, batch=True)
+    await bus.start()
+    await bus.transport.wait_connected(10)
+    ready.put(os.getpid())
+    await asyncio.to_thread(go.wait)
+    try:
+        await asyncio.wait_for(done.wait(), timeout=120)
+    except asyncio.TimeoutError:
+        pass
+    results.put({"role": "subscriber", "received": len(latencies), "finished": time.time(),
+                 "latencies": sorted(latencies)})
+    await bus.stop()
+
+async def _publisher(address: str, batch_size: int, events: int, payload: str, ready: Any, go: Any, results: Any) -> None:
+    bus = EventBus(max_queue_size=100000, backpressure="drop_oldest",
+                   transport=SocketTransport(address, batch_size=batch_size, max_pending_frames=1 << 20))
+    await bus.start()
+    await bus.transport.wait_connected(10)
+    ready.put(os.getpid())
+    await asyncio.to_thread(go.wait)
+    start = time.time()
+    for i in range(events):
+        await bus.publish("bench.event", {"i": i, "sent_at": time.time(), "payload": payload})
+        if i % batch_size == 0:
+            # Give the transport a chance to write while publishing flat out
+            await asyncio.sleep(0)
+    published = time.time()
+    await bus.stop()
+    results.put({"role": "publisher", "started": start, "published": published})
+
+def _run_subscriber(*args: Any) -> None:
+    asyncio.run(_subscriber(*args))
+
+def _run_publisher(*args: Any) -> None:
+    asyncio.run(_publisher(*args))
+
+def run(address: str, publishers: int, subscribers: int, events: int, batch_size: int, payload_bytes: int) -> None:
+    context = multiprocessing.get_context("spawn")
+    broker = context.Process(target=run_broker, args=(address,), daemon=True)
+    broker.start()
+    time.sleep(0.5)
+    ready, results, go = context.Queue(), context.Queue(), context.Event()
+    expected = publishers * events
+    workers = [context.Process(target=_run_subscriber, args=(address, batch_size, expected, ready, go, results))
+               for _ in range(subscribers)]
+    workers += [context.Process(target=_run_publisher,
+                                args=(address, batch_size, events, "x" * payload_bytes, ready, go, results))
+                for _ in range(publishers)]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get(timeout=60)
+    go.set()
+    reports = [results.get(timeout=180) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=10)
+    broker.terminate()
+    broker.join(timeout=5)
+
+    started = min(r["started"] for r in reports if r["role"] == "publisher")
+    published = max(r["published"] for r in reports if r["role"] == "publisher")
+    subscriber_reports = [r for r in reports if r["role"] == "subscriber"]
+    received = sum(r["received"] for r in subscriber_reports)
+    finished = max(r["finished"] for r in subscriber_reports)
+    latencies = sorted(latency for r in subscriber_reports for latency in r["latencies"])
+    print(f"  {batch_size:>6}{expected / (published - started):>14.0f}{received / (finished - started):>16.0f}"
+          f"{received / (subscribers * expected) * 100:>10.1f}%"
+          f"{_percentile(latencies, 0.5) * 1000:>9.1f}{_percentile(latencies, 0.99) * 1000:>9.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--publishers", type=int, default=2)
+    parser.add_argument("--subscribers", type=int, default=2)
+    parser.add_argument("--events", type=int, default=20000, help="events per publisher")
+    parser.add_argument("--batch-sizes", default="1,64,256", help="comma-separated transport batch sizes")
+    parser.add_argument("--payload-bytes", type=int, default=200)
+    parser.add_argument("--address", help="broker address (default: a socket in a temporary directory)")
+    args = parser.parse_args()
+    print(f"{args.publishers} publishers x {args.events} events -> {args.subscribers} subscribers, "
+          f"{args.payload_bytes} byte payloads")
+    print(f"  {'batch':>6}{'publish ev/s':>14}{'delivered ev/s':>16}{'received':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        address = args.address or os.path.join(tmp, "events.sock")
+        for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+            run(address, args.publishers, args.subscribers, args.events, batch_size, args.payload_bytes)
+
+if __name__ == "__main__":
+    main()
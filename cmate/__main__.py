@@ -75,7 +75,26 @@ def setup_system(config_path: Optional[str] = None) -> AgentCoordinator:
         max_files_per_scan=config.get("general", {}).get("max_files_per_scan", 10),
         context_window_size=config.get("llm", {}).get("context_window", 60000),
         auto_test=config.get("agent", {}).get("auto_test", True),
-        debug_mode=config.get("general", {}).get("debug_mode", False)
+        debug_mode=config.get("general", {}).get("debug_mode", False),
+        analysis_cache_memory_mb=config.get("analysis", {}).get("cache", {}).get("memory_mb", 64),
+        analysis_cache_dir=config.get("analysis", {}).get("cache", {}).get("disk_dir"),
+        analysis_max_workers=config.get("analysis", {}).get("workers", {}).get("max_workers", 4),
+        analysis_chunk_size=config.get("analysis", {}).get("workers", {}).get("chunk_size", 32),
+        analysis_min_parallel_files=config.get("analysis", {}).get("workers", {}).get("min_parallel_files", 16),
+        navigation_max_concurrency=config.get("analysis", {}).get("workers", {}).get("dependency_concurrency", 8),
+        cache_max_size=config.get("storage", {}).get("cache", {}).get("max_size", 1000),
+        cache_memory_mb=config.get("storage", {}).get("cache", {}).get("memory_mb", 128),
+        cache_eviction_policy=config.get("storage", {}).get("cache", {}).get("eviction_policy", "lfu"),
+        storage_codecs=config.get("storage", {}).get("codecs"),
+        event_queue_size=config.get("events", {}).get("queue_size", 10000),
+        event_backpressure=config.get("events", {}).get("backpressure", "block"),
+        event_dispatch_batch_size=config.get("events", {}).get("dispatch_batch_size", 64),
+        event_scheduling=config.get("events", {}).get("scheduling", "strict"),
+        event_starvation_ms=config.get("events", {}).get("starvation_ms", 500),
+        event_history_size=config.get("events", {}).get("history_size", 100000),
+        event_history_payloads=config.get("events", {}).get("history_payloads", 1000),
+        event_transport=config.get("events", {}).get("transport", "none"),
+        event_broker_address=config.get("events", {}).get("broker_address", "temp/eventbus.sock")
     )
     state_manager = StateManager()
     workflow_manager = WorkflowManager()
@@ -87,6 +106,14 @@ def setup_system(config_path: Optional[str] = None) -> AgentCoordinator:
     logger.success("System components initialized successfully.")
     return agent
 
+async def _run_with_services(agent: AgentCoordinator, work):
+    """Run a command with the agent's background services (event bus, file watcher, dependency graph) started and shut down around it."""
+    await agent.start()
+    try:
+        return await work()
+    finally:
+        await agent.shutdown()
+
 @app.command()
 def start(
     config: str = typer.Option(None, "--config", "-c", help="Path to configuration file"),
@@ -101,7 +128,7 @@ def start(
             cli.cmdloop()
         else:
             console.print("[green]Agent started in non-interactive mode[/green]")
-            asyncio.run(agent.check_status())
+            asyncio.run(_run_with_services(agent, agent.check_status))
         logger.success("Agent system started successfully.")
     except Exception as e:
         console.print(f"[red]Error starting system: {str(e)}[/red]")
@@ -116,10 +143,10 @@ def process(
     """Process a single request."""
     try:
         agent = setup_system(config)
-        result = asyncio.run(agent.process_request({
+        result = asyncio.run(_run_with_services(agent, lambda: agent.process_request({
             "type": "process",
             "data": {"request": request}
-        }))
+        })))
         if result.get("success"):
             console.print("[green]Request processed successfully[/green]")
             console.print(result)
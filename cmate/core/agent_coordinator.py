@@ -48,6 +48,8 @@ from ..core.workflow_manager import WorkflowManager
 from ..core.prompt_manager import PromptManager
 from ..core.memory_manager import MemoryManager
 from ..core.event_bus import EventBus
+from ..core.event_transport import make_transport
+from ..core.cache_invalidation import CacheInvalidationRegistry
 from ..core.context_manager import ContextManager
 
 # --------------------------------------------------
@@ -105,6 +107,8 @@ from ..core.navigation_system import NavigationDecisionSystem
 from ..core.navigation_executor import NavigationActionExecutor
 # Assumed WorkspaceAnalyzer (for analyzing workspace based on user's request)
 from ..file_services.workspace_analyzer import WorkspaceAnalyzer
+from ..file_services.analysis_cache import analysis_cache
+from ..file_services.file_watcher import FileWatcher
 
 # --------------------------------------------------
 # Data class for agent configuration
@@ -120,12 +124,50 @@ class AgentConfig:
         context_window_size (int): Maximum token count for context windows.
         auto_test (bool): Whether to run automated tests after operations.
         debug_mode (bool): Enable debug-level logging and additional diagnostics.
+        analysis_cache_memory_mb (int): Memory budget of the shared file analysis cache.
+        analysis_cache_dir (Optional[str]): Directory for the on-disk analysis cache tier (None disables it).
+        analysis_max_workers (Optional[int]): Process pool size for batch file analysis (None uses the CPU count).
+        analysis_chunk_size (int): Number of files submitted to a worker at a time.
+        analysis_min_parallel_files (int): Batches smaller than this are analyzed in-process.
+        navigation_max_concurrency (int): Component dependency analyses run concurrently during navigation.
+        cache_max_size (int): Maximum number of items in the general-purpose CacheManager.
+        cache_memory_mb (Optional[int]): Memory budget of the CacheManager (None bounds by item count only).
+        cache_eviction_policy (str): CacheManager eviction policy: "lru", "lfu" or "tinylfu".
+        storage_codecs (Optional[Dict[str, str]]): PersistenceManager codec specs per key or namespace.
+        event_queue_size (int): Capacity of each EventBus priority queue.
+        event_backpressure (str): EventBus behaviour on full queues: "block", "drop_oldest" or "coalesce".
+        event_dispatch_batch_size (int): Events the EventBus scheduler dispatches per batch.
+        event_scheduling (str): EventBus queue scheduling: "strict" or "weighted" priority.
+        event_starvation_ms (int): Queue wait after which a lower-priority EventBus queue is served anyway.
+        event_history_size (int): Events the EventBus history keeps as compact records.
+        event_history_payloads (int): Most recent events the EventBus history keeps in full.
+        event_transport (str): EventBus transport to other worker processes: "none" or "socket".
+        event_broker_address (str): Event broker socket path (or "host:port") for the "socket" transport.
     """
     workspace_path: str = "./Workspace"
     max_files_per_scan: int = 10
     context_window_size: int = 60000
     auto_test: bool = True
     debug_mode: bool = False
+    analysis_cache_memory_mb: int = 64
+    analysis_cache_dir: Optional[str] = None
+    analysis_max_workers: Optional[int] = 4
+    analysis_chunk_size: int = 32
+    analysis_min_parallel_files: int = 16
+    navigation_max_concurrency: int = 8
+    cache_max_size: int = 1000
+    cache_memory_mb: Optional[int] = 128
+    cache_eviction_policy: str = "lfu"
+    storage_codecs: Optional[Dict[str, str]] = None
+    event_queue_size: int = 10000
+    event_backpressure: str = "block"
+    event_dispatch_batch_size: int = 64
+    event_scheduling: str = "strict"
+    event_starvation_ms: int = 500
+    event_history_size: int = 100000
+    event_history_payloads: int = 1000
+    event_transport: str = "none"
+    event_broker_address: str = "temp/eventbus.sock"
     # Additional configuration fields can be added here as needed.
 
 # --------------------------------------------------
@@ -175,12 +217,25 @@ class AgentCoordinator:
         self.prompt_manager = PromptManager()               # Handles prompt formatting and loading.
         self.memory_manager = MemoryManager()               # Manages short-, working-, and long-term memory.
         self.context_manager = ContextManager(max_tokens=config.context_window_size)
-        self.event_bus = EventBus()                         # Global event distribution system.
+        self.event_bus = EventBus(                          # Global event distribution system.
+            max_queue_size=config.event_queue_size,
+            backpressure=config.event_backpressure,
+            dispatch_batch_size=config.event_dispatch_batch_size,
+            scheduling=config.event_scheduling,
+            starvation_seconds=config.event_starvation_ms / 1000,
+            max_history=config.event_history_size,
+            history_payloads=config.event_history_payloads,
+            transport=make_transport(config.event_transport, config.event_broker_address)
+        )
         self.request_handler = RequestHandler(self.state_manager, self.workflow_manager)
         self.response_formatter = ResponseFormatter()
         self.terminal_manager = TerminalManager(workspace_path=config.workspace_path)
-        self.cache_manager = CacheManager()
-        self.persistence_manager = PersistenceManager()
+        self.cache_manager = CacheManager(
+            max_size=config.cache_max_size,
+            eviction_policy=config.cache_eviction_policy,
+            max_memory_bytes=config.cache_memory_mb * 1024 * 1024 if config.cache_memory_mb else None
+        )
+        self.persistence_manager = PersistenceManager(codecs=config.storage_codecs)
         self.checklist_manager = ChecklistManager()
         self.process_manager = ProcessManager(workspace_path=config.workspace_path)
         self.progress_tracker = ProgressTracker()
@@ -205,15 +260,42 @@ class AgentCoordinator:
         # Prompt templates manager for dynamic prompt loading.
         self.prompt_template_manager = PromptTemplateManager()
 
+        # Shared file analysis cache used by every FileAnalyzer instance.
+        analysis_cache.configure(
+            max_memory_bytes=config.analysis_cache_memory_mb * 1024 * 1024,
+            disk_dir=config.analysis_cache_dir
+        )
+
         # NEW: Instantiate WorkspaceAnalyzer for analyzing workspace based on user's request.
-        self.workspace_analyzer = WorkspaceAnalyzer(self.config.workspace_path)
+        self.workspace_analyzer = WorkspaceAnalyzer(
+            self.config.workspace_path,
+            max_workers=self.config.analysis_max_workers,
+            chunk_size=self.config.analysis_chunk_size,
+            min_parallel_files=self.config.analysis_min_parallel_files
+        )
 
         # NEW: Instantiate NavigationDecisionSystem for handling navigation & analysis flow.
-        self.navigation_system = NavigationDecisionSystem(self.config.workspace_path)
+        self.navigation_system = NavigationDecisionSystem(
+            self.config.workspace_path,
+            max_concurrency=self.config.navigation_max_concurrency
+        )
         
         # NEW: Instantiate NavigationActionExecutor for executing navigation actions.
         self.navigation_executor = NavigationActionExecutor(self.config.workspace_path)
 
+        # Workspace change feed, started by start()
+        self.file_watcher = FileWatcher(self.config.workspace_path)
+        self._started = False
+
+        # Targeted invalidation of file-derived caches from the watcher's
+        # "file_changed" batches.
+        self.cache_invalidation = CacheInvalidationRegistry()
+        self.cache_invalidation.attach(self.event_bus)
+        self.cache_manager.attach_invalidation(self.cache_invalidation)
+        self.navigation_system.scanner.register_invalidation(self.cache_invalidation)
+        self.navigation_executor.dependency_analyzer.register_invalidation(self.cache_invalidation)
+        self.file_watcher.publish_to(self.event_bus)
+
         # Subscribe to state change events via the event bus.
         self.event_bus.subscribe("state_changed", self._handle_state_change)
 
@@ -427,6 +509,27 @@ class AgentCoordinator:
         self.logger.info("Status check: %s", status_report)
         return status_report
 
+    async def start(self) -> None:
+        """
+        Start the background services that need a running event loop:
+          - The EventBus scheduler and, when configured, its transport to
+            the other worker processes.
+          - The FileWatcher on the workspace.
+          - The NavigationActionExecutor's dependency graph, brought up to date
+            and then kept current from the watcher's change batches.
+        """
+        if self._started:
+            return
+        self._started = True
+        self.logger.info("Starting agent services...")
+        await self.event_bus.start()
+        try:
+            await self.file_watcher.start_watching()
+        except OSError as e:
+            self.logger.warning("Cannot watch workspace %s: %s", self.config.workspace_path, str(e))
+        await self.navigation_executor.start(self.file_watcher)
+        self.logger.success("Agent services started successfully.")
+
     async def shutdown(self) -> None:
         """
         Gracefully shut down the agent.
@@ -435,12 +538,24 @@ class AgentCoordinator:
           - Logging shutdown.
           - Updating state.
           - Shutting down the WorkflowManager.
-          - Publishing an "agent_shutdown" event.
+          - Stopping the FileWatcher and saving the dependency graph.
+          - Publishing an "agent_shutdown" event and stopping the EventBus.
+          - Shutting down the analysis thread and process pools.
+          - Closing the cache store and flushing persistent storage.
         """
         self.logger.info("Shutting down agent...")
         self.state_manager.update_state(AgentState.CONTEXT_SWITCHING, {"timestamp": datetime.now().isoformat()})
         await self.workflow_manager.shutdown()
+        if self._started:
+            await self.file_watcher.stop_watching()
+            self.navigation_executor.close()
+            self._started = False
         await self.event_bus.publish("agent_shutdown", {"timestamp": datetime.now().isoformat()})
+        await self.event_bus.stop()
+        self.navigation_system.close()
+        self.workspace_analyzer.close()
+        self.cache_manager.close()
+        await asyncio.to_thread(self.persistence_manager.close)
         self.state_manager.update_state(AgentState.SHUTDOWN, {"timestamp": datetime.now().isoformat()})
         self._publish_event({"event": "agent_shutdown", "timestamp": datetime.now().isoformat()})
         self.logger.info("Agent shutdown completed.")
@@ -575,7 +690,9 @@ class AgentCoordinator:
         """
         self.logger.info("Persisting audit log...")
         try:
-            self.persistence_manager.store("audit_log", self.audit_log)
+            # Encoded here, so an entry the codec rejects fails now; the
+            # background writer does the disk I/O
+            self.persistence_manager.store_nowait("audit_log", list(self.audit_log))
             self.logger.info("Audit log persisted successfully.")
             self.logger.success("Audit log persisted successfully.")
         except Exception as e:
@@ -0,0 +1,188 @@
+# cmate/core/cache_invalidation.py
+"""
+cmate/core/cache_invalidation.py
+
+Targeted invalidation of file-derived caches.
+
+Caches register once with an invalidation callback and then declare, per
+entry, which workspace paths or globs the entry was derived from. The
+registry listens for ``file_changed`` batches on the EventBus (published by
+``FileWatcher.publish_to``) and calls each affected cache with only the
+entry keys whose dependencies changed.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import UUID, uuid4
+import asyncio
+import fnmatch
+import logging
+import re
+import threading
+
+from .event_bus import EventBus, EventPriority
+
+logger = logging.getLogger(__name__)
+
+FILE_CHANGED_EVENT = "file_changed"
+
+# Entry key used for dependencies that cover a whole cache rather than one entry
+WHOLE_CACHE = None
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+@dataclass
+class CacheRegistration:
+    """A cache known to the registry and its invalidation callback"""
+    id: UUID
+    name: str
+    callback: Callable
+    entries: Dict[Hashable, Tuple[Set[str], Set[str]]] = field(default_factory=dict)
+    invalidations: int = 0
+
+class CacheInvalidationRegistry:
+    """
+    Maps workspace paths and globs to the cache entries derived from them.
+
+    Exact paths are looked up in a hash index; globs (``fnmatch`` syntax on
+    workspace-relative posix paths, ``*`` also crossing ``/``) are compiled
+    once and tested per changed path. Callbacks receive
+    ``(keys, paths)``: the affected entry keys (``WHOLE_CACHE`` for
+    cache-wide dependencies) and the changed paths that hit them.
+    """
+
+    def __init__(self):
+        self._registrations: Dict[UUID, CacheRegistration] = {}
+        self._paths: Dict[str, Set[Tuple[UUID, Hashable]]] = {}
+        self._globs: Dict[str, Tuple[re.Pattern, Set[Tuple[UUID, Hashable]]]] = {}
+        self._subscription: Optional[UUID] = None
+        self._lock = threading.RLock()
+
+    def register(self,
+                 name: str,
+                 callback: Callable,
+                 paths: Iterable[str] = (),
+                 globs: Iterable[str] = ()) -> UUID:
+        """Register a cache; optional paths/globs apply to the whole cache"""
+        registration = CacheRegistration(id=uuid4(), name=name, callback=callback)
+        with self._lock:
+            self._registrations[registration.id] = registration
+        if paths or globs:
+            self.depend(registration.id, WHOLE_CACHE, paths, globs)
+        logger.debug("Registered cache '%s' for invalidation", name)
+        return registration.id
+
+    def unregister(self, registration_id: UUID) -> bool:
+        with self._lock:
+            registration = self._registrations.get(registration_id)
+            if registration is None:
+                return False
+            for key in list(registration.entries):
+                self.forget(registration_id, key)
+            del self._registrations[registration_id]
+        return True
+
+    def depend(self,
+               registration_id: UUID,
+               key: Hashable,
+               paths: Iterable[str] = (),
+               globs: Iterable[str] = ()) -> None:
+        """Declare the paths and globs a cache entry depends on, replacing earlier declarations"""
+        paths = {Path(p).as_posix() for p in paths}
+        globs = set(globs)
+        for pattern in [p for p in paths if _GLOB_CHARS.search(p)]:
+            paths.discard(pattern)
+            globs.add(pattern)
+        with self._lock:
+            registration = self._registrations[registration_id]
+            self.forget(registration_id, key)
+            registration.entries[key] = (paths, globs)
+            target = (registration_id, key)
+            for path in paths:
+                self._paths.setdefault(path, set()).add(target)
+            for pattern in globs:
+                if pattern not in self._globs:
+                    self._globs[pattern] = (re.compile(fnmatch.translate(pattern)), set())
+                self._globs[pattern][1].add(target)
+
+    def forget(self, registration_id: UUID, key: Hashable) -> None:
+        """Drop the dependencies of a cache entry"""
+        with self._lock:
+            registration = self._registrations.get(registration_id)
+            if registration is None or key not in registration.entries:
+                return
+            paths, globs = registration.entries.pop(key)
+            target = (registration_id, key)
+            for path in paths:
+                targets = self._paths.get(path)
+                if targets is not None:
+                    targets.discard(target)
+                    if not targets:
+                        del self._paths[path]
+            for pattern in globs:
+                entry = self._globs.get(pattern)
+                if entry is not None:
+                    entry[1].discard(target)
+                    if not entry[1]:
+                        del self._globs[pattern]
+
+    def affected(self, paths: Iterable[str]) -> Dict[UUID, Tuple[Set[Hashable], Set[str]]]:
+        """Entry keys and matching changed paths per registration"""
+        hits: Dict[UUID, Tuple[Set[Hashable], Set[str]]] = {}
+        with self._lock:
+            for path in {Path(p).as_posix() for p in paths}:
+                targets = set(self._paths.get(path, ()))
+                for regex, glob_targets in self._globs.values():
+                    if regex.match(path):
+                        targets.update(glob_targets)
+                for registration_id, key in targets:
+                    keys, matched = hits.setdefault(registration_id, (set(), set()))
+                    keys.add(key)
+                    matched.add(path)
+        return hits
+
+    async def invalidate(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Invalidate the entries depending on the given paths; returns entry counts per cache"""
+        counts = {}
+        for registration_id, (keys, matched) in self.affected(paths).items():
+            registration = self._registrations.get(registration_id)
+            if registration is None:
+                continue
+            for key in keys:
+                if key is not WHOLE_CACHE:
+                    self.forget(registration_id, key)
+            try:
+                result = registration.callback(keys, matched)
+                if asyncio.iscoroutine(result):
+                    await result
+                registration.invalidations += len(keys)
+                counts[registration.name] = len(keys)
+            except Exception as e:
+                logger.error("Error invalidating cache '%s': %s", registration.name, str(e))
+        if counts:
+            logger.debug("Invalidated cache entries: %s", counts)
+        return counts
+
+    def attach(self, event_bus: EventBus, priority: EventPriority = EventPriority.HIGH) -> UUID:
+        """Invalidate from ``file_changed`` batches published on an EventBus"""
+        self._subscription = event_bus.subscribe(FILE_CHANGED_EVENT, self._handle_event, priority=priority)
+        return self._subscription
+
+    async def _handle_event(self, event_data: Dict[str, Any]) -> None:
+        batch = event_data.get("data")
+        # A FileChangeBatch locally, its builtin form when relayed by another process
+        paths = batch.get("paths") if isinstance(batch, dict) else getattr(batch, "paths", None)
+        if paths is None:
+            logger.warning("Ignoring malformed %s event %s", FILE_CHANGED_EVENT, event_data.get("id"))
+            return
+        await self.invalidate(paths)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "caches": {r.name: {"entries": len(r.entries), "invalidations": r.invalidations}
+                           for r in self._registrations.values()},
+                "paths": len(self._paths),
+                "globs": len(self._globs)
+            }
@@ -15,16 +15,21 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Any
 from pathlib import Path
 from datetime import datetime
-import ast
+import asyncio
 import re
 import logging
 
 from ..file_services.file_analyzer import FileAnalyzer, CodeAnalysis
+from ..file_services.workspace_scanner import WorkspaceScanner
 from ..utils.error_handler import ErrorHandler
+from .dependency_graph import ProjectDependencyGraph, file_fingerprint
 
 logger = logging.getLogger(__name__)
 logger.info("Initializing ComponentDependencyAnalyzer.")
 
+# File types that take part in the project-wide dependency graph
+GRAPH_FILE_TYPES = ["py", "html", "js", "yaml", "yml", "json"]
+
 @dataclass
 class DependencyInfo:
     """Information about a component's dependencies"""
@@ -36,28 +41,24 @@ class DependencyInfo:
     metadata: Dict[str, Any] = field(default_factory=dict)
     timestamp: datetime = field(default_factory=datetime.now)
 
-@dataclass
-class DependencyGraph:
-    """Represents the project's dependency structure"""
-    nodes: Dict[Path, Set[Path]]  # Direct dependencies
-    reverse_nodes: Dict[Path, Set[Path]]  # Reverse dependencies
-    weights: Dict[Path, int]  # Node weights
-    metadata: Dict[str, Any] = field(default_factory=dict)
-
 class ComponentDependencyAnalyzer:
     """Analyzes component dependencies across the project"""
     
-    def __init__(self, workspace_path: Optional[str] = None):
+    def __init__(self,
+                 workspace_path: Optional[str] = None,
+                 graph_path: Optional[str] = None,
+                 save_delay: float = 1.0):
         self.workspace = Path(workspace_path) if workspace_path else Path("./Workspace")
         self.file_analyzer = FileAnalyzer()
         self.error_handler = ErrorHandler()
+        self.scanner = WorkspaceScanner(str(self.workspace))
         self.dependency_cache: Dict[Path, DependencyInfo] = {}
-        self.graph = DependencyGraph(
-            nodes={},
-            reverse_nodes={},
-            weights={},
-            metadata={"last_update": datetime.now()}
-        )
+        self.graph = ProjectDependencyGraph(self.workspace, Path(graph_path) if graph_path else None)
+        self.graph.load()
+        self.save_delay = save_delay
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._invalidation: Optional[Any] = None
+        self._invalidation_id: Optional[Any] = None
         logger.info("ComponentDependencyAnalyzer initialized with workspace: %s", self.workspace)
         logger.success("ComponentDependencyAnalyzer initialized successfully with workspace: %s", self.workspace)
 
@@ -76,22 +77,22 @@ class ComponentDependencyAnalyzer:
             analysis = await self.file_analyzer.analyze_file(component_path)
             logger.debug("File analysis completed for component: %s, file type: %s", component_path, analysis.file_type)
             
-            # Extract direct dependencies
-            direct_deps = await self._get_direct_dependencies(component_path, analysis)
+            # Extract direct dependencies, reusing the persisted edges when the file is unchanged
+            if self.graph.is_current(component_path):
+                direct_deps = self.graph.direct(component_path)
+            else:
+                direct_deps = await self._refresh_edges(component_path, analysis)
             logger.debug("Direct dependencies for %s: %s", component_path, direct_deps)
             
-            # Build dependency graph for this component
-            self._update_graph(component_path, direct_deps)
-            logger.debug("Dependency graph updated for component: %s", component_path)
-            
             # Get indirect dependencies
             indirect_deps = self._get_indirect_dependencies(component_path)
             # Find reverse dependencies
-            reverse_deps = list(self.graph.reverse_nodes.get(component_path, set()))
+            reverse_deps = self.graph.reverse(component_path)
             # Detect circular dependencies
             circular_deps = self._detect_circular_dependencies(component_path)
             # Calculate dependency weight
             weight = self._calculate_dependency_weight(component_path, direct_deps, indirect_deps, circular_deps)
+            self.graph.weights[self.graph.key(component_path)] = weight
             logger.info("Dependency analysis complete for %s; weight: %d", component_path, weight)
             
             dep_info = DependencyInfo(
@@ -106,41 +107,195 @@ class ComponentDependencyAnalyzer:
                 }
             )
             self.dependency_cache[component_path] = dep_info
+            if self._invalidation is not None:
+                self._invalidation.depend(
+                    self._invalidation_id,
+                    component_path,
+                    paths=[self.graph.key(p) for p in [component_path, *direct_deps, *indirect_deps]]
+                )
             logger.success("Dependency analysis stored successfully for %s", component_path)
             return dep_info
         except Exception as e:
             self.error_handler.handle_error(e, severity=self.error_handler.logger.level, metadata={"component": str(component_path)})
             raise
 
-    async def _get_direct_dependencies(self, component_path: Path, analysis: CodeAnalysis) -> List[Path]:
+    async def build_project_graph(self) -> Dict[str, int]:
+        """
+        Bring the project-wide graph up to date with the workspace.
+
+        Only files whose fingerprint differs from the persisted graph are
+        analyzed and re-resolved; files that disappeared are dropped.
+        """
+        logger.info("Building project dependency graph for %s", self.workspace)
+        scan = await self.scanner.scan_incremental(file_types=GRAPH_FILE_TYPES)
+        current = {self.graph.key(self.workspace / info.path): self.workspace / info.path for info in scan.result.files}
+        removed = [key for key in list(self.graph.fingerprints) if key not in current]
+        for key in removed:
+            await self._remove_component(self.graph.path(key))
+        stale = [path for key, path in current.items() if not self.graph.is_current(path)]
+        batch = await self.file_analyzer.analyze_many(stale)
+        for path, analysis in batch.analyses.items():
+            await self._refresh_edges(path, analysis)
+        for path, error in batch.errors.items():
+            logger.warning("Could not analyze %s for the dependency graph: %s", path, error)
+        self.graph.save()
+        stats = {"files": len(current), "updated": len(batch.analyses), "removed": len(removed)}
+        logger.info("Project dependency graph ready: %s", stats)
+        return stats
+
+    def watch(self, file_watcher: Any) -> None:
+        """Keep the graph up to date from a FileWatcher's change batches"""
+        file_watcher.add_batch_handler(self.handle_file_changes)
+
+    def unwatch(self, file_watcher: Any) -> None:
+        file_watcher.remove_batch_handler(self.handle_file_changes)
+
+    def close(self) -> None:
+        """Write a pending graph save now and shut down the analysis pool"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self.graph.save()
+        self.file_analyzer.close()
+
+    async def handle_file_changes(self, changes: List[Any]) -> None:
+        """Apply a batch of coalesced file changes in order"""
+        for change in changes:
+            await self.handle_file_change(change)
+
+    async def handle_file_change(self, change: Any) -> None:
+        """Re-resolve only the edges affected by a single file change"""
+        try:
+            path = self.workspace / change.path
+            self._update_module_table(change)
+            if change.event_type == "deleted":
+                await self._remove_component(path)
+            elif change.event_type == "moved":
+                source = (change.details or {}).get("source_path")
+                if source:
+                    await self._remove_component(self.workspace / source)
+                await self._add_component(path)
+            elif change.event_type == "created":
+                await self._add_component(path)
+            else:
+                await self._refresh_edges(path)
+            self._schedule_save()
+        except Exception as e:
+            self.error_handler.handle_error(e, metadata={"change": str(change.path)})
+
+    def register_invalidation(self, registry: Any) -> None:
+        """
+        Keep cached DependencyInfo valid until a file it was derived from changes.
+
+        Each entry depends on its component and on everything the component
+        reaches; entries are dropped by the registry instead of expiring.
+        """
+        self._invalidation = registry
+        self._invalidation_id = registry.register("dependency_cache", self._invalidate_entries)
+
+    def _invalidate_entries(self, keys: Set[Any], paths: Set[str]) -> None:
+        for key in keys:
+            self.dependency_cache.pop(key, None)
+
+    def _update_module_table(self, change: Any) -> None:
+        """Keep the scan index and module table in step with a change event"""
+        rel = Path(change.path).as_posix()
+        source = (change.details or {}).get("source_path") if change.event_type == "moved" else None
+        if source:
+            source = Path(source).as_posix()
+        self.scanner.index.invalidate([p for p in (rel, source) if p])
+        if change.event_type == "deleted":
+            self.scanner.modules.update([], [rel])
+        elif change.event_type in ("created", "moved"):
+            self.scanner.modules.update([rel], [source] if source else [])
+
+    async def _add_component(self, path: Path) -> None:
+        """Resolve a new file and any files that were waiting for it"""
+        if path.suffix.lstrip('.').lower() not in GRAPH_FILE_TYPES or not path.is_file():
+            return
+        await self._refresh_edges(path)
+        for waiting in self.graph.waiting_for(self.scanner.modules.module_names(self.graph.key(path))):
+            await self._refresh_edges(waiting)
+
+    async def _remove_component(self, path: Path) -> None:
+        """Drop a file from the graph and re-resolve the files that imported it"""
+        self._invalidate_cached(path)
+        for dependent in self.graph.remove(path):
+            if dependent.exists():
+                await self._refresh_edges(dependent)
+
+    async def _refresh_edges(self, path: Path, analysis: Optional[Any] = None) -> List[Path]:
+        """Re-resolve the outgoing edges of one file and store them in the graph"""
+        fingerprint = file_fingerprint(path)
+        if fingerprint is None:
+            await self._remove_component(path)
+            return []
+        if analysis is None:
+            analysis = await self.file_analyzer.analyze_file(path)
+        unresolved: Set[str] = set()
+        deps = await self._get_direct_dependencies(path, analysis, unresolved)
+        self._invalidate_cached(path)
+        self.graph.set_edges(path, deps, fingerprint, unresolved)
+        return deps
+
+    def _invalidate_cached(self, path: Path) -> None:
+        """Drop cached DependencyInfo for a file and everything that reaches it"""
+        if not self.dependency_cache:
+            return
+        stale = {self.graph.key(path)}
+        stale.update(self.graph.key(p) for p in self.graph.transitive_reverse(path))
+        for cached in list(self.dependency_cache):
+            if self.graph.key(cached) in stale:
+                del self.dependency_cache[cached]
+
+    def _schedule_save(self) -> None:
+        """Coalesce graph writes after a burst of change events"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.graph.save()
+            return
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+        self._save_handle = loop.call_later(self.save_delay, self.graph.save)
+
+    async def _get_direct_dependencies(self,
+                                       component_path: Path,
+                                       analysis: CodeAnalysis,
+                                       unresolved: Optional[Set[str]] = None) -> List[Path]:
         """Get direct dependencies based on file type"""
         deps = set()
         if component_path.suffix == '.py':
-            deps.update(await self._analyze_python_deps(component_path, analysis))
+            deps.update(await self._analyze_python_deps(component_path, analysis, unresolved))
         elif component_path.suffix in {'.html', '.js'}:
             deps.update(await self._analyze_frontend_deps(component_path, analysis))
         elif component_path.suffix in {'.yaml', '.yml', '.json'}:
             deps.update(await self._analyze_config_deps(component_path, analysis))
         return list(deps)
 
-    async def _analyze_python_deps(self, file_path: Path, analysis: CodeAnalysis) -> Set[Path]:
+    async def _analyze_python_deps(self,
+                                   file_path: Path,
+                                   analysis: CodeAnalysis,
+                                   unresolved: Optional[Set[str]] = None) -> Set[Path]:
         """Analyze Python file dependencies"""
         deps = set()
         logger.debug("Analyzing Python dependencies for file: %s", file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                tree = ast.parse(f.read())
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        dep_path = self._resolve_import(name.name)
-                        if dep_path:
-                            deps.add(dep_path)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        dep_path = self._resolve_import(node.module)
-                        if dep_path:
-                            deps.add(dep_path)
+            code_analysis = getattr(analysis, "code_analysis", None)
+            if code_analysis is None:
+                return deps
+            # Dependency targets come from FileAnalyzer's single-pass extraction,
+            # so the file is not read or parsed again here
+            modules = await self.scanner.ensure_module_index()
+            importer = self.graph.key(file_path)
+            for target in code_analysis.dependencies:
+                dep_path = self._resolve_import(target, importer)
+                if dep_path:
+                    deps.add(dep_path)
+                elif unresolved is not None:
+                    name = modules.absolute_name(target, importer)
+                    if name:
+                        unresolved.add(name)
         except Exception as e:
             self.error_handler.handle_error(e, metadata={"file": str(file_path)})
         return deps
@@ -177,19 +332,17 @@ class ComponentDependencyAnalyzer:
             self.error_handler.handle_error(e, metadata={"file": str(file_path)})
         return deps
 
-    def _resolve_import(self, import_name: str) -> Optional[Path]:
-        """Resolve Python import to actual file path"""
-        parts = import_name.split('.')
-        possible_paths = [
-            self.workspace / '/'.join(parts) / '__init__.py',
-            self.workspace / '/'.join(parts) + '.py'
-        ]
-        for path in possible_paths:
-            if path.exists():
-                logger.debug("Resolved import '%s' to path: %s", import_name, path)
-                return path
-        logger.debug("Could not resolve import: %s", import_name)
-        return None
+    def _resolve_import(self, import_name: str, importer: Optional[str] = None) -> Optional[Path]:
+        """Resolve Python import to actual file path via the scan's module table"""
+        if import_name.startswith('.'):
+            rel = self.scanner.modules.resolve_relative(import_name, importer) if importer else None
+        else:
+            rel = self.scanner.modules.resolve_prefix(import_name)
+        if rel is None:
+            logger.debug("Could not resolve import: %s", import_name)
+            return None
+        logger.debug("Resolved import '%s' to path: %s", import_name, rel)
+        return self.workspace / rel
 
     def _resolve_frontend_paths(self, source_file: Path, references: List[str]) -> Set[Path]:
         """Resolve frontend file references to actual paths"""
@@ -216,49 +369,13 @@ class ComponentDependencyAnalyzer:
                 resolved.add(path)
         return resolved
 
-    def _update_graph(self, source: Path, dependencies: List[Path]) -> None:
-        """Update dependency graph with new information"""
-        if source not in self.graph.nodes:
-            self.graph.nodes[source] = set()
-        self.graph.nodes[source].update(dependencies)
-        for dep in dependencies:
-            if dep not in self.graph.reverse_nodes:
-                self.graph.reverse_nodes[dep] = set()
-            self.graph.reverse_nodes[dep].add(source)
-        logger.debug("Updated dependency graph for component: %s", source)
-
     def _get_indirect_dependencies(self, component_path: Path) -> List[Path]:
         """Get all indirect dependencies"""
-        indirect = set()
-        visited = {component_path}
-        def visit(path: Path):
-            for dep in self.graph.nodes.get(path, set()):
-                if dep not in visited:
-                    visited.add(dep)
-                    indirect.add(dep)
-                    visit(dep)
-        visit(component_path)
-        return list(indirect)
+        return self.graph.transitive(component_path)
 
     def _detect_circular_dependencies(self, start_path: Path) -> List[List[Path]]:
-        """Detect circular dependencies starting from a component"""
-        circular_deps = []
-        visited = set()
-        path_stack = []
-        def visit(current_path: Path):
-            if current_path in path_stack:
-                cycle_start = path_stack.index(current_path)
-                circular_deps.append(path_stack[cycle_start:] + [current_path])
-                return
-            if current_path in visited:
-                return
-            visited.add(current_path)
-            path_stack.append(current_path)
-            for dep in self.graph.nodes.get(current_path, set()):
-                visit(dep)
-            path_stack.pop()
-        visit(start_path)
-        return circular_deps
+        """Detect circular dependencies reachable from a component (one chain per cycle)"""
+        return self.graph.cycles(start_path)
 
     def _calculate_dependency_weight(self, component_path: Path, direct_deps: List[Path], indirect_deps: List[Path], circular_deps: List[List[Path]]) -> int:
         """Calculate dependency complexity weight"""
@@ -278,26 +395,25 @@ class ComponentDependencyAnalyzer:
             return False
         cache_entry = self.dependency_cache[component_path]
         file_mtime = datetime.fromtimestamp(component_path.stat().st_mtime)
-        valid = (file_mtime < cache_entry.timestamp and (datetime.now() - cache_entry.timestamp).total_seconds() < 3600)
+        # Registered caches are invalidated on change, so they do not need to expire
+        fresh = self._invalidation is not None or (datetime.now() - cache_entry.timestamp).total_seconds() < 3600
+        valid = file_mtime < cache_entry.timestamp and fresh
         logger.debug("Cache valid for %s: %s", component_path, valid)
         return valid
 
     def get_dependency_stats(self) -> Dict[str, Any]:
         """Get statistics about project dependencies"""
-        stats = {
-            "total_components": len(self.graph.nodes),
-            "total_dependencies": sum(len(deps) for deps in self.graph.nodes.values()),
-            "circular_dependencies": sum(1 for deps in self.graph.nodes.values() if any(node in deps for node in deps)),
-            "max_weight": max(self.graph.weights.values()) if self.graph.weights else 0,
-            "isolated_components": sum(1 for deps in self.graph.nodes.values() if not deps and not self.graph.reverse_nodes.get(deps)),
-            "last_update": self.graph.metadata["last_update"].isoformat()
-        }
+        stats = self.graph.get_stats()
+        stats["max_weight"] = max(self.graph.weights.values()) if self.graph.weights else 0
         logger.info("Dependency stats: %s", stats)
         return stats
 
     def clear_cache(self) -> None:
         """Clear dependency cache"""
         self.dependency_cache.clear()
+        if self._invalidation is not None:
+            self._invalidation.unregister(self._invalidation_id)
+            self._invalidation_id = self._invalidation.register("dependency_cache", self._invalidate_entries)
         self.graph.metadata["last_update"] = datetime.now()
         logger.info("Cleared dependency cache.")
         logger.success("Dependency cache cleared successfully.")
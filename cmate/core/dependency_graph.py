@@ -0,0 +1,289 @@
+# cmate/core/dependency_graph.py
+"""
+cmate/core/dependency_graph.py
+
+Persistent project-wide dependency graph used by the dependency analyzer.
+
+Nodes are workspace-relative posix paths. Each node keeps the stat
+fingerprint of the file its edges were resolved from, so a fresh process can
+load the graph from disk and only re-resolve the files that changed since.
+Updates replace the outgoing edges of a single file and patch the reverse
+index, touching only the edges that actually changed.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from .graph_engine import SCCGraphEngine
+from ..utils.config import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+GRAPH_VERSION = 1
+
+Fingerprint = Tuple[int, int]
+
+def file_fingerprint(path: Path) -> Optional[Fingerprint]:
+    """(size, mtime_ns) of a file, or None if it cannot be stat'd"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+class ProjectDependencyGraph:
+    """
+    Directed dependency graph of a workspace, persisted as a single JSON file.
+
+    ``nodes`` maps a file to the files it depends on and ``reverse_nodes`` maps
+    a file to the files depending on it. Imports that could not be resolved
+    are remembered per file, so a newly created module can find the files that
+    were waiting for it without re-resolving the whole project. Transitive and
+    cycle queries are answered by an ``SCCGraphEngine`` kept in sync with
+    every edge change.
+    """
+
+    def __init__(self, workspace: Path, graph_path: Optional[Path] = None):
+        self.workspace = Path(workspace)
+        self._root = os.path.abspath(self.workspace)
+        self.graph_path = Path(graph_path) if graph_path else self._default_graph_path()
+        self.nodes: Dict[str, Set[str]] = {}
+        self.reverse_nodes: Dict[str, Set[str]] = {}
+        self.fingerprints: Dict[str, Fingerprint] = {}
+        self.unresolved: Dict[str, Set[str]] = {}
+        self.waiting: Dict[str, Set[str]] = {}
+        self.weights: Dict[str, int] = {}
+        self.metadata: Dict[str, Any] = {"last_update": datetime.now()}
+        self.dirty = False
+        self.engine = SCCGraphEngine(self.nodes, self.reverse_nodes)
+        self._lock = threading.RLock()
+
+    def _default_graph_path(self) -> Path:
+        digest = hashlib.sha1(self._root.encode("utf-8")).hexdigest()[:16]
+        return get_cache_dir() / "dependency_graph" / f"{digest}.json"
+
+    def key(self, path: Path) -> str:
+        """Graph key (workspace-relative posix path) for a file path"""
+        path = Path(path)
+        absolute = os.path.abspath(path)
+        if absolute == self._root or absolute.startswith(self._root + os.sep):
+            return Path(os.path.relpath(absolute, self._root)).as_posix()
+        return Path(absolute).as_posix()
+
+    def path(self, key: str) -> Path:
+        """File path for a graph key, rooted at the workspace"""
+        if os.path.isabs(key):
+            return Path(key)
+        return self.workspace / key
+
+    def is_current(self, path: Path, fingerprint: Optional[Fingerprint] = None) -> bool:
+        """Whether the edges stored for a file were resolved from its current content"""
+        key = self.key(path)
+        with self._lock:
+            stored = self.fingerprints.get(key)
+        if stored is None:
+            return False
+        if fingerprint is None:
+            fingerprint = file_fingerprint(self.path(key))
+        return stored == fingerprint
+
+    def set_edges(self,
+                  path: Path,
+                  dependencies: Iterable[Path],
+                  fingerprint: Optional[Fingerprint] = None,
+                  unresolved: Iterable[str] = ()) -> Tuple[Set[str], Set[str]]:
+        """Replace the outgoing edges of a file; returns (added, removed) edge targets"""
+        source = self.key(path)
+        targets = {self.key(dep) for dep in dependencies}
+        targets.discard(source)
+        with self._lock:
+            edges = self.nodes.setdefault(source, set())
+            added = targets - edges
+            removed = edges - targets
+            for target in removed:
+                self._unlink(source, target)
+            for target in added:
+                edges.add(target)
+                self.reverse_nodes.setdefault(target, set()).add(source)
+                self.engine.edge_added(source, target)
+            self.fingerprints[source] = fingerprint or file_fingerprint(self.path(source)) or (0, 0)
+            self._set_unresolved(source, set(unresolved))
+            if added or removed:
+                self.metadata["last_update"] = datetime.now()
+            self.dirty = True
+        return added, removed
+
+    def remove(self, path: Path) -> Set[Path]:
+        """Drop a file and every edge touching it; returns the files that depended on it"""
+        key = self.key(path)
+        with self._lock:
+            for target in list(self.nodes.get(key, ())):
+                self._unlink(key, target)
+            dependents = set(self.reverse_nodes.get(key, ()))
+            for source in dependents:
+                self._unlink(source, key)
+            self.nodes.pop(key, None)
+            self.engine.node_removed(key)
+            self.fingerprints.pop(key, None)
+            self.weights.pop(key, None)
+            self._set_unresolved(key, set())
+            self.metadata["last_update"] = datetime.now()
+            self.dirty = True
+        return {self.path(source) for source in dependents}
+
+    def waiting_for(self, names: Iterable[str]) -> Set[Path]:
+        """Files with an unresolved reference to any of the given module names or their members"""
+        names = list(names)
+        prefixes = tuple(f"{name}." for name in names)
+        with self._lock:
+            sources: Set[str] = set()
+            for name in names:
+                sources.update(self.waiting.get(name, ()))
+            if prefixes:
+                for waited, waiting_sources in self.waiting.items():
+                    if waited.startswith(prefixes):
+                        sources.update(waiting_sources)
+        return {self.path(source) for source in sources}
+
+    def direct(self, path: Path) -> List[Path]:
+        """Files the given file depends on directly"""
+        with self._lock:
+            return [self.path(k) for k in self.nodes.get(self.key(path), ())]
+
+    def reverse(self, path: Path) -> List[Path]:
+        """Files depending directly on the given file"""
+        with self._lock:
+            return [self.path(k) for k in self.reverse_nodes.get(self.key(path), ())]
+
+    def transitive(self, path: Path) -> List[Path]:
+        """All files reachable from the given file, excluding itself"""
+        with self._lock:
+            return [self.path(k) for k in self.engine.reachable(self.key(path))]
+
+    def cycles(self, path: Path) -> List[List[Path]]:
+        """One dependency cycle per cyclic component reachable from the given file"""
+        with self._lock:
+            return [[self.path(k) for k in cycle] for cycle in self.engine.cycles_from(self.key(path))]
+
+    def transitive_reverse(self, path: Path) -> List[Path]:
+        """All files that reach the given file, excluding itself"""
+        return [self.path(k) for k in self._reachable(self.key(path), self.reverse_nodes)]
+
+    def _reachable(self, start: str, adjacency: Dict[str, Set[str]]) -> List[str]:
+        with self._lock:
+            seen = {start}
+            order = []
+            pending = deque([start])
+            while pending:
+                for neighbour in adjacency.get(pending.popleft(), ()):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        order.append(neighbour)
+                        pending.append(neighbour)
+            return order
+
+    def load(self) -> bool:
+        """Load the graph from disk; returns False when there is nothing usable"""
+        if not self.graph_path.exists():
+            return False
+        try:
+            with open(self.graph_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != GRAPH_VERSION or data.get("workspace") != self._root:
+                return False
+            with self._lock:
+                self.nodes.clear()
+                self.reverse_nodes.clear()
+                self.fingerprints.clear()
+                self.unresolved.clear()
+                self.waiting.clear()
+                for source, entry in data.get("files", {}).items():
+                    targets = set(entry.get("deps", []))
+                    self.nodes[source] = targets
+                    for target in targets:
+                        self.reverse_nodes.setdefault(target, set()).add(source)
+                    self.fingerprints[source] = tuple(entry.get("fingerprint", (0, 0)))
+                    self._set_unresolved(source, set(entry.get("unresolved", [])))
+                self.engine.reset()
+                self.weights = dict(data.get("weights", {}))
+                if data.get("last_update"):
+                    self.metadata["last_update"] = datetime.fromisoformat(data["last_update"])
+                self.dirty = False
+            logger.debug("Loaded dependency graph with %d files from %s", len(self.nodes), self.graph_path)
+            return True
+        except Exception as e:
+            logger.error("Error loading dependency graph %s: %s", self.graph_path, str(e))
+            return False
+
+    def save(self) -> None:
+        """Write the graph to disk atomically if it changed"""
+        with self._lock:
+            if not self.dirty:
+                return
+            data = {
+                "version": GRAPH_VERSION,
+                "workspace": self._root,
+                "last_update": self.metadata["last_update"].isoformat(),
+                "files": {
+                    source: {
+                        "fingerprint": list(self.fingerprints.get(source, (0, 0))),
+                        "deps": sorted(targets),
+                        "unresolved": sorted(self.unresolved.get(source, ()))
+                    }
+                    for source, targets in self.nodes.items()
+                },
+                "weights": dict(self.weights)
+            }
+            self.dirty = False
+        try:
+            self.graph_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.graph_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.graph_path)
+        except Exception as e:
+            self.dirty = True
+            logger.error("Error saving dependency graph %s: %s", self.graph_path, str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size and shape of the graph"""
+        with self._lock:
+            return {
+                "total_components": len(self.nodes),
+                "total_dependencies": sum(len(targets) for targets in self.nodes.values()),
+                "isolated_components": sum(
+                    1 for source, targets in self.nodes.items()
+                    if not targets and not self.reverse_nodes.get(source)
+                ),
+                "unresolved_references": sum(len(names) for names in self.unresolved.values()),
+                "circular_dependencies": len(self.engine.cyclic_components()),
+                "last_update": self.metadata["last_update"].isoformat()
+            }
+
+    def _unlink(self, source: str, target: str) -> None:
+        self.nodes[source].discard(target)
+        sources = self.reverse_nodes.get(target)
+        if sources is not None:
+            sources.discard(source)
+            if not sources:
+                del self.reverse_nodes[target]
+        self.engine.edge_removed(source, target)
+
+    def _set_unresolved(self, source: str, names: Set[str]) -> None:
+        for name in self.unresolved.pop(source, set()) - names:
+            sources = self.waiting.get(name)
+            if sources is not None:
+                sources.discard(source)
+                if not sources:
+                    del self.waiting[name]
+        if names:
+            self.unresolved[source] = names
+            for name in names:
+                self.waiting.setdefault(name, set()).add(source)
@@ -8,15 +8,27 @@ Enhanced event bus with support for:
 - Event prioritization
 - Event correlation
 - Advanced filtering
+- Bounded queues with backpressure and batched dispatch
+- Indexed subscription matching with wildcard event types
+- Ring-buffer event history with incremental analytics
+- Optional cross-process transport for multi-worker deployments
 """
 
-from typing import Dict, List, Optional, Any, Callable, Set
+from typing import Deque, Dict, Hashable, List, Optional, Any, Callable, Set, Tuple
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import asyncio
+import contextvars
+import fnmatch
 import logging
+import re
 from uuid import UUID, uuid4
 from enum import Enum
+import time
+
+from .event_history import EventHistory
+from .event_transport import EventTransport
 
 class EventPriority(Enum):
     """Event priority levels"""
@@ -34,6 +46,24 @@ class EventCategory(Enum):
     SYSTEM = "system"
     USER = "user"
 
+# What publish does when a priority queue is full
+BACKPRESSURE_MODES = ("block", "drop_oldest", "coalesce")
+
+# How the scheduler picks the next queue to serve
+SCHEDULING_MODES = ("strict", "weighted")
+
+_WILDCARD_CHARS = re.compile(r"[*?\[]")
+
+# Set inside a lane's coroutine deliveries, so publishes made by subscribers can be told apart
+_in_delivery: contextvars.ContextVar[bool] = contextvars.ContextVar("event_bus_in_delivery", default=False)
+
+DEFAULT_PRIORITY_WEIGHTS = {
+    EventPriority.CRITICAL: 8,
+    EventPriority.HIGH: 4,
+    EventPriority.NORMAL: 2,
+    EventPriority.LOW: 1
+}
+
 @dataclass
 class EventSubscription:
     """Enhanced event subscription details"""
@@ -46,6 +76,8 @@ class EventSubscription:
     created_at: datetime = field(default_factory=datetime.now)
     is_active: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
+    batch: bool = False      # callback receives a list of events
+    is_async: bool = False   # callback is a coroutine function
 
 @dataclass
 class EventChain:
@@ -57,50 +89,277 @@ class EventChain:
     completed: bool = False
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+class _SubscriptionIndex:
+    """
+    Subscriptions of one event type (or pattern), indexed by filter.
+
+    Each filtered subscription is filed under one of its equality filters,
+    ``by_filter[key][value]``; matching an event is then one hash lookup per
+    distinct filter key, and only those candidates with further filters are
+    checked in full. Filters with unhashable values are checked by scan.
+    """
+
+    def __init__(self):
+        self.unfiltered: List[EventSubscription] = []
+        self.by_filter: Dict[str, Dict[Hashable, List[EventSubscription]]] = {}
+        self.unindexed: List[EventSubscription] = []
+        self.size = 0
+
+    def add(self, subscription: EventSubscription) -> None:
+        self._bucket(subscription, create=True).append(subscription)
+        self.size += 1
+
+    def remove(self, subscription: EventSubscription) -> None:
+        bucket = self._bucket(subscription, create=False)
+        if bucket is not None and subscription in bucket:
+            bucket.remove(subscription)
+            self.size -= 1
+            if not bucket and bucket is not self.unfiltered and bucket is not self.unindexed:
+                key, value = self._index_key(subscription)
+                del self.by_filter[key][value]
+                if not self.by_filter[key]:
+                    del self.by_filter[key]
+
+    def match(self, event_data: Dict[str, Any], matches: Callable) -> List[EventSubscription]:
+        matched = list(self.unfiltered)
+        for key, by_value in self.by_filter.items():
+            if key not in event_data:
+                continue
+            try:
+                candidates = by_value.get(event_data[key], ())
+            except TypeError:
+                continue
+            matched.extend(s for s in candidates if len(s.filters) == 1 or matches(event_data, s.filters))
+        matched.extend(s for s in self.unindexed if matches(event_data, s.filters))
+        return matched
+
+    def _index_key(self, subscription: EventSubscription) -> Optional[Tuple[str, Hashable]]:
+        for key in sorted(subscription.filters):
+            value = subscription.filters[key]
+            try:
+                hash(value)
+            except TypeError:
+                continue
+            return key, value
+        return None
+
+    def _bucket(self, subscription: EventSubscription, create: bool) -> Optional[List[EventSubscription]]:
+        if not subscription.filters:
+            return self.unfiltered
+        index_key = self._index_key(subscription)
+        if index_key is None:
+            return self.unindexed
+        key, value = index_key
+        if create:
+            return self.by_filter.setdefault(key, {}).setdefault(value, [])
+        return self.by_filter.get(key, {}).get(value)
+
+def _as_priority(value: Any) -> EventPriority:
+    """EventPriority from an enum, its value or its name (events decoded from JSON or msgpack)"""
+    if isinstance(value, EventPriority):
+        return value
+    if isinstance(value, int):
+        return EventPriority(value)
+    if isinstance(value, str):
+        return EventPriority[value.rsplit(".", 1)[-1]]
+    return EventPriority.NORMAL
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+class _EventQueue:
+    """
+    Bounded FIFO of pending events for one priority.
+
+    Entries are ``[event, coalesce key, enqueue time]`` lists so a coalesced
+    event can replace a queued one in place, keeping its position;
+    ``_coalesce_index`` maps coalesce keys to their queued entry.
+    ``on_put`` wakes the scheduler.
+    """
+
+    def __init__(self, maxsize: int, on_put: Callable[[], None]):
+        self.maxsize = maxsize
+        self.entries: Deque[list] = deque()
+        self._coalesce_index: Dict[Hashable, list] = {}
+        self._on_put = on_put
+        self._space = asyncio.Event()
+        self._space.set()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def full(self) -> bool:
+        return len(self.entries) >= self.maxsize
+
+    def put_nowait(self, event_data: Dict[str, Any], coalesce_key: Optional[Hashable] = None) -> None:
+        entry = [event_data, coalesce_key, time.monotonic()]
+        self.entries.append(entry)
+        if coalesce_key is not None:
+            self._coalesce_index[coalesce_key] = entry
+        self._on_put()
+        if self.full():
+            self._space.clear()
+
+    def coalesce(self, event_data: Dict[str, Any], coalesce_key: Hashable) -> bool:
+        """Replace a queued event with the same key; False if there is none"""
+        entry = self._coalesce_index.get(coalesce_key)
+        if entry is None:
+            return False
+        entry[0] = event_data
+        return True
+
+    def drop_oldest(self) -> Dict[str, Any]:
+        return self._forget(self.entries.popleft())
+
+    async def wait_for_space(self) -> None:
+        while self.full():
+            await self._space.wait()
+
+    def head_enqueued_at(self) -> Optional[float]:
+        """Enqueue time of the oldest queued event"""
+        return self.entries[0][2] if self.entries else None
+
+    def take(self, max_events: int) -> Tuple[List[Dict[str, Any]], List[float]]:
+        """Up to ``max_events`` events and their enqueue times"""
+        entries = [self.entries.popleft() for _ in range(min(max_events, len(self.entries)))]
+        self._space.set()
+        return [self._forget(entry) for entry in entries], [entry[2] for entry in entries]
+
+    def _forget(self, entry: list) -> Dict[str, Any]:
+        event_data, key, _ = entry
+        if key is not None and self._coalesce_index.get(key) is entry:
+            del self._coalesce_index[key]
+        return event_data
+
 class EventBus:
-    """Enhanced event bus with navigation support"""
+    """
+    Enhanced event bus with navigation support.
+
+    Each priority has a queue bounded by ``max_queue_size``. ``publish``
+    applies a backpressure mode (the bus default or a per-publish override):
+
+    - ``block``: wait for space when the queue is full (only while the bus
+      is started; a bus without workers drops the oldest event instead of
+      blocking forever). A publish made by a coroutine subscriber during
+      its delivery never waits: its lane would not be served again until
+      it returned, so the event is queued over the limit instead
+    - ``drop_oldest``: discard the oldest queued event when full
+    - ``coalesce``: a still-queued event with the same type and
+      ``metadata["coalesce_key"]`` is replaced in place by the new one, so
+      bursts of progress-style events collapse to the latest; events
+      without a ``coalesce_key`` are never merged and otherwise it acts
+      as ``block``
+
+    A single scheduler task serves all queues, taking up to
+    ``dispatch_batch_size`` events at a time. With ``strict`` scheduling the
+    highest non-empty priority always goes first; with ``weighted`` the
+    queues share dispatch slots in proportion to ``priority_weights``
+    (smooth weighted round robin). In both modes a queue whose oldest event
+    has waited ``starvation_seconds`` is served next, so low priorities
+    keep moving under a flood of higher ones. Queue latency (enqueue to
+    dispatch) is sampled per priority and reported by
+    ``analyze_event_patterns``.
+
+    Synchronous subscribers are called inline by the scheduler, subscribers
+    registered with ``batch=True`` get one list per batch, and each
+    coroutine subscriber gets its events in order from a single coroutine
+    per batch, so fan-out does not create a task per subscriber per event.
+    Coroutine deliveries of a batch run in one task per priority lane; the
+    lane is not served again until they finish (preserving order within a
+    priority), while other priorities keep being dispatched, so a slow
+    LOW subscriber cannot hold up CRITICAL events.
+
+    With a ``transport`` (see ``event_transport``) events published here are
+    also forwarded to the buses of other processes, and events published
+    there are queued here like local ones (recorded in the history with
+    their arrival time). The transport is started and stopped with the bus.
+    """
     
-    def __init__(self):
-        self._subscriptions: Dict[str, List[EventSubscription]] = {}
-        self._event_history: List[Dict[str, Any]] = []
+    def __init__(self,
+                 max_queue_size: int = 10000,
+                 backpressure: str = "block",
+                 dispatch_batch_size: int = 64,
+                 scheduling: str = "strict",
+                 priority_weights: Optional[Dict[EventPriority, int]] = None,
+                 starvation_seconds: float = 0.5,
+                 latency_samples: int = 1024,
+                 max_history: int = 100000,
+                 history_payloads: int = 1000,
+                 transport: Optional[EventTransport] = None):
+        if backpressure not in BACKPRESSURE_MODES:
+            raise ValueError(f"Unknown backpressure mode: {backpressure}")
+        if scheduling not in SCHEDULING_MODES:
+            raise ValueError(f"Unknown scheduling mode: {scheduling}")
+        self.max_queue_size = max_queue_size
+        self.backpressure = backpressure
+        self.dispatch_batch_size = dispatch_batch_size
+        self.scheduling = scheduling
+        self.priority_weights = {**DEFAULT_PRIORITY_WEIGHTS, **(priority_weights or {})}
+        self.starvation_seconds = starvation_seconds
+        self.transport = transport
+        self.stats = {"published": 0, "received": 0, "dispatched": 0, "batches": 0, "dropped": 0,
+                      "coalesced": 0, "overflowed": 0, "starvation_rescues": 0}
+        # Subscription indexes by event type or pattern, with wildcard patterns compiled
+        self._subscriptions: Dict[str, _SubscriptionIndex] = {}
+        self._subscription_ids: Dict[UUID, EventSubscription] = {}
+        self._patterns: Dict[str, re.Pattern] = {}
+        self._resolved: Dict[str, List[_SubscriptionIndex]] = {}
+        # Compact records of the last max_history events; full events for the last history_payloads
+        self._event_history = EventHistory(capacity=max_history, payload_capacity=history_payloads)
         self._event_chains: Dict[UUID, EventChain] = {}
         self._active_chains: Set[UUID] = set()
-        self._max_history = 1000
+        self._max_history = max_history
         self.logger = logging.getLogger(__name__)
         self.logger.info("EventBus initialized with max history %d", self._max_history)
         self.logger.success("EventBus initialized successfully with max history %d", self._max_history)
 
-        # Prioritized event queues
-        self._event_queues: Dict[EventPriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in EventPriority
+        # Prioritized event queues, highest priority first
+        self._ready = asyncio.Event()
+        self._event_queues: Dict[EventPriority, _EventQueue] = {
+            priority: _EventQueue(max_queue_size, self._ready.set)
+            for priority in sorted(EventPriority, key=lambda p: p.value, reverse=True)
         }
 
-        # Initialize workers
-        self._workers: Dict[EventPriority, asyncio.Task] = {}
+        # Scheduler state
+        self._scheduler: Optional[asyncio.Task] = None
+        self._lanes: Dict[EventPriority, asyncio.Task] = {}
+        self._credits: Dict[EventPriority, int] = {priority: 0 for priority in EventPriority}
+        self._rescued_last = False
+        self._latencies: Dict[EventPriority, Deque[float]] = {
+            priority: deque(maxlen=latency_samples) for priority in EventPriority
+        }
+        self._latency_totals: Dict[EventPriority, List[float]] = {
+            priority: [0, 0.0, 0.0] for priority in EventPriority   # count, sum, max
+        }
         self._is_running = True
 
     async def start(self) -> None:
-        """Start event processing workers"""
-        self.logger.info("Starting event processing workers.")
-        for priority in EventPriority:
-            self._workers[priority] = asyncio.create_task(
-                self._process_event_queue(priority)
-            )
-        self.logger.success("Event processing workers started successfully.")
+        """Start the event scheduler"""
+        self.logger.info("Starting event scheduler (%s).", self.scheduling)
+        self._is_running = True
+        self._scheduler = asyncio.create_task(self._run_scheduler())
+        if self.transport is not None:
+            await self.transport.start(self._receive_remote)
+        self.logger.success("Event scheduler started successfully.")
 
     async def stop(self) -> None:
         """Stop event processing"""
-        self.logger.info("Stopping event processing workers.")
+        self.logger.info("Stopping event scheduler.")
+        if self.transport is not None and self._scheduler is not None:
+            await self.transport.stop()
         self._is_running = False
         
-        # Cancel all workers with protection for closed loop errors
-        for worker in self._workers.values():
+        # Cancel the scheduler and in-flight deliveries with protection for closed loop errors
+        tasks = [task for task in [self._scheduler, *self._lanes.values()] if task is not None]
+        for task in tasks:
             try:
-                worker.cancel()
+                task.cancel()
             except RuntimeError:
                 pass
-        await asyncio.gather(*self._workers.values(), return_exceptions=True)
-        self.logger.success("Event processing workers stopped successfully.")
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler = None
+        self._lanes.clear()
+        self.logger.success("Event scheduler stopped successfully.")
 
     async def publish(
         self,
@@ -109,11 +368,13 @@ class EventBus:
         priority: EventPriority = EventPriority.NORMAL,
         category: Optional[EventCategory] = None,
         chain_id: Optional[UUID] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        backpressure: Optional[str] = None
     ) -> None:
-        """Publish an event with enhanced metadata"""
+        """Publish an event with enhanced metadata; ``backpressure`` overrides the bus default"""
         try:
             event_id = uuid4()
+            now = datetime.now()
             event_data = {
                 "id": str(event_id),
                 "type": event_type,
@@ -122,86 +383,239 @@ class EventBus:
                 "category": category.value if category else None,
                 "chain_id": str(chain_id) if chain_id else None,
                 "metadata": metadata or {},
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
             self.logger.debug("Publishing event '%s' with data: %s", event_type, event_data)
             # Add to history
-            self._record_event(event_data)
+            self._record_event(event_data, now.timestamp())
             
             # Add to event chain if part of one
             if chain_id:
                 await self._add_to_chain(chain_id, event_data)
             
             # Add to appropriate priority queue
-            await self._event_queues[priority].put(event_data)
+            await self._enqueue(self._event_queues[priority], event_data, backpressure or self.backpressure)
+            if self.transport is not None:
+                self.transport.send(event_data)
+            self.stats["published"] += 1
             self.logger.debug("Event '%s' published successfully.", event_type)
         except Exception as e:
             self.logger.error("Error publishing event '%s': %s", event_type, str(e))
             raise
 
-    async def _process_event_queue(self, priority: EventPriority) -> None:
-        """Process events from a priority queue"""
-        queue = self._event_queues[priority]
-        self.logger.debug("Started processing event queue for priority: %s", priority.name)
-        
+    async def _receive_remote(self, events: List[Dict[str, Any]]) -> None:
+        """Queue events published on the buses of other processes"""
+        now = time.time()
+        for event_data in events:
+            priority = _as_priority(event_data.get("priority"))
+            event_data["priority"] = priority
+            self._record_event(event_data, now)
+            chain_id = event_data.get("chain_id")
+            if chain_id and UUID(chain_id) in self._event_chains:
+                await self._add_to_chain(UUID(chain_id), event_data)
+            await self._enqueue(self._event_queues[priority], event_data, self.backpressure)
+            self.stats["received"] += 1
+
+    async def _enqueue(self, queue: _EventQueue, event_data: Dict[str, Any], mode: str) -> None:
+        """Queue an event, applying the backpressure mode"""
+        coalesce_key = None
+        if mode == "coalesce" and "coalesce_key" in event_data["metadata"]:
+            coalesce_key = (event_data["type"], event_data["metadata"].get("coalesce_key"))
+            if queue.coalesce(event_data, coalesce_key):
+                self.stats["coalesced"] += 1
+                return
+        if queue.full():
+            if mode == "drop_oldest" or self._scheduler is None:
+                dropped = queue.drop_oldest()
+                self.stats["dropped"] += 1
+                self.logger.warning("Event queue full; dropped event %s (%s)", dropped["id"], dropped["type"])
+            elif _in_delivery.get():
+                # Waiting could deadlock on our own lane; overflow instead
+                self.stats["overflowed"] += 1
+                self.logger.warning("Event queue full; queued event %s (%s) from a subscriber over the limit",
+                                    event_data["id"], event_data["type"])
+            else:
+                await queue.wait_for_space()
+        queue.put_nowait(event_data, coalesce_key)
+
+    async def _run_scheduler(self) -> None:
+        """Serve the priority queues in scheduling order until stopped"""
+        self.logger.debug("Started event scheduler")
         while self._is_running:
             try:
-                event_data = await queue.get()
-                self.logger.debug("Processing event: %s", event_data)
-                
-                if event_data["type"] in self._subscriptions:
-                    subscriber_tasks = []
-                    for subscription in self._subscriptions[event_data["type"]]:
-                        if subscription.is_active and self._matches_filters(event_data, subscription.filters):
-                            task = asyncio.create_task(self._notify_subscriber(subscription, event_data))
-                            subscriber_tasks.append(task)
-                    if subscriber_tasks:
-                        await asyncio.gather(*subscriber_tasks, return_exceptions=True)
-                
-                queue.task_done()
-                
+                priority = self._next_priority(time.monotonic())
+                if priority is None:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                events, enqueued = self._event_queues[priority].take(self.dispatch_batch_size)
+                self._record_latency(priority, enqueued)
+                deliveries = self._dispatch(events)
+                if deliveries:
+                    self._lanes[priority] = asyncio.create_task(self._run_lane(priority, deliveries))
+                # Let publishers and running deliveries make progress between batches
+                await asyncio.sleep(0)
             except asyncio.CancelledError:
-                self.logger.debug("Event queue processing cancelled for priority: %s", priority.name)
+                self.logger.debug("Event scheduler cancelled")
                 break
             except Exception as e:
                 self.logger.error("Error processing event queue: %s", str(e))
                 await asyncio.sleep(1)
 
+    def _next_priority(self, now: float) -> Optional[EventPriority]:
+        """Queue to serve next, or None when every servable queue is empty"""
+        ready = [priority for priority, queue in self._event_queues.items()
+                 if queue.entries and priority not in self._lanes]
+        if not ready:
+            return None
+        # Starvation protection: an overdue lower queue gets one batch between
+        # regular picks, so higher priorities are delayed by one batch at most
+        if not self._rescued_last:
+            overdue = [p for p in ready[1:]
+                       if now - self._event_queues[p].head_enqueued_at() >= self.starvation_seconds]
+            if overdue:
+                self._rescued_last = True
+                self.stats["starvation_rescues"] += 1
+                return min(overdue, key=lambda p: self._event_queues[p].head_enqueued_at())
+        self._rescued_last = False
+        if self.scheduling == "strict":
+            return ready[0]
+        # Smooth weighted round robin over the non-empty queues
+        total = 0
+        for priority in ready:
+            self._credits[priority] += self.priority_weights[priority]
+            total += self.priority_weights[priority]
+        priority = max(ready, key=lambda p: self._credits[p])
+        self._credits[priority] -= total
+        return priority
+
+    async def _run_lane(self, priority: EventPriority, deliveries: List[Any]) -> None:
+        """Run a batch's coroutine deliveries; the priority is not served again until they finish"""
+        _in_delivery.set(True)
+        try:
+            if len(deliveries) == 1:
+                await deliveries[0]
+            else:
+                await asyncio.gather(*deliveries, return_exceptions=True)
+        finally:
+            self._lanes.pop(priority, None)
+            self._ready.set()
+
+    def _record_latency(self, priority: EventPriority, enqueued: List[float]) -> None:
+        now = time.monotonic()
+        samples = self._latencies[priority]
+        totals = self._latency_totals[priority]
+        for enqueued_at in enqueued:
+            latency = now - enqueued_at
+            samples.append(latency)
+            totals[0] += 1
+            totals[1] += latency
+            totals[2] = max(totals[2], latency)
+
+    def get_queue_latencies(self) -> Dict[str, Dict[str, float]]:
+        """Per-priority queue latency (enqueue to dispatch) in milliseconds"""
+        latencies = {}
+        for priority, samples in self._latencies.items():
+            count, total, maximum = self._latency_totals[priority]
+            ordered = sorted(samples)
+            latencies[priority.name] = {
+                "count": count,
+                "avg_ms": total / count * 1000 if count else 0.0,
+                "p50_ms": _percentile(ordered, 0.5) * 1000,
+                "p95_ms": _percentile(ordered, 0.95) * 1000,
+                "p99_ms": _percentile(ordered, 0.99) * 1000,
+                "max_ms": maximum * 1000,
+                "queued": len(self._event_queues[priority])
+            }
+        return latencies
+
+    def _dispatch(self, events: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Deliver a batch of events: synchronous subscribers are called now,
+        coroutine and batch deliveries are returned for the caller to await.
+        """
+        pending: Dict[UUID, Tuple[EventSubscription, List[Dict[str, Any]]]] = {}
+        for event_data in events:
+            self.logger.debug("Processing event: %s", event_data)
+            for subscription in self._match(event_data):
+                if subscription.batch or subscription.is_async:
+                    pending.setdefault(subscription.id, (subscription, []))[1].append(event_data)
+                else:
+                    # Fast path: plain callbacks run inline, no task per event
+                    self._notify_inline(subscription, event_data)
+        self.stats["dispatched"] += len(events)
+        self.stats["batches"] += 1
+        return [self._deliver(subscription, batch) for subscription, batch in pending.values()]
+
     def subscribe(
         self,
         event_type: str,
         callback: Callable,
         priority: EventPriority = EventPriority.NORMAL,
         category: Optional[EventCategory] = None,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        batch: bool = False
     ) -> UUID:
-        """Subscribe to events with priority and category"""
+        """
+        Subscribe to events with priority and category.
+
+        ``event_type`` may be a wildcard pattern (``file.*``, ``*``, fnmatch
+        syntax). ``filters`` are equality checks on event fields. With
+        ``batch`` the callback receives a list of events per dispatch batch.
+        """
         subscription = EventSubscription(
             id=uuid4(),
             event_type=event_type,
             callback=callback,
             priority=priority,
             category=category,
-            filters=filters or {}
+            filters=filters or {},
+            batch=batch,
+            is_async=asyncio.iscoroutinefunction(callback)
         )
-        if event_type not in self._subscriptions:
-            self._subscriptions[event_type] = []
-        self._subscriptions[event_type].append(subscription)
+        index = self._subscriptions.get(event_type)
+        if index is None:
+            index = self._subscriptions[event_type] = _SubscriptionIndex()
+            if _WILDCARD_CHARS.search(event_type):
+                self._patterns[event_type] = re.compile(fnmatch.translate(event_type))
+            self._resolved.clear()
+        index.add(subscription)
+        self._subscription_ids[subscription.id] = subscription
         self.logger.info("New subscription added for event type '%s' with id %s", event_type, subscription.id)
         self.logger.success("Subscription %s for event type '%s' registered successfully.", subscription.id, event_type)
         return subscription.id
 
     def unsubscribe(self, subscription_id: UUID) -> bool:
         """Unsubscribe from events"""
-        for subs in self._subscriptions.values():
-            for sub in subs:
-                if sub.id == subscription_id:
-                    sub.is_active = False
-                    self.logger.info("Unsubscribed subscription id %s", subscription_id)
-                    self.logger.success("Subscription %s unsubscribed successfully.", subscription_id)
-                    return True
-        self.logger.warning("Subscription id %s not found for unsubscription", subscription_id)
-        return False
+        subscription = self._subscription_ids.pop(subscription_id, None)
+        if subscription is None:
+            self.logger.warning("Subscription id %s not found for unsubscription", subscription_id)
+            return False
+        subscription.is_active = False
+        index = self._subscriptions[subscription.event_type]
+        index.remove(subscription)
+        if not index.size:
+            del self._subscriptions[subscription.event_type]
+            self._patterns.pop(subscription.event_type, None)
+            self._resolved.clear()
+        self.logger.info("Unsubscribed subscription id %s", subscription_id)
+        self.logger.success("Subscription %s unsubscribed successfully.", subscription_id)
+        return True
+
+    def _match(self, event_data: Dict[str, Any]) -> List[EventSubscription]:
+        """Active subscriptions whose event type and filters match an event"""
+        event_type = event_data["type"]
+        indexes = self._resolved.get(event_type)
+        if indexes is None:
+            # Patterns are tested once per event type, then cached until subscriptions change
+            indexes = [self._subscriptions[pattern] for pattern, regex in self._patterns.items()
+                       if regex.match(event_type)]
+            if event_type in self._subscriptions and event_type not in self._patterns:
+                indexes.insert(0, self._subscriptions[event_type])
+            self._resolved[event_type] = indexes
+        if len(indexes) == 1:
+            return indexes[0].match(event_data, self._matches_filters)
+        return [s for index in indexes for s in index.match(event_data, self._matches_filters)]
 
     async def start_event_chain(
         self,
@@ -236,18 +650,34 @@ class EventBus:
             chain.events.append(event_data)
             self.logger.debug("Added event %s to chain %s", event_data.get("id"), chain_id)
 
+    def _notify_inline(self, subscription: EventSubscription, event_data: Dict[str, Any]) -> None:
+        """Call a synchronous subscriber"""
+        try:
+            subscription.callback(event_data)
+            self.logger.debug("Notified subscriber %s for event %s", subscription.id, event_data.get("id"))
+        except Exception as e:
+            self.logger.error("Error notifying subscriber %s: %s", subscription.id, str(e))
+
+    async def _deliver(self, subscription: EventSubscription, events: List[Dict[str, Any]]) -> None:
+        """Hand a batch subscriber its list, or a coroutine subscriber its events in order"""
+        if subscription.batch:
+            await self._notify_subscriber(subscription, events)
+            return
+        for event_data in events:
+            await self._notify_subscriber(subscription, event_data)
+
     async def _notify_subscriber(
         self,
         subscription: EventSubscription,
-        event_data: Dict[str, Any]
+        event_data: Any
     ) -> None:
-        """Notify a subscriber of an event"""
+        """Notify a subscriber of an event (or of a list of events)"""
         try:
-            if asyncio.iscoroutinefunction(subscription.callback):
+            if subscription.is_async:
                 await subscription.callback(event_data)
             else:
                 subscription.callback(event_data)
-            self.logger.debug("Notified subscriber %s for event %s", subscription.id, event_data.get("id"))
+            self.logger.debug("Notified subscriber %s", subscription.id)
         except Exception as e:
             self.logger.error("Error notifying subscriber %s: %s", subscription.id, str(e))
 
@@ -264,12 +694,10 @@ class EventBus:
         except Exception:
             return False
 
-    def _record_event(self, event_data: Dict[str, Any]) -> None:
+    def _record_event(self, event_data: Dict[str, Any], timestamp: Optional[float] = None) -> None:
         """Record event in history"""
-        self._event_history.append(event_data)
+        self._event_history.append(event_data, timestamp)
         self.logger.debug("Recorded event %s", event_data.get("id"))
-        if len(self._event_history) > self._max_history:
-            self._event_history.pop(0)
 
     def get_event_history(
         self,
@@ -280,23 +708,29 @@ class EventBus:
         end_time: Optional[datetime] = None,
         limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get filtered event history"""
+        """Get filtered event history (full events are kept for the last ``history_payloads`` events)"""
         self.logger.debug("Retrieving event history with filters: event_type=%s, category=%s, chain_id=%s", event_type, category, chain_id)
-        history = self._event_history
-        
-        if event_type:
-            history = [e for e in history if e["type"] == event_type]
-        if category:
-            history = [e for e in history if e["category"] == category.value]
-        if chain_id:
-            history = [e for e in history if e["chain_id"] == str(chain_id)]
-        if start_time:
-            history = [e for e in history if datetime.fromisoformat(e["timestamp"]) >= start_time]
-        if end_time:
-            history = [e for e in history if datetime.fromisoformat(e["timestamp"]) <= end_time]
-        if limit:
-            history = history[-limit:]
-        return history
+        return self._event_history.events(
+            event_type=event_type,
+            category=category.value if category else None,
+            chain_id=str(chain_id) if chain_id else None,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Delivery counters and current queue depths"""
+        return {
+            **self.stats,
+            "queue_depths": {priority.name: len(queue) for priority, queue in self._event_queues.items()},
+            "subscriptions": len(self._subscription_ids),
+            "subscription_patterns": len(self._patterns),
+            "max_queue_size": self.max_queue_size,
+            "backpressure": self.backpressure,
+            "scheduling": self.scheduling,
+            "transport": self.transport.get_stats() if self.transport is not None else None
+        }
 
     def get_active_chains(self) -> List[EventChain]:
         """Get all active event chains"""
@@ -317,48 +751,8 @@ class EventBus:
         """Analyze event patterns"""
         self.logger.debug("Analyzing event patterns for category %s over the last %d minutes", category.value if category else "all", window_minutes)
         window_start = datetime.now() - timedelta(minutes=window_minutes)
-        events = [e for e in self._event_history if datetime.fromisoformat(e["timestamp"]) >= window_start and (not category or e["category"] == category.value)]
-        analysis = {
-            "total_events": len(events),
-            "events_by_type": self._count_by_field(events, "type"),
-            "events_by_priority": self._count_by_field(events, "priority"),
-            "average_chain_length": self._calculate_avg_chain_length(events),
-            "common_sequences": self._find_common_sequences(events)
-        }
+        analysis = self._event_history.summary(since=window_start, category=category.value if category else None)
+        analysis["queue_latency_ms"] = self.get_queue_latencies()
         self.logger.info("Event pattern analysis complete: %s", analysis)
         self.logger.success("Event pattern analysis completed successfully.")
         return analysis
-
-    def _count_by_field(self, events: List[Dict[str, Any]], field: str) -> Dict[str, int]:
-        """Count events by field value"""
-        counts = {}
-        for event in events:
-            value = str(event.get(field, "unknown"))
-            counts[value] = counts.get(value, 0) + 1
-        return counts
-
-    def _calculate_avg_chain_length(self, events: List[Dict[str, Any]]) -> float:
-        """Calculate average event chain length"""
-        chain_lengths = {}
-        for event in events:
-            if event["chain_id"]:
-                chain_lengths[event["chain_id"]] = chain_lengths.get(event["chain_id"], 0) + 1
-        if not chain_lengths:
-            return 0
-        return sum(chain_lengths.values()) / len(chain_lengths)
-
-    def _find_common_sequences(self, events: List[Dict[str, Any]], sequence_length: int = 3) -> List[List[str]]:
-        """Find common event type sequences"""
-        sequences = []
-        current_sequence = []
-        for event in events:
-            current_sequence.append(event["type"])
-            if len(current_sequence) >= sequence_length:
-                sequences.append(current_sequence[-sequence_length:])
-        sequence_counts = {}
-        for seq in sequences:
-            key = tuple(seq)
-            sequence_counts[key] = sequence_counts.get(key, 0) + 1
-        common = [list(seq) for seq, count in sorted(sequence_counts.items(), key=lambda x: x[1], reverse=True)[:5]]
-        self.logger.debug("Common event sequences: %s", common)
-        return common
@@ -0,0 +1,227 @@
+# cmate/core/event_history.py
+"""
+cmate/core/event_history.py
+
+Fixed-capacity event history for the EventBus.
+
+Every recorded event is kept as a compact columnar record (type id,
+priority, category id, timestamp, chain id) in preallocated arrays used as
+a ring buffer, so the history can hold 100k events in a few MB. Counters
+per type, priority and category, chain lengths and n-gram counts of
+consecutive event types are maintained as records enter and leave the
+ring, so whole-history analysis never rescans it. Full event dicts are
+kept only for the most recent ``payload_capacity`` events.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime
+
+_NO_CHAIN = -1
+
+class EventHistory:
+    """Ring buffer of compact event records with incrementally maintained analytics"""
+
+    def __init__(self, capacity: int = 100000, payload_capacity: int = 1000, sequence_length: int = 3):
+        self.capacity = capacity
+        self.payload_capacity = min(payload_capacity, capacity)
+        self.sequence_length = sequence_length
+        self.types = array("I", [0]) * capacity
+        self.priorities = array("B", [0]) * capacity
+        self.categories = array("B", [0]) * capacity
+        self.timestamps = array("d", [0.0]) * capacity
+        self.chains = array("q", [_NO_CHAIN]) * capacity
+        self.payloads: List[Optional[Dict[str, Any]]] = [None] * self.payload_capacity
+        # Absolute sequence numbers of the oldest record and of the next one
+        self.start = 0
+        self.end = 0
+        # Interned values; category id 0 means no category
+        self._type_ids: Dict[str, int] = {}
+        self._type_names: List[str] = []
+        self._category_ids: Dict[Optional[str], int] = {None: 0}
+        self._category_names: List[Optional[str]] = [None]
+        self._priority_values: Dict[int, Any] = {}
+        self._chain_ids: Dict[str, int] = {}
+        self._chain_names: Dict[int, str] = {}
+        self._next_chain = 0
+        # Counters over the records currently in the ring
+        self.type_counts: Counter = Counter()
+        self.priority_counts: Counter = Counter()
+        self.category_counts: Counter = Counter()
+        self.chain_counts: Dict[int, int] = {}
+        self.sequence_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def append(self, event_data: Dict[str, Any], timestamp: Optional[float] = None) -> None:
+        """Record an event (``timestamp`` defaults to the event's own), evicting the oldest record when full"""
+        if len(self) == self.capacity:
+            self._evict_oldest()
+        slot = self.end % self.capacity
+        type_id = self._intern_type(event_data["type"])
+        priority = event_data.get("priority")
+        priority_value = getattr(priority, "value", priority) or 0
+        self._priority_values.setdefault(priority_value, priority)
+        category_id = self._intern_category(event_data.get("category"))
+        chain_id = self._intern_chain(event_data.get("chain_id"))
+        self.types[slot] = type_id
+        self.priorities[slot] = priority_value
+        self.categories[slot] = category_id
+        self.timestamps[slot] = timestamp if timestamp is not None else _timestamp(event_data.get("timestamp"))
+        self.chains[slot] = chain_id
+        self.payloads[self.end % self.payload_capacity] = event_data
+        self.end += 1
+        self.type_counts[type_id] += 1
+        self.priority_counts[priority_value] += 1
+        self.category_counts[category_id] += 1
+        if chain_id != _NO_CHAIN:
+            self.chain_counts[chain_id] = self.chain_counts.get(chain_id, 0) + 1
+        if len(self) >= self.sequence_length:
+            self.sequence_counts[self._sequence(self.end - self.sequence_length)] += 1
+
+    def _evict_oldest(self) -> None:
+        seq = self.start
+        slot = seq % self.capacity
+        _decrement(self.type_counts, self.types[slot])
+        _decrement(self.priority_counts, self.priorities[slot])
+        _decrement(self.category_counts, self.categories[slot])
+        chain_id = self.chains[slot]
+        if chain_id != _NO_CHAIN:
+            self.chain_counts[chain_id] -= 1
+            if not self.chain_counts[chain_id]:
+                del self.chain_counts[chain_id]
+                del self._chain_ids[self._chain_names.pop(chain_id)]
+        # The only counted sequence that starts at the evicted record
+        if len(self) >= self.sequence_length:
+            _decrement(self.sequence_counts, self._sequence(seq))
+        if seq >= self.end - self.payload_capacity:
+            self.payloads[seq % self.payload_capacity] = None
+        self.start += 1
+
+    def _sequence(self, seq: int) -> Tuple[int, ...]:
+        return tuple(self.types[(seq + i) % self.capacity] for i in range(self.sequence_length))
+
+    def _intern_type(self, event_type: str) -> int:
+        type_id = self._type_ids.get(event_type)
+        if type_id is None:
+            type_id = self._type_ids[event_type] = len(self._type_names)
+            self._type_names.append(event_type)
+        return type_id
+
+    def _intern_category(self, category: Optional[str]) -> int:
+        category_id = self._category_ids.get(category)
+        if category_id is None:
+            category_id = self._category_ids[category] = len(self._category_names)
+            self._category_names.append(category)
+        return category_id
+
+    def _intern_chain(self, chain_id: Optional[str]) -> int:
+        if not chain_id:
+            return _NO_CHAIN
+        interned = self._chain_ids.get(chain_id)
+        if interned is None:
+            interned = self._chain_ids[chain_id] = self._next_chain
+            self._chain_names[interned] = chain_id
+            self._next_chain += 1
+        return interned
+
+    def _first_at(self, timestamp: float) -> int:
+        """Sequence number of the first record at or after a timestamp"""
+        return bisect_left(range(self.start, self.end), timestamp,
+                           key=lambda seq: self.timestamps[seq % self.capacity]) + self.start
+
+    def _last_before(self, timestamp: float) -> int:
+        """Sequence number just past the last record at or before a timestamp"""
+        return bisect_right(range(self.start, self.end), timestamp,
+                            key=lambda seq: self.timestamps[seq % self.capacity]) + self.start
+
+    def _window(self,
+                start_time: Optional[datetime] = None,
+                end_time: Optional[datetime] = None) -> Tuple[int, int]:
+        first = self._first_at(start_time.timestamp()) if start_time else self.start
+        last = self._last_before(end_time.timestamp()) if end_time else self.end
+        return first, last
+
+    def events(self,
+               event_type: Optional[str] = None,
+               category: Optional[str] = None,
+               chain_id: Optional[str] = None,
+               start_time: Optional[datetime] = None,
+               end_time: Optional[datetime] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Full events (oldest first) among those whose payload is still retained"""
+        first, last = self._window(start_time, end_time)
+        first = max(first, self.end - self.payload_capacity)
+        type_id = self._type_ids.get(event_type, -1) if event_type else None
+        category_id = self._category_ids.get(category, -1) if category else None
+        chain = self._chain_ids.get(chain_id, -2) if chain_id else None
+        if -1 in (type_id, category_id) or chain == -2:
+            return []
+        matched = []
+        # Newest first so a limit stops the scan early
+        for seq in range(last - 1, first - 1, -1):
+            slot = seq % self.capacity
+            if type_id is not None and self.types[slot] != type_id:
+                continue
+            if category_id is not None and self.categories[slot] != category_id:
+                continue
+            if chain is not None and self.chains[slot] != chain:
+                continue
+            matched.append(self.payloads[seq % self.payload_capacity])
+            if limit and len(matched) >= limit:
+                break
+        matched.reverse()
+        return matched
+
+    def summary(self, since: Optional[datetime] = None, category: Optional[str] = None, top: int = 5) -> Dict[str, Any]:
+        """
+        Totals, counts by type and priority, average chain length and the most
+        common type sequences. Over the whole history (the usual case) this
+        reads the maintained counters; a narrower window or a category is
+        computed from the compact records of that window only.
+        """
+        first = self._first_at(since.timestamp()) if since else self.start
+        if first == self.start and category is None:
+            type_counts, priority_counts = self.type_counts, self.priority_counts
+            chain_lengths = list(self.chain_counts.values())
+            sequences = self.sequence_counts
+        else:
+            category_id = self._category_ids.get(category, -1) if category else None
+            seqs = [seq for seq in range(first, self.end)
+                    if category_id is None or self.categories[seq % self.capacity] == category_id]
+            type_ids = [self.types[seq % self.capacity] for seq in seqs]
+            type_counts = Counter(type_ids)
+            priority_counts = Counter(self.priorities[seq % self.capacity] for seq in seqs)
+            chains = Counter(self.chains[seq % self.capacity] for seq in seqs)
+            chains.pop(_NO_CHAIN, None)
+            chain_lengths = list(chains.values())
+            n = self.sequence_length
+            sequences = Counter(tuple(type_ids[i:i + n]) for i in range(len(type_ids) - n + 1))
+        return {
+            "total_events": sum(type_counts.values()),
+            "events_by_type": {self._type_names[t]: count for t, count in type_counts.items()},
+            "events_by_priority": {str(self._priority_values[p]): count for p, count in priority_counts.items()},
+            "average_chain_length": sum(chain_lengths) / len(chain_lengths) if chain_lengths else 0,
+            "common_sequences": [[self._type_names[t] for t in sequence]
+                                 for sequence, _ in sequences.most_common(top)]
+        }
+
+    def memory_bytes(self) -> int:
+        """Size of the columnar arrays"""
+        return sum(column.itemsize * len(column)
+                   for column in (self.types, self.priorities, self.categories, self.timestamps, self.chains))
+
+def _decrement(counter: Counter, key: Any) -> None:
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.now().timestamp()
@@ -0,0 +1,487 @@
+# cmate/core/event_transport.py
+"""
+cmate/core/event_transport.py
+
+Cross-process transport for the EventBus.
+
+With several worker processes (see ``config/gunicorn.py``) each process
+has its own EventBus. A ``SocketTransport`` attached to a bus forwards the
+events published there to an ``EventBroker``, which fans them out to the
+buses of every other connected process.
+
+- Address: a filesystem path is a Unix domain socket; ``host:port`` is a
+  TCP socket (for platforms without Unix sockets).
+- Batching: published events are buffered and sent as one frame when
+  ``batch_size`` events are pending or ``flush_seconds`` after the first
+  one, whichever comes first. The broker forwards frames without decoding
+  them.
+- At-least-once: every frame is numbered and kept until it is
+  acknowledged. The broker acknowledges a published frame once it is in
+  the outbox of every peer, and a receiving process acknowledges a
+  delivered frame once its events are queued on its bus. After a
+  reconnect both sides resend what was not acknowledged, and the numbers
+  let the receiver skip frames it has already taken. Only a broker restart
+  (a new broker ``epoch``) can turn a resend into a duplicate delivery.
+
+A peer that disconnects without saying goodbye keeps its outbox (bounded
+by ``max_pending_frames``) for ``peer_timeout`` seconds, so a reconnecting
+worker gets the events it missed.
+"""
+
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from itertools import islice
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import struct
+import time
+from uuid import uuid4
+
+from ..storage.codecs import get_codec
+
+# Frame header: body length, kind, sequence number
+_FRAME = struct.Struct("<IBQ")
+_HELLO = 0
+_PUBLISH = 1
+_DELIVER = 2
+_ACK = 3
+_BYE = 4
+
+TRANSPORTS = ("none", "socket")
+
+logger = logging.getLogger(__name__)
+
+def _frame(kind: int, seq: int, body: bytes = b"") -> bytes:
+    return _FRAME.pack(len(body), kind, seq) + body
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    size, kind, seq = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    return kind, seq, await reader.readexactly(size) if size else b""
+
+def _tcp_address(address: str) -> Optional[Tuple[str, int]]:
+    """``(host, port)`` for a ``host:port`` address, None for a socket path"""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit() and os.sep not in address and "/" not in address:
+        return host, int(port)
+    return None
+
+async def _open_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    tcp = _tcp_address(address)
+    if tcp is not None:
+        reader, writer = await asyncio.open_connection(*tcp)
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return reader, writer
+    return await asyncio.open_unix_connection(address)
+
+class _Outbox:
+    """
+    Numbered frames awaiting acknowledgement, written in order by ``pump``.
+
+    Sequence numbers are contiguous, so the first unsent frame is found by
+    offset. Beyond ``max_frames`` the oldest frame is dropped.
+    """
+
+    def __init__(self, kind: int, max_frames: int):
+        self.kind = kind
+        self.max_frames = max_frames
+        self.frames: Deque[Tuple[int, bytes]] = deque()
+        self.next_seq = 1
+        self.sent_through = 0
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def push(self, body: bytes) -> int:
+        seq = self.next_seq
+        self.next_seq += 1
+        self.frames.append((seq, body))
+        if len(self.frames) > self.max_frames:
+            self.frames.popleft()
+            self.dropped += 1
+        self.wakeup.set()
+        return seq
+
+    def ack(self, seq: int) -> None:
+        """Acknowledgements are cumulative"""
+        while self.frames and self.frames[0][0] <= seq:
+            self.frames.popleft()
+
+    def rewind(self) -> None:
+        """Send every unacknowledged frame again (after a reconnect)"""
+        self.sent_through = self.frames[0][0] - 1 if self.frames else self.next_seq - 1
+        self.wakeup.set()
+
+    async def pump(self, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                if not self.frames:
+                    continue
+                start = max(0, self.sent_through + 1 - self.frames[0][0])
+                for seq, body in list(islice(self.frames, start, None)):
+                    writer.write(_frame(self.kind, seq, body))
+                    self.sent_through = seq
+                await writer.drain()
+        except (ConnectionError, OSError):
+            # The connection's reader sees the close and ends the session
+            writer.close()
+
+class EventTransport:
+    """Carries events published on one EventBus to the buses of other processes"""
+
+    name = "none"
+
+    async def start(self, deliver: Callable[[List[Dict[str, Any]]], Awaitable[None]]) -> None:
+        """Begin forwarding; ``deliver`` queues events received from other processes"""
+        raise NotImplementedError
+
+    def send(self, event_data: Dict[str, Any]) -> None:
+        """Forward a locally published event (buffered, never blocks)"""
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"transport": self.name}
+
+class SocketTransport(EventTransport):
+    """
+    Client side of the EventBroker protocol.
+
+    Events are encoded with a storage codec, ``json`` by default: datetimes,
+    tuples and other values with a builtin form arrive as their JSON
+    equivalents, and events whose data has none are logged and not
+    forwarded. ``pickle`` keeps Python values intact, but decoding it runs
+    code chosen by the sender, so it is refused on TCP addresses.
+    """
+
+    name = "socket"
+
+    def __init__(self,
+                 address: str,
+                 client_id: Optional[str] = None,
+                 batch_size: int = 256,
+                 flush_seconds: float = 0.005,
+                 max_pending_frames: int = 1024,
+                 reconnect_seconds: float = 0.5,
+                 codec: str = "json"):
+        self.codec = get_codec(codec)
+        if self.codec.serializer.name == "pickle" and _tcp_address(address) is not None:
+            raise ValueError(f"The pickle codec is not allowed on a TCP event transport ({address}); "
+                             "use json or msgpack")
+        self.address = address
+        self.client_id = client_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending_frames = max_pending_frames
+        self.reconnect_seconds = reconnect_seconds
+        self.stats = {"sent": 0, "received": 0, "frames_sent": 0, "frames_received": 0,
+                      "duplicates": 0, "unencodable": 0, "reconnects": 0}
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._outbox: Optional[_Outbox] = None
+        self._deliver: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+        self._epoch: Optional[str] = None
+        self._delivered_through = 0
+        self._connected = asyncio.Event()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    async def start(self, deliver: Callable[[List[Dict[str, Any]]], Awaitable[None]]) -> None:
+        self._deliver = deliver
+        if self._outbox is None:
+            self._outbox = _Outbox(_PUBLISH, self.max_pending_frames)
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def send(self, event_data: Dict[str, Any]) -> None:
+        self._pending.append(event_data)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_seconds, self.flush)
+
+    def flush(self) -> None:
+        """Turn the buffered events into frames"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._outbox is None:
+            self._outbox = _Outbox(_PUBLISH, self.max_pending_frames)
+        while self._pending:
+            events = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            body = self._encode(events)
+            if body is not None:
+                self._outbox.push(body)
+                self.stats["sent"] += len(events)
+                self.stats["frames_sent"] += 1
+
+    async def stop(self, drain_seconds: float = 2.0) -> None:
+        """Flush, wait up to ``drain_seconds`` for acknowledgements, then disconnect"""
+        self.flush()
+        deadline = time.monotonic() + drain_seconds
+        while len(self._outbox) and self._connected.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        if len(self._outbox):
+            logger.warning("Event transport stopping with %d unacknowledged frames", len(self._outbox))
+        self._running = False
+        if self._writer is not None:
+            try:
+                self._writer.write(_frame(_BYE, 0))
+                await self._writer.drain()
+            except (ConnectionError, OSError):
+                pass
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _encode(self, events: List[Dict[str, Any]]) -> Optional[bytes]:
+        try:
+            return self.codec.encode(events)
+        except Exception:
+            encodable = []
+            for event_data in events:
+                try:
+                    self.codec.encode(event_data)
+                    encodable.append(event_data)
+                except Exception as e:
+                    self.stats["unencodable"] += 1
+                    logger.warning("Event %s (%s) cannot be sent to other processes: %s",
+                                   event_data.get("id"), event_data.get("type"), str(e))
+            return self.codec.encode(encodable) if encodable else None
+
+    async def _run(self) -> None:
+        """Keep a broker connection open, reconnecting until stopped"""
+        while self._running:
+            try:
+                reader, writer = await _open_connection(self.address)
+            except OSError as e:
+                logger.debug("Event broker at %s unavailable: %s", self.address, str(e))
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            try:
+                await self._session(reader, writer)
+            except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+                if self._running:
+                    logger.warning("Lost connection to event broker at %s: %s", self.address, str(e) or "closed")
+            finally:
+                self._connected.clear()
+                self._writer = None
+                writer.close()
+            if self._running:
+                self.stats["reconnects"] += 1
+                await asyncio.sleep(self.reconnect_seconds)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        hello = {"client": self.client_id, "epoch": self._epoch, "delivered": self._delivered_through}
+        writer.write(_frame(_HELLO, 0, json.dumps(hello).encode("utf-8")))
+        kind, received_through, body = await _read_frame(reader)
+        epoch = body.decode("utf-8")
+        if epoch != self._epoch:
+            # A new broker numbers its deliveries from the start
+            self._epoch = epoch
+            self._delivered_through = 0
+        self._outbox.ack(received_through)
+        self._outbox.rewind()
+        self._writer = writer
+        self._connected.set()
+        logger.info("Connected to event broker at %s as %s", self.address, self.client_id)
+        pump = asyncio.create_task(self._outbox.pump(writer))
+        try:
+            while True:
+                kind, seq, body = await _read_frame(reader)
+                if kind == _ACK:
+                    self._outbox.ack(seq)
+                elif kind == _DELIVER:
+                    self.stats["frames_received"] += 1
+                    if seq <= self._delivered_through:
+                        self.stats["duplicates"] += 1
+                    else:
+                        events = self.codec.decode(memoryview(body))
+                        await self._deliver(events)
+                        self.stats["received"] += len(events)
+                        self._delivered_through = seq
+                    writer.write(_frame(_ACK, seq))
+        finally:
+            pump.cancel()
+            await asyncio.gather(pump, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "transport": self.name,
+            "address": self.address,
+            "client_id": self.client_id,
+            "connected": self._connected.is_set(),
+            "pending_events": len(self._pending),
+            "unacknowledged_frames": len(self._outbox) if self._outbox is not None else 0,
+            "dropped_frames": self._outbox.dropped if self._outbox is not None else 0,
+            **self.stats
+        }
+
+class _Peer:
+    """Broker-side state of one client process"""
+
+    def __init__(self, client_id: str, max_frames: int):
+        self.client_id = client_id
+        self.outbox = _Outbox(_DELIVER, max_frames)
+        self.received_through = 0
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pump: Optional[asyncio.Task] = None
+        self.disconnected_at: Optional[float] = None
+
+class EventBroker:
+    """
+    Fans published frames out to every other connected process.
+
+    Run one per host, e.g. in the gunicorn master (``start_broker_process``)
+    or standalone with ``python -m cmate.core.event_transport <address>``.
+    """
+
+    def __init__(self, address: str, max_pending_frames: int = 1024, peer_timeout: float = 60.0):
+        self.address = address
+        self.max_pending_frames = max_pending_frames
+        self.peer_timeout = peer_timeout
+        self.epoch = uuid4().hex
+        self.stats = {"frames_published": 0, "frames_delivered": 0, "connections": 0}
+        self._peers: Dict[str, _Peer] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        tcp = _tcp_address(self.address)
+        if tcp is not None:
+            self._server = await asyncio.start_server(self._handle, *tcp)
+        else:
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            os.makedirs(os.path.dirname(os.path.abspath(self.address)), exist_ok=True)
+            self._server = await asyncio.start_unix_server(self._handle, path=self.address)
+        logger.info("Event broker listening on %s", self.address)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for peer in self._peers.values():
+                if peer.writer is not None:
+                    peer.writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if _tcp_address(self.address) is None and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = None
+        try:
+            kind, _, body = await _read_frame(reader)
+            if kind != _HELLO:
+                return
+            hello = json.loads(body)
+            self._expire_peers()
+            peer = self._peers.get(hello["client"])
+            if peer is None:
+                peer = self._peers[hello["client"]] = _Peer(hello["client"], self.max_pending_frames)
+            elif peer.writer is not None:
+                # The process reconnected before its old connection was noticed as gone
+                peer.pump.cancel()
+                peer.writer.close()
+            if hello.get("epoch") == self.epoch:
+                peer.outbox.ack(hello.get("delivered", 0))
+            peer.outbox.rewind()
+            peer.writer = writer
+            peer.disconnected_at = None
+            self.stats["connections"] += 1
+            writer.write(_frame(_HELLO, peer.received_through, self.epoch.encode("utf-8")))
+            peer.pump = asyncio.create_task(peer.outbox.pump(writer))
+            while True:
+                kind, seq, body = await _read_frame(reader)
+                if kind == _PUBLISH:
+                    if seq > peer.received_through:
+                        self._fan_out(peer, body)
+                        peer.received_through = seq
+                    writer.write(_frame(_ACK, seq))
+                elif kind == _ACK:
+                    peer.outbox.ack(seq)
+                elif kind == _BYE:
+                    self._peers.pop(peer.client_id, None)
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        except Exception as e:
+            logger.error("Error serving event broker client: %s", str(e))
+        finally:
+            if peer is not None and peer.writer is writer:
+                peer.pump.cancel()
+                peer.writer = None
+                peer.disconnected_at = time.monotonic()
+            writer.close()
+
+    def _fan_out(self, sender: _Peer, body: bytes) -> None:
+        self.stats["frames_published"] += 1
+        for peer in self._peers.values():
+            if peer is not sender:
+                peer.outbox.push(body)
+                self.stats["frames_delivered"] += 1
+
+    def _expire_peers(self) -> None:
+        """Forget peers that went away without a goodbye long enough ago"""
+        now = time.monotonic()
+        for client_id in [client_id for client_id, peer in self._peers.items()
+                          if peer.disconnected_at is not None and now - peer.disconnected_at > self.peer_timeout]:
+            del self._peers[client_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "peers": len(self._peers),
+            "connected_peers": sum(1 for peer in self._peers.values() if peer.writer is not None),
+            "dropped_frames": sum(peer.outbox.dropped for peer in self._peers.values())
+        }
+
+def make_transport(kind: str, address: Optional[str] = None, **options: Any) -> Optional[EventTransport]:
+    """Transport for an ``events.transport`` setting, None for ``none``"""
+    if kind == "none":
+        return None
+    if kind == "socket":
+        return SocketTransport(address, **options)
+    raise ValueError(f"Unknown event transport: {kind}")
+
+def run_broker(address: str) -> None:
+    """Run an EventBroker until the process is terminated"""
+    try:
+        asyncio.run(EventBroker(address).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+def start_broker_process(address: str) -> multiprocessing.Process:
+    """Run an EventBroker in a daemon child process"""
+    process = multiprocessing.Process(target=run_broker, args=(address,), name="cmate-event-broker", daemon=True)
+    process.start()
+    return process
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    run_broker(sys.argv[1] if len(sys.argv) > 1 else "temp/eventbus.sock")
@@ -0,0 +1,349 @@
+# cmate/core/graph_engine.py
+"""
+cmate/core/graph_engine.py
+
+Strongly connected component engine for the project dependency graph.
+
+Components are found once with an iterative Tarjan pass and collapsed into a
+condensation DAG. Transitive closures are memoized per component as integer
+bitsets over component ids, so reachability and cycle queries for every file
+in a package cost one traversal of the DAG in total instead of one DFS per
+file. Edge updates only touch the components they affect:
+
+- an edge inside a component or parallel to an existing DAG edge changes nothing
+- a new DAG edge drops the memoized closures of its ancestors
+- an edge that closes a cycle merges the components along that cycle
+- removing an edge inside a component re-runs Tarjan on that component only
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Any
+from collections import deque
+
+class SCCGraphEngine:
+    """
+    Condensation of a directed graph given as forward and reverse adjacency.
+
+    The engine reads the adjacency dicts it is given and never mutates them;
+    the owner must call ``edge_added``/``edge_removed``/``node_removed`` after
+    each individual edge change so the condensation stays in sync. Nothing is
+    computed until the first query.
+    """
+
+    def __init__(self, adjacency: Dict[str, Set[str]], reverse_adjacency: Dict[str, Set[str]]):
+        self.adjacency = adjacency
+        self.reverse_adjacency = reverse_adjacency
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard the condensation; it is rebuilt on the next query"""
+        self._ready = False
+        self.component_of: Dict[str, int] = {}
+        self.members: Dict[int, List[str]] = {}
+        self.dag: Dict[int, Dict[int, int]] = {}
+        self.dag_reverse: Dict[int, Set[int]] = {}
+        self._closure: Dict[int, int] = {}
+        self._cycles: Dict[int, List[str]] = {}
+        self._next_id = 0
+        self.stats = {"full_builds": 0, "merges": 0, "splits": 0, "closure_invalidations": 0}
+
+    # Queries
+
+    def component(self, node: str) -> List[str]:
+        """Members of the component containing ``node``"""
+        self._ensure_ready()
+        return list(self.members[self._component_id(node)])
+
+    def reachable(self, node: str) -> List[str]:
+        """Every node reachable from ``node``, excluding itself"""
+        self._ensure_ready()
+        comp = self._component_id(node)
+        result = [member for member in self.members[comp] if member != node]
+        for target in self._iter_bits(self._closure_of(comp)):
+            result.extend(self.members[target])
+        return result
+
+    def cycles_from(self, node: str) -> List[List[str]]:
+        """One cycle chain for each cyclic component reachable from ``node`` (including its own)"""
+        self._ensure_ready()
+        comp = self._component_id(node)
+        cycles = []
+        for target in [comp, *self._iter_bits(self._closure_of(comp))]:
+            if len(self.members[target]) > 1:
+                cycles.append(self._cycle_of(target))
+        return cycles
+
+    def cyclic_components(self) -> List[List[str]]:
+        """Members of every component that contains a cycle"""
+        self._ensure_ready()
+        return [list(members) for members in self.members.values() if len(members) > 1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._ensure_ready()
+        return {
+            **self.stats,
+            "components": len(self.members),
+            "cyclic_components": sum(1 for members in self.members.values() if len(members) > 1),
+            "dag_edges": sum(len(targets) for targets in self.dag.values()),
+            "memoized_closures": len(self._closure)
+        }
+
+    # Updates
+
+    def edge_added(self, source: str, target: str) -> None:
+        if not self._ready:
+            return
+        src = self._component_id(source)
+        dst = self._component_id(target)
+        if src == dst:
+            return
+        targets = self.dag.setdefault(src, {})
+        if dst in targets:
+            targets[dst] += 1
+            return
+        if self._closure_of(dst) >> src & 1:
+            # The new edge closes a cycle: merge every component on a path dst -> src
+            merged = [
+                comp for comp in self._ancestors(src)
+                if comp == dst or self._closure_of(dst) >> comp & 1
+            ]
+            members = [member for comp in merged for member in self.members[comp]]
+            self._replace_components(merged, [members])
+            self.stats["merges"] += 1
+            return
+        targets[dst] = 1
+        self.dag_reverse.setdefault(dst, set()).add(src)
+        self._invalidate_closures([src])
+
+    def edge_removed(self, source: str, target: str) -> None:
+        if not self._ready:
+            return
+        src = self._component_id(source)
+        dst = self._component_id(target)
+        if src != dst:
+            targets = self.dag.get(src, {})
+            if dst not in targets:
+                return
+            targets[dst] -= 1
+            if targets[dst] <= 0:
+                del targets[dst]
+                self.dag_reverse.get(dst, set()).discard(src)
+                self._invalidate_closures([src])
+            return
+        members = self.members[src]
+        parts = self._tarjan(members, set(members))
+        if len(parts) == 1:
+            self._cycles.pop(src, None)
+            return
+        self._replace_components([src], parts)
+        self.stats["splits"] += 1
+
+    def node_removed(self, node: str) -> None:
+        """Forget a node whose edges have all been removed"""
+        if not self._ready or node not in self.component_of:
+            return
+        comp = self.component_of.pop(node)
+        members = self.members[comp]
+        if len(members) > 1:
+            members.remove(node)
+            self._cycles.pop(comp, None)
+            return
+        self._drop_component(comp)
+
+    # Internals
+
+    def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        nodes = set(self.adjacency)
+        for targets in self.adjacency.values():
+            nodes.update(targets)
+        for members in self._tarjan(nodes, None):
+            self._new_component(members)
+        for comp in list(self.members):
+            self._link_component(comp, set())
+        self._ready = True
+        self.stats["full_builds"] += 1
+
+    def _component_id(self, node: str) -> int:
+        comp = self.component_of.get(node)
+        if comp is None:
+            comp = self._new_component([node])
+        return comp
+
+    def _new_component(self, members: List[str]) -> int:
+        comp = self._next_id
+        self._next_id += 1
+        self.members[comp] = members
+        for member in members:
+            self.component_of[member] = comp
+        return comp
+
+    def _link_component(self, comp: int, fresh: Set[int]) -> None:
+        """Add the DAG edges of a component from the node adjacency"""
+        targets = self.dag.setdefault(comp, {})
+        for member in self.members[comp]:
+            for target in self.adjacency.get(member, ()):
+                other = self._component_id(target)
+                if other != comp:
+                    targets[other] = targets.get(other, 0) + 1
+                    self.dag_reverse.setdefault(other, set()).add(comp)
+            if fresh:
+                # Incoming edges from components that were not rebuilt alongside this one
+                for source in self.reverse_adjacency.get(member, ()):
+                    other = self._component_id(source)
+                    if other != comp and other not in fresh:
+                        sources = self.dag.setdefault(other, {})
+                        sources[comp] = sources.get(comp, 0) + 1
+                        self.dag_reverse.setdefault(comp, set()).add(other)
+
+    def _replace_components(self, old: List[int], parts: List[List[str]]) -> None:
+        self._invalidate_closures(old)
+        for comp in old:
+            self._drop_component(comp)
+        fresh = {self._new_component(members) for members in parts}
+        for comp in fresh:
+            self._link_component(comp, fresh)
+        self._invalidate_closures(list(fresh))
+
+    def _drop_component(self, comp: int) -> None:
+        for target in self.dag.pop(comp, {}):
+            self.dag_reverse.get(target, set()).discard(comp)
+        for source in self.dag_reverse.pop(comp, set()):
+            self.dag.get(source, {}).pop(comp, None)
+        for member in self.members.pop(comp, []):
+            if self.component_of.get(member) == comp:
+                del self.component_of[member]
+        self._closure.pop(comp, None)
+        self._cycles.pop(comp, None)
+
+    def _ancestors(self, comp: int) -> List[int]:
+        """``comp`` and every component with a path to it"""
+        seen = {comp}
+        order = [comp]
+        pending = deque([comp])
+        while pending:
+            for source in self.dag_reverse.get(pending.popleft(), ()):
+                if source not in seen:
+                    seen.add(source)
+                    order.append(source)
+                    pending.append(source)
+        return order
+
+    def _invalidate_closures(self, comps: Iterable[int]) -> None:
+        # A memoized closure implies memoized closures for all its descendants,
+        # so the walk up can stop at the first component without one
+        pending = deque(comp for comp in comps if self._closure.pop(comp, None) is not None)
+        while pending:
+            self.stats["closure_invalidations"] += 1
+            for source in self.dag_reverse.get(pending.popleft(), ()):
+                if self._closure.pop(source, None) is not None:
+                    pending.append(source)
+
+    def _closure_of(self, comp: int) -> int:
+        """Bitset of the components reachable from ``comp`` (memoized)"""
+        cached = self._closure.get(comp)
+        if cached is not None:
+            return cached
+        stack = [(comp, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._closure:
+                continue
+            targets = self.dag.get(current, {})
+            if expanded:
+                mask = 0
+                for target in targets:
+                    mask |= (1 << target) | self._closure[target]
+                self._closure[current] = mask
+            else:
+                stack.append((current, True))
+                stack.extend((target, False) for target in targets if target not in self._closure)
+        return self._closure[comp]
+
+    def _cycle_of(self, comp: int) -> List[str]:
+        """A concrete cycle through a cyclic component, starting and ending at one member"""
+        cached = self._cycles.get(comp)
+        if cached is not None:
+            return cached
+        members = set(self.members[comp])
+        start = min(members)
+        parents: Dict[str, Optional[str]] = {start: None}
+        pending = deque([start])
+        closing = None
+        while pending and closing is None:
+            current = pending.popleft()
+            for target in self.adjacency.get(current, ()):
+                if target == start:
+                    closing = current
+                    break
+                if target in members and target not in parents:
+                    parents[target] = current
+                    pending.append(target)
+        chain = [start]
+        node = closing
+        while node is not None and node != start:
+            chain.append(node)
+            node = parents[node]
+        cycle = [start] + chain[:0:-1] + [start]
+        self._cycles[comp] = cycle
+        return cycle
+
+    @staticmethod
+    def _iter_bits(mask: int) -> Iterable[int]:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _tarjan(self, nodes: Iterable[str], within: Optional[Set[str]]) -> List[List[str]]:
+        """Iterative Tarjan; components come out in reverse topological order"""
+        def successors(node: str):
+            targets = self.adjacency.get(node, ())
+            if within is None:
+                return iter(targets)
+            return (target for target in targets if target in within)
+
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+        for root in nodes:
+            if root in index:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, successors(root))]
+            while work:
+                node, children = work[-1]
+                descended = False
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, successors(child)))
+                        descended = True
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                if descended:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
@@ -75,8 +75,29 @@ class NavigationActionExecutor:
         # Track active operations
         self.active_operations: Dict[UUID, NavigationAction] = {}
         self.operation_results: Dict[UUID, ActionResult] = {}
+        self._file_watcher: Optional[Any] = None
         logger.success("NavigationActionExecutor initialized successfully.")
 
+    async def start(self, file_watcher: Optional[Any] = None) -> Dict[str, int]:
+        """
+        Bring the persistent dependency graph up to date with the workspace
+        (only changed files are re-analyzed) and keep it current from a
+        FileWatcher's change batches.
+        """
+        stats = await self.dependency_analyzer.build_project_graph()
+        if file_watcher is not None and self._file_watcher is None:
+            self.dependency_analyzer.watch(file_watcher)
+            self._file_watcher = file_watcher
+        logger.info("NavigationActionExecutor dependency graph ready: %s", stats)
+        return stats
+
+    def close(self) -> None:
+        """Stop following file changes and save the dependency graph"""
+        if self._file_watcher is not None:
+            self.dependency_analyzer.unwatch(self._file_watcher)
+            self._file_watcher = None
+        self.dependency_analyzer.close()
+
     async def execute_action(self, action: NavigationAction) -> ActionResult:
         """Execute a navigation action with safety checks"""
         try:
@@ -10,14 +10,19 @@ Implements the NavigationDecisionSystem responsible for:
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from uuid import UUID, uuid4
+import asyncio
 import logging
+import time
 
 from ..core.state_manager import AgentState
 from ..file_services.file_analyzer import FileAnalyzer
+from ..file_services.symbol_index import SymbolIndex
+from ..file_services.embedding_index import EmbeddingIndex
 from ..file_services.workspace_scanner import WorkspaceScanner
 
 logger = logging.getLogger(__name__)
@@ -33,6 +38,7 @@ class NavigationContext:
     dependencies: Dict[Path, List[Path]]
     state_history: List[AgentState]
     metadata: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[Path, float] = field(default_factory=dict)
 
 @dataclass
 class NavigationResult:
@@ -95,14 +101,31 @@ class ComponentClassifier:
 class NavigationDecisionSystem:
     """Main system for making navigation decisions"""
     
-    def __init__(self, workspace_path: Optional[str] = None):
+    def __init__(self,
+                 workspace_path: Optional[str] = None,
+                 max_target_components: Optional[int] = 10,
+                 embedding_index: Optional[EmbeddingIndex] = None,
+                 max_concurrency: int = 8,
+                 max_index_batches: int = 2):
         self.workspace = Path(workspace_path) if workspace_path else Path("./Workspace")
         self.scanner = WorkspaceScanner(str(self.workspace))
         self.classifier = ComponentClassifier()
+        self.file_analyzer = self.classifier.file_analyzer
+        self.symbol_index = SymbolIndex(self.scanner.index.index_path.with_suffix(".symbols.json"))
+        self.embedding_index = embedding_index
+        self.max_target_components = max_target_components
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_index_batches = max(1, max_index_batches)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="navigation")
         self.current_context: Optional[NavigationContext] = None
         logger.info("NavigationDecisionSystem initialized with workspace: %s", self.workspace)
         logger.success("NavigationDecisionSystem initialized successfully.")
 
+    def close(self) -> None:
+        """Shut down the thread and process pools used for component analysis"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.file_analyzer.close()
+
     async def prepare_decision_context(
         self,
         request: str,
@@ -119,24 +142,19 @@ class NavigationDecisionSystem:
         context_id = uuid4()
         current_path = self.workspace
         
-        # Scan the workspace
-        scan_result = await self.scanner.scan_workspace()
-        logger.debug("Workspace scan complete. Total files found: %d", len(scan_result.files))
-        
-        # Identify target components
+        # Relevant files come from the symbol index, which the streamed
+        # scan keeps up to date; their dependencies are analyzed concurrently
         target_components = []
-        for file_info in scan_result.files:
-            if self._is_relevant_for_request(file_info, request):
-                target_components.append(file_info.path)
+        file_count = await self._refresh_symbol_index()
+        logger.debug("Workspace scan complete. Total files found: %d", file_count)
+        for rel, score in self.symbol_index.search(request, limit=self.max_target_components):
+            target_components.append(Path(rel))
+        for rel in await self._semantic_matches(request):
+            if Path(rel) not in target_components:
+                target_components.append(Path(rel))
         logger.debug("Target components identified: %s", target_components)
-        
-        # Analyze dependencies for each target component
-        dependencies = {}
-        for component in target_components:
-            deps = await self._analyze_dependencies(component)
-            dependencies[component] = deps
-            logger.debug("Dependencies for %s: %s", component, deps)
-            
+        dependencies, timings = await self._analyze_components(target_components)
+
         context = NavigationContext(
             request_id=context_id,
             user_request=request,
@@ -144,7 +162,8 @@ class NavigationDecisionSystem:
             target_components=target_components,
             dependencies=dependencies,
             state_history=[current_state],
-            metadata=workspace_data
+            metadata=workspace_data,
+            timings=timings
         )
         logger.info("Navigation context prepared with request_id: %s", context_id)
         logger.success("Navigation context prepared successfully with request_id: %s", context_id)
@@ -263,30 +282,145 @@ class NavigationDecisionSystem:
             metadata={"component_count": len(prioritized), "components": [str(p) for p in prioritized]}
         )
         
-    def _is_relevant_for_request(self, file_info: Any, request: str) -> bool:
-        """Check if a file is relevant for the request"""
-        request_lower = request.lower()
-        file_name = file_info.path.name.lower()
-        return any(keyword in file_name for keyword in request_lower.split())
+    async def _refresh_symbol_index(self) -> int:
+        """
+        Stream the workspace scan into the symbol index.
+
+        Each batch from ``iter_workspace`` is checked against the indexed
+        fingerprints and its new or changed files are analyzed while the
+        walk continues. At most ``max_index_batches`` batches are analyzed
+        at once; the walk waits for a free slot. Files no longer in the
+        workspace are dropped once the walk is done. Returns the number of
+        files seen.
+        """
+        fingerprints: Dict[str, Tuple[int, int]] = {}
+        slots = asyncio.Semaphore(self.max_index_batches)
+        updates = []
+
+        async def index(files: List[str], batch_fingerprints: Dict[str, Tuple[int, int]]) -> int:
+            try:
+                return await self._index_files(files, batch_fingerprints)
+            finally:
+                slots.release()
+
+        try:
+            async for batch in self.scanner.iter_workspace():
+                batch_fingerprints = {
+                    info.path.as_posix(): (info.size, info.metadata["mtime_ns"]) for info in batch
+                }
+                fingerprints.update(batch_fingerprints)
+                stale = self.symbol_index.stale(batch_fingerprints)
+                if stale:
+                    await slots.acquire()
+                    updates.append(asyncio.create_task(index(stale, batch_fingerprints)))
+            indexed = sum(await asyncio.gather(*updates)) if updates else 0
+        except BaseException:
+            for task in updates:
+                task.cancel()
+            raise
+        removed = self.symbol_index.missing(fingerprints)
+        for rel in removed:
+            self.symbol_index.remove(rel)
+        if indexed or removed:
+            self.symbol_index.save()
+            logger.debug("Symbol index updated: %d indexed, %d removed", indexed, len(removed))
+        if self.embedding_index is not None:
+            counts = await self.embedding_index.sync_workspace(self.workspace, fingerprints)
+            logger.debug("Embedding index synced: %s", counts)
+        return len(fingerprints)
+
+    async def _index_files(self, files: List[str], fingerprints: Dict[str, Tuple[int, int]]) -> int:
+        """Analyze one batch of stale files and add them to the symbol index"""
+        analyzable = [
+            self.workspace / rel for rel in files
+            if Path(rel).suffix.lower() in self.file_analyzer.analyzers
+        ]
+        batch = await self.file_analyzer.analyze_many(analyzable) if analyzable else None
+        for rel in files:
+            analysis = batch.analyses.get(self.workspace / rel) if batch else None
+            self.symbol_index.add(rel, fingerprints[rel], analysis)
+        return len(files)
+
+    async def _semantic_matches(self, request: str) -> List[str]:
+        """Files whose chunks are closest to the request in the embedding index, if one is configured"""
+        if self.embedding_index is None:
+            return []
+        limit = self.max_target_components or 10
+        matches = []
+        for match in await self.embedding_index.search(request, k=limit * 2):
+            if match.chunk.path not in matches:
+                matches.append(match.chunk.path)
+        return matches[:limit]
         
-    async def _analyze_dependencies(self, file_path: Path) -> List[Path]:
-        """Analyze dependencies for a file"""
+    async def _analyze_components(self, components: List[Path]) -> Tuple[Dict[Path, List[Path]], Dict[Path, float]]:
+        """
+        Analyze the dependencies of many components concurrently.
+
+        At most ``max_concurrency`` analyses run at once, each in the thread
+        pool. Import resolutions are shared between components, so a module
+        imported by many of them is resolved once. Returns the dependencies
+        and the analysis time of each component.
+        """
+        await self.scanner.ensure_module_index()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        resolved: Dict[Tuple[str, str], Optional[Path]] = {}
+        timings: Dict[Path, float] = {}
+
+        async def run(component: Path) -> List[Path]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    return await self._analyze_dependencies(component, resolved)
+                finally:
+                    timings[component] = time.perf_counter() - started
+
+        tasks = [asyncio.create_task(run(component)) for component in components]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        dependencies = dict(zip(components, results))
+        if timings:
+            slowest = max(timings, key=timings.get)
+            logger.debug("Analyzed %d components (slowest %s: %.3fs)", len(timings), slowest, timings[slowest])
+        return dependencies, timings
+
+    async def _analyze_dependencies(self,
+                                    file_path: Path,
+                                    resolved: Optional[Dict[Tuple[str, str], Optional[Path]]] = None) -> List[Path]:
+        """Analyze dependencies for a file; the caller ensures the module index first"""
         logger.debug("Analyzing dependencies for: %s", file_path)
-        analysis = await self.file_analyzer.analyze_file(file_path)
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(
+            self._executor, self.file_analyzer.analyze_file_sync, self.workspace / file_path
+        )
         dependencies = []
-        if hasattr(analysis, 'imports'):
-            for imp in analysis.imports:
-                dep_path = self._import_to_path(imp)
-                if dep_path and dep_path.exists():
+        if analysis.code_analysis:
+            importer = Path(file_path).as_posix()
+            package = importer.rsplit("/", 1)[0] if "/" in importer else ""
+            for target in analysis.code_analysis.dependencies:
+                key = (target, package if target.startswith(".") else "")
+                if resolved is not None and key in resolved:
+                    dep_path = resolved[key]
+                else:
+                    dep_path = self._import_to_path(target, importer)
+                    if resolved is not None:
+                        resolved[key] = dep_path
+                if dep_path and dep_path not in dependencies:
                     dependencies.append(dep_path)
         logger.debug("Dependencies for %s: %s", file_path, dependencies)
         return dependencies
         
-    def _import_to_path(self, import_name: str) -> Optional[Path]:
-        """Convert an import name to a possible file path"""
-        parts = import_name.split('.')
-        possible_path = self.workspace.joinpath(*parts).with_suffix('.py')
-        return possible_path if possible_path.exists() else None
+    def _import_to_path(self, import_name: str, importer: Optional[str] = None) -> Optional[Path]:
+        """Convert an import name to a file path using the scan's module table"""
+        modules = self.scanner.modules
+        if import_name.startswith('.'):
+            rel = modules.resolve_relative(import_name, importer) if importer else None
+        else:
+            rel = modules.resolve_prefix(import_name)
+        return self.workspace / rel if rel else None
         
     def _determine_new_file_path(self, request: str) -> Path:
         """Determine an appropriate path for a new file"""
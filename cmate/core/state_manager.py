@@ -153,6 +153,11 @@ class StateManager:
         transitions[AgentState.WRITING_TESTS].update([AgentState.TESTING, AgentState.ERROR])
         transitions[AgentState.ERROR].update([AgentState.RECOVERY, AgentState.IDLE])
         transitions[AgentState.RECOVERY].update([state for state in AgentState if state not in {AgentState.ERROR, AgentState.SHUTDOWN}])
+        # Shutting down is possible from any state
+        for state in AgentState:
+            if state != AgentState.SHUTDOWN:
+                transitions[state].add(AgentState.CONTEXT_SWITCHING)
+        transitions[AgentState.CONTEXT_SWITCHING].add(AgentState.SHUTDOWN)
         
         self.logger.debug("Initialized valid state transitions: %s", transitions)
         return transitions
@@ -0,0 +1,189 @@
+# cmate/file_services/analysis_cache.py
+from typing import Dict, Optional, Any, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import threading
+
+StatKey = Tuple[str, int, int]
+
+@dataclass
+class AnalysisCacheEntry:
+    """Cached analysis result with its content digest and estimated size"""
+    analysis: Any
+    digest: str
+    size_bytes: int
+
+class AnalysisCache:
+    """
+    Shared cache of file analysis results.
+
+    Entries are keyed by (absolute path, size, mtime). When the stat key
+    misses, callers can fall back to the content digest, so a file that was
+    touched or moved without changing its content is not parsed again.
+    Memory is bounded by an LRU byte budget; an optional disk tier stores
+    results by digest so they survive a restart.
+
+    Cached analyses are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_memory_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[StatKey, AnalysisCacheEntry]" = OrderedDict()
+        self._by_digest: Dict[str, StatKey] = {}
+        self._by_path: Dict[str, StatKey] = {}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "digest_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def configure(self, max_memory_bytes: Optional[int] = None, disk_dir: Optional[str] = None) -> None:
+        """Adjust the memory budget and/or enable the disk tier"""
+        with self._lock:
+            if max_memory_bytes is not None:
+                self.max_memory_bytes = max_memory_bytes
+                self._evict()
+            if disk_dir:
+                self.disk_dir = Path(disk_dir)
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(path: Path, stat: os.stat_result) -> StatKey:
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def digest(content: bytes, file_type: str = "") -> str:
+        """Content digest; the file type is mixed in because analysis depends on it"""
+        hasher = hashlib.blake2b(file_type.encode("utf-8") + b"\0", digest_size=16)
+        hasher.update(content)
+        return hasher.hexdigest()
+
+    def get(self, key: StatKey) -> Optional[Any]:
+        """Look up an analysis by stat key"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.analysis
+
+    def get_by_digest(self, digest: str) -> Optional[Any]:
+        """Look up an analysis by content digest in memory, then on disk"""
+        with self._lock:
+            key = self._by_digest.get(digest)
+            entry = self._entries.get(key) if key else None
+            if entry is not None:
+                self.stats["digest_hits"] += 1
+                return entry.analysis
+        analysis = self._load_from_disk(digest)
+        with self._lock:
+            if analysis is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["disk_hits"] += 1
+        return analysis
+
+    def put(self, key: StatKey, digest: str, analysis: Any) -> None:
+        """Store an analysis under its stat key and content digest"""
+        try:
+            payload = pickle.dumps(analysis, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            payload = None
+        entry = AnalysisCacheEntry(
+            analysis=analysis,
+            digest=digest,
+            size_bytes=len(payload) if payload is not None else 4096
+        )
+        with self._lock:
+            self._remove_path(key[0])
+            self._entries[key] = entry
+            self._by_digest[digest] = key
+            self._by_path[key[0]] = key
+            self._memory_bytes += entry.size_bytes
+            self._evict()
+        if payload is not None:
+            self._save_to_disk(digest, payload)
+
+    def invalidate(self, path: Path) -> None:
+        """Drop in-memory entries for a path (the disk tier is content-addressed)"""
+        with self._lock:
+            self._remove_path(os.path.abspath(path))
+
+    def clear(self) -> None:
+        """Clear the in-memory tier"""
+        with self._lock:
+            self._entries.clear()
+            self._by_digest.clear()
+            self._by_path.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_tier": str(self.disk_dir) if self.disk_dir else None
+            }
+
+    def _remove_path(self, abs_path: str) -> None:
+        key = self._by_path.get(abs_path)
+        if key is not None:
+            self._drop(key)
+
+    def _drop(self, key: StatKey) -> None:
+        entry = self._entries.pop(key)
+        self._memory_bytes -= entry.size_bytes
+        if self._by_digest.get(entry.digest) == key:
+            del self._by_digest[entry.digest]
+        if self._by_path.get(key[0]) == key:
+            del self._by_path[key[0]]
+
+    def _evict(self) -> None:
+        while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats["evictions"] += 1
+
+    def _disk_path(self, digest: str) -> Path:
+        return self.disk_dir / digest[:2] / f"{digest}.analysis"
+
+    def _load_from_disk(self, digest: str) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading cached analysis {path}: {str(e)}")
+            return None
+
+    def _save_to_disk(self, digest: str, payload: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(digest)
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving cached analysis {path}: {str(e)}")
+
+# Shared instance used by every FileAnalyzer unless one is passed explicitly
+analysis_cache = AnalysisCache()
@@ -0,0 +1,114 @@
+# cmate/file_services/directory_walker.py
+from typing import Any, Callable, Iterator, List, Optional, Pattern
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+import queue
+import re
+import threading
+
+_DONE = object()
+
+def compile_ignore_patterns(patterns: List[str]) -> Optional[Pattern]:
+    """Combine ignore patterns into a single regex matched against entry names"""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+class DirectoryWalker:
+    """
+    Walks a directory tree with ``os.scandir`` on a bounded thread pool.
+
+    Each directory is listed by one worker; subdirectories are submitted back
+    to the pool so sibling subtrees are walked concurrently. Stat information
+    comes from the ``DirEntry`` (cached by the OS listing where available) and
+    ignore patterns are checked with one precompiled regex per entry name.
+    Each file entry is turned into a result by ``build_entry`` (for example a
+    ``FileInfo``) and results are streamed as per-directory batches.
+    """
+
+    def __init__(self,
+                 root: Path,
+                 build_entry: Callable[[os.DirEntry, str], Any],
+                 ignore_patterns: Optional[List[str]] = None,
+                 max_workers: Optional[int] = None,
+                 queue_size: int = 256):
+        self.root = Path(root)
+        self.build_entry = build_entry
+        self.ignore_regex = compile_ignore_patterns(ignore_patterns or [])
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.queue_size = queue_size
+
+    def walk(self,
+             max_depth: Optional[int] = None,
+             file_types: Optional[List[str]] = None) -> Iterator[Any]:
+        """Yield results one by one as they are discovered"""
+        for batch in self.walk_batches(max_depth, file_types):
+            yield from batch
+
+    def walk_batches(self,
+                     max_depth: Optional[int] = None,
+                     file_types: Optional[List[str]] = None) -> Iterator[List[Any]]:
+        """Yield one list of results per scanned directory, in discovery order"""
+        results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        cancelled = threading.Event()
+        pending = [1]
+        lock = threading.Lock()
+        wanted_types = {t.lower() for t in file_types} if file_types else None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cmate-walker")
+
+        def emit(item) -> None:
+            while not cancelled.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def finish() -> None:
+            with lock:
+                pending[0] -= 1
+                done = pending[0] == 0
+            if done:
+                emit(_DONE)
+
+        def scan(directory: str, depth: int) -> None:
+            try:
+                if cancelled.is_set():
+                    return
+                batch = []
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if self.ignore_regex is not None and self.ignore_regex.fullmatch(entry.name):
+                                continue
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    if (not max_depth or depth + 1 <= max_depth) and not cancelled.is_set():
+                                        with lock:
+                                            pending[0] += 1
+                                        executor.submit(scan, entry.path, depth + 1)
+                                elif entry.is_file():
+                                    _, suffix = os.path.splitext(entry.name)
+                                    file_type = suffix.lower()[1:] if suffix else "unknown"
+                                    if wanted_types is None or (suffix and file_type in wanted_types):
+                                        batch.append(self.build_entry(entry, file_type))
+                            except OSError as e:
+                                print(f"Error processing file {entry.path}: {str(e)}")
+                except OSError as e:
+                    print(f"Error scanning directory {directory}: {str(e)}")
+                if batch:
+                    emit(batch)
+            finally:
+                finish()
+
+        executor.submit(scan, str(self.root), 0)
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=True, cancel_futures=True)
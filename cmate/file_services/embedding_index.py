@@ -0,0 +1,404 @@
+# cmate/file_services/embedding_index.py
+from typing import Dict, Iterable, List, Mapping, Optional, Any, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from .symbol_index import tokenize
+
+EMBEDDING_INDEX_VERSION = 1
+
+# File types embedded by sync_workspace() unless told otherwise
+DEFAULT_EMBED_TYPES = ("py", "js", "ts", "html", "css", "md", "txt", "json", "yaml", "yml")
+
+@dataclass
+class EmbeddingChunk:
+    """A chunk of a workspace file and the vector row holding its embedding"""
+    path: str
+    index: int
+    start_line: int
+    end_line: int
+    content_hash: str
+    row: int
+
+@dataclass
+class EmbeddingMatch:
+    """A search hit with its cosine similarity"""
+    chunk: EmbeddingChunk
+    score: float
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder for offline use and tests.
+
+    Tokens are hashed into signed buckets (feature hashing), so texts that
+    share identifiers end up close under cosine similarity. No model or
+    network access is needed.
+    """
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+        self.model_name = f"hashing-{dimension}"
+        self.calls = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, value % self.dimension] += 1.0 if value >> 63 else -1.0
+        return vectors.tolist()
+
+class LLMEmbedder:
+    """Embeds through LLMManager with the embedding model (AgentState.EMBEDDING)"""
+
+    def __init__(self, manager: Optional[Any] = None, model_name: str = "lm-studio-embedding", batch_size: int = 32):
+        self.manager = manager
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if self.manager is None:
+            from ..llm.llm_manager import llm_manager
+            self.manager = llm_manager
+        return await self.manager.embed(texts, model_name=self.model_name, batch_size=self.batch_size)
+
+class EmbeddingIndex:
+    """
+    Chunked embedding store for workspace files.
+
+    Vectors live in a memory-mapped ``vectors.npy`` (float32, L2-normalized)
+    and chunk metadata in ``metadata.json``. Files are split into chunks at
+    top-level statements, so an edit usually changes only the chunk it is
+    in. Chunks are keyed by content hash: an unchanged chunk keeps its row,
+    a chunk whose content already exists elsewhere copies that vector, and
+    only genuinely new content is sent to the embedder, in batches.
+    """
+
+    def __init__(self,
+                 index_dir: Path,
+                 embedder: Optional[Any] = None,
+                 chunk_lines: int = 40,
+                 batch_size: int = 64,
+                 initial_capacity: int = 1024):
+        self.index_dir = Path(index_dir)
+        self.embedder = embedder or LLMEmbedder()
+        self.model_name = getattr(self.embedder, "model_name", type(self.embedder).__name__)
+        self.chunk_lines = chunk_lines
+        self.batch_size = batch_size
+        self.initial_capacity = initial_capacity
+        self.chunks: Dict[str, List[EmbeddingChunk]] = {}
+        self.fingerprints: Dict[str, Tuple[int, int]] = {}
+        self.dimension: Optional[int] = None
+        self.stats = {"embedded_chunks": 0, "copied_chunks": 0, "kept_chunks": 0, "embed_calls": 0}
+        self._vectors: Optional[np.ndarray] = None
+        self._active = np.zeros(0, dtype=bool)
+        self._row_chunks: Dict[int, EmbeddingChunk] = {}
+        self._hash_rows: Dict[str, set] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._lock = threading.RLock()
+        self._update_lock: Optional[asyncio.Lock] = None
+        self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.index_dir / "vectors.npy"
+
+    @property
+    def metadata_path(self) -> Path:
+        return self.index_dir / "metadata.json"
+
+    def chunk_text(self, text: str) -> List[Tuple[int, int, str]]:
+        """Split text into (start_line, end_line, text) chunks at top-level statements"""
+        lines = text.splitlines()
+        chunks = []
+        start = 0
+        minimum = max(1, self.chunk_lines // 2)
+        for number in range(1, len(lines) + 1):
+            length = number - start
+            at_boundary = number < len(lines) and lines[number][:1] not in ("", " ", "\t", ")", "]", "}")
+            if number == len(lines) or length >= self.chunk_lines or (length >= minimum and at_boundary):
+                body = "\n".join(lines[start:number])
+                if body.strip():
+                    chunks.append((start + 1, number, body))
+                start = number
+        return chunks
+
+    async def index_files(self,
+                          texts: Mapping[str, str],
+                          fingerprints: Optional[Mapping[str, Tuple[int, int]]] = None) -> Dict[str, int]:
+        """(Re)index files from their text; returns how many chunks were embedded, copied and kept"""
+        if self._update_lock is None:
+            self._update_lock = asyncio.Lock()
+        async with self._update_lock:
+            planned = {
+                rel: [(start, end, _content_hash(body), body) for start, end, body in self.chunk_text(text)]
+                for rel, text in texts.items()
+            }
+            with self._lock:
+                known = set(self._hash_rows)
+            missing: Dict[str, str] = {}
+            for chunks in planned.values():
+                for _, _, content_hash, body in chunks:
+                    if content_hash not in known:
+                        missing.setdefault(content_hash, body)
+            embedded = await self._embed(missing)
+            counts = {"embedded": len(embedded), "copied": 0, "kept": 0}
+            with self._lock:
+                # Rows dropped by one file may still be the copy source for
+                # another file in this call, so release them only at the end
+                stale_rows: List[int] = []
+                for rel, chunks in planned.items():
+                    kept, copied = self._apply_file(rel, chunks, embedded, stale_rows)
+                    counts["kept"] += kept
+                    counts["copied"] += copied
+                    if fingerprints and rel in fingerprints:
+                        self.fingerprints[rel] = tuple(fingerprints[rel])
+                for row in stale_rows:
+                    self._release(row)
+                self.stats["embedded_chunks"] += counts["embedded"]
+                self.stats["copied_chunks"] += counts["copied"]
+                self.stats["kept_chunks"] += counts["kept"]
+            return counts
+
+    def remove_files(self, paths: Iterable[str]) -> None:
+        with self._lock:
+            for rel in paths:
+                for chunk in self.chunks.pop(rel, []):
+                    self._release(chunk.row)
+                self.fingerprints.pop(rel, None)
+
+    async def sync_workspace(self,
+                             workspace: Path,
+                             files: Mapping[str, Tuple[int, int]],
+                             file_types: Iterable[str] = DEFAULT_EMBED_TYPES) -> Dict[str, int]:
+        """
+        Bring the index in line with a scan index file table.
+
+        Files whose fingerprint is unchanged are not read at all; changed files
+        are re-chunked and only their changed chunks are embedded.
+        """
+        wanted = {t.lower() for t in file_types}
+        files = {rel: fp for rel, fp in files.items() if Path(rel).suffix.lower()[1:] in wanted}
+        removed = [rel for rel in list(self.chunks) if rel not in files]
+        changed = [rel for rel, fp in files.items() if self.fingerprints.get(rel) != tuple(fp)]
+        texts = await asyncio.to_thread(_read_texts, Path(workspace), changed)
+        counts = await self.index_files(texts, files)
+        self.remove_files(removed)
+        if changed or removed:
+            self.save()
+        return {"files": len(changed), "removed": len(removed), **counts}
+
+    async def search(self, query: str, k: int = 10, paths: Optional[Iterable[str]] = None) -> List[EmbeddingMatch]:
+        """Top-k chunks by cosine similarity to the query text"""
+        if not self._size:
+            return []
+        vector = (await self.embedder.embed([query]))[0]
+        self.stats["embed_calls"] += 1
+        return self.search_vector(vector, k, paths)
+
+    def search_vector(self, vector: Any, k: int = 10, paths: Optional[Iterable[str]] = None) -> List[EmbeddingMatch]:
+        """Top-k chunks by cosine similarity to a query vector"""
+        with self._lock:
+            if self._vectors is None or not self._size:
+                return []
+            query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+            if paths is None:
+                rows = np.flatnonzero(self._active[:self._size])
+            else:
+                rows = np.array(sorted(c.row for rel in paths for c in self.chunks.get(rel, [])), dtype=np.int64)
+            if not len(rows):
+                return []
+            scores = self._vectors[rows] @ query
+            if k < len(rows):
+                top = np.argpartition(-scores, k)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [EmbeddingMatch(chunk=self._row_chunks[int(rows[i])], score=float(scores[i])) for i in top]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "files": len(self.chunks),
+                "chunks": len(self._row_chunks),
+                "rows": self._size,
+                "capacity": 0 if self._vectors is None else self._vectors.shape[0],
+                "dimension": self.dimension,
+                "model": self.model_name
+            }
+
+    def save(self) -> None:
+        """Flush the vectors and write the metadata table atomically"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            data = {
+                "version": EMBEDDING_INDEX_VERSION,
+                "model": self.model_name,
+                "dimension": self.dimension,
+                "size": self._size,
+                "files": {
+                    rel: {
+                        "fingerprint": list(self.fingerprints.get(rel, ())),
+                        "chunks": [[c.index, c.start_line, c.end_line, c.content_hash, c.row] for c in chunks]
+                    }
+                    for rel, chunks in self.chunks.items()
+                }
+            }
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.metadata_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.metadata_path)
+        except Exception as e:
+            print(f"Error saving embedding index {self.metadata_path}: {str(e)}")
+
+    def _load(self) -> None:
+        if not self.metadata_path.exists() or not self.vectors_path.exists():
+            return
+        try:
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != EMBEDDING_INDEX_VERSION or data.get("model") != self.model_name:
+                return
+            vectors = np.load(self.vectors_path, mmap_mode="r+")
+            if vectors.shape[1] != data.get("dimension"):
+                return
+            self._vectors = vectors
+            self.dimension = vectors.shape[1]
+            self._size = data.get("size", 0)
+            self._active = np.zeros(vectors.shape[0], dtype=bool)
+            for rel, entry in data.get("files", {}).items():
+                chunks = [EmbeddingChunk(rel, *values) for values in entry.get("chunks", [])]
+                self.chunks[rel] = chunks
+                if entry.get("fingerprint"):
+                    self.fingerprints[rel] = tuple(entry["fingerprint"])
+                for chunk in chunks:
+                    self._claim(chunk)
+            self._free = [row for row in range(self._size) if not self._active[row]]
+        except Exception as e:
+            print(f"Error loading embedding index {self.index_dir}: {str(e)}")
+            self._vectors = None
+            self._size = 0
+            self.chunks.clear()
+            self.fingerprints.clear()
+            self._row_chunks.clear()
+            self._hash_rows.clear()
+
+    async def _embed(self, missing: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """Embed new chunk texts in batches; returns normalized vectors by content hash"""
+        hashes = list(missing)
+        embedded: Dict[str, np.ndarray] = {}
+        for start in range(0, len(hashes), self.batch_size):
+            batch = hashes[start:start + self.batch_size]
+            vectors = await self.embedder.embed([missing[h] for h in batch])
+            self.stats["embed_calls"] += 1
+            vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+            for content_hash, vector in zip(batch, vectors):
+                embedded[content_hash] = vector
+        return embedded
+
+    def _apply_file(self,
+                    rel: str,
+                    chunks: List[Tuple[int, int, str, str]],
+                    embedded: Dict[str, np.ndarray],
+                    stale_rows: List[int]) -> Tuple[int, int]:
+        previous: Dict[str, List[EmbeddingChunk]] = {}
+        for chunk in self.chunks.get(rel, []):
+            previous.setdefault(chunk.content_hash, []).append(chunk)
+        updated = []
+        kept = copied = 0
+        for index, (start, end, content_hash, _) in enumerate(chunks):
+            reusable = previous.get(content_hash)
+            if reusable:
+                chunk = reusable.pop()
+                chunk.index, chunk.start_line, chunk.end_line = index, start, end
+                kept += 1
+            else:
+                vector = embedded.get(content_hash)
+                if vector is None:
+                    vector = np.array(self._vectors[next(iter(self._hash_rows[content_hash]))])
+                    copied += 1
+                chunk = EmbeddingChunk(rel, index, start, end, content_hash, self._allocate(vector))
+                self._claim(chunk)
+            updated.append(chunk)
+        for stale in previous.values():
+            stale_rows.extend(chunk.row for chunk in stale)
+        self.chunks[rel] = updated
+        return kept, copied
+
+    def _allocate(self, vector: np.ndarray) -> int:
+        if self.dimension is None:
+            self.dimension = int(vector.shape[0])
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = self._size
+            self._ensure_capacity(row + 1)
+            self._size += 1
+        self._vectors[row] = vector
+        return row
+
+    def _claim(self, chunk: EmbeddingChunk) -> None:
+        self._active[chunk.row] = True
+        self._row_chunks[chunk.row] = chunk
+        self._hash_rows.setdefault(chunk.content_hash, set()).add(chunk.row)
+
+    def _release(self, row: int) -> None:
+        chunk = self._row_chunks.pop(row, None)
+        if chunk is None:
+            return
+        self._active[row] = False
+        rows = self._hash_rows.get(chunk.content_hash)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del self._hash_rows[chunk.content_hash]
+        self._free.append(row)
+
+    def _ensure_capacity(self, rows: int) -> None:
+        current = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= current:
+            return
+        capacity = max(rows, self.initial_capacity, current * 2)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.vectors_path.with_suffix(".tmp.npy")
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dimension))
+        if self._vectors is not None and self._size:
+            grown[:self._size] = self._vectors[:self._size]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(tmp_path, self.vectors_path)
+        self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+        active = np.zeros(capacity, dtype=bool)
+        active[:len(self._active)] = self._active
+        self._active = active
+
+def _content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _read_texts(workspace: Path, paths: List[str]) -> Dict[str, str]:
+    texts = {}
+    for rel in paths:
+        try:
+            texts[rel] = (workspace / rel).read_text(encoding="utf-8", errors="replace")
+        except OSError as e:
+            print(f"Error reading {rel} for embedding: {str(e)}")
+    return texts
@@ -1,12 +1,20 @@
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Set, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-import ast
+import asyncio
+import codecs
+import dataclasses
+import mmap
+import os
 import re
 import json
 import yaml  # Ensure PyYAML is installed
 
+from .analysis_cache import AnalysisCache, analysis_cache
+from .python_extractor import extract_python
+
 @dataclass
 class FileMetadata:
     """File metadata information"""
@@ -42,14 +50,79 @@ class FileAnalysis:
     code_analysis: Optional[CodeAnalysis] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class BatchAnalysis:
+    """Result of FileAnalyzer.analyze_many"""
+    analyses: Dict[Path, FileAnalysis] = field(default_factory=dict)
+    errors: Dict[Path, str] = field(default_factory=dict)
+
+# Byte-order marks, longest first so UTF-32 LE is not mistaken for UTF-16 LE
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+def decode_bytes(raw: Any, candidates: List[str]) -> Tuple[str, str]:
+    """Detect the encoding of a byte buffer and decode it; returns (encoding, text)"""
+    head = bytes(raw[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            try:
+                return encoding, codecs.decode(raw, encoding)
+            except UnicodeDecodeError:
+                break
+    for encoding in candidates:
+        try:
+            return encoding, codecs.decode(raw, encoding)
+        except UnicodeDecodeError:
+            continue
+    return "utf-8", codecs.decode(raw, "utf-8", errors="replace")
+
+@dataclass
+class FileContent:
+    """Raw file bytes (a read-only mmap for large files) with lazily decoded text"""
+    raw: Any
+    encoding_detectors: List[str]
+    _encoding: Optional[str] = field(default=None, repr=False)
+    _text: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def encoding(self) -> str:
+        if self._encoding is None:
+            self._encoding, self._text = decode_bytes(self.raw, self.encoding_detectors)
+        return self._encoding
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._encoding, self._text = decode_bytes(self.raw, self.encoding_detectors)
+        return self._text
+
+    def close(self) -> None:
+        """Release the mmap backing a large file"""
+        if isinstance(self.raw, mmap.mmap):
+            self.raw.close()
+
 class FileAnalyzer:
     """
     Analyzes file content and structure.
     
     Supports multiple file types (Python, JavaScript, HTML, CSS, JSON, YAML).
+    Results are cached in the shared AnalysisCache unless another cache is
+    passed in (or ``use_cache=False``). ``analyze_many`` parses batches of
+    files in a process pool that is created on first use and kept until
+    ``close()``.
     """
     
-    def __init__(self):
+    def __init__(self,
+                 cache: Optional[AnalysisCache] = None,
+                 use_cache: bool = True,
+                 max_workers: Optional[int] = None,
+                 chunk_size: int = 32,
+                 min_parallel_files: int = 16):
         self.analyzers = {
             ".py": self._analyze_python,
             ".js": self._analyze_javascript,
@@ -60,28 +133,156 @@ class FileAnalyzer:
             ".yml": self._analyze_yaml
         }
         self.encoding_detectors = ["utf-8", "latin-1", "cp1252"]
+        self.mmap_threshold = 4 * 1024 * 1024
+        self.cache = (cache or analysis_cache) if use_cache else None
+        # Process pool settings for analyze_many()
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.min_parallel_files = min_parallel_files
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        """Shut down the process pool used by ``analyze_many``"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
     async def analyze_file(self, file_path: Union[str, Path]) -> FileAnalysis:
         """Analyze a file's content and structure."""
+        return self.analyze_file_sync(file_path)
+
+    def analyze_file_sync(self, file_path: Union[str, Path]) -> FileAnalysis:
+        """Blocking form of ``analyze_file``, for callers running it in a thread pool."""
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
         stat = path.stat()
         file_type = path.suffix.lower()
-        encoding = self._detect_encoding(path)
+        cache_key = digest = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(path, stat)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        content = self.read_content(path, stat.st_size)
+        try:
+            if self.cache is not None:
+                digest = self.cache.digest(content.raw, file_type)
+                cached = self.cache.get_by_digest(digest)
+                if cached is not None:
+                    cached = dataclasses.replace(
+                        cached,
+                        path=path,
+                        size=stat.st_size,
+                        created=datetime.fromtimestamp(stat.st_ctime),
+                        modified=datetime.fromtimestamp(stat.st_mtime)
+                    )
+                    self.cache.put(cache_key, digest, cached)
+                    return cached
+            analysis = self._analyze_content(path, stat, content)
+            if self.cache is not None:
+                self.cache.put(cache_key, digest, analysis)
+            return analysis
+        finally:
+            content.close()
+
+    async def analyze_many(self,
+                           file_paths: List[Union[str, Path]],
+                           max_workers: Optional[int] = None,
+                           chunk_size: Optional[int] = None) -> BatchAnalysis:
+        """
+        Analyze many files, fanning the parsing out to a process pool.
+
+        Cached results are served directly; the remaining files are submitted
+        in chunks with at most ``2 * max_workers`` chunks in flight, and the
+        results are added to the cache. The pool is shared by every call and
+        sized by the first one that needs it. Small batches are analyzed
+        in-process on a worker thread.
+        """
+        result = BatchAnalysis()
+        pending: List[Path] = []
+        for file_path in file_paths:
+            path = Path(file_path)
+            cached = None
+            if self.cache is not None:
+                try:
+                    cached = self.cache.get(self.cache.make_key(path, path.stat()))
+                except OSError as e:
+                    result.errors[path] = str(e)
+                    continue
+            if cached is not None:
+                result.analyses[path] = cached
+            else:
+                pending.append(path)
+
+        if len(pending) < self.min_parallel_files:
+            if pending:
+                await asyncio.to_thread(self._analyze_serial, pending, result)
+            return result
+
+        max_workers = max_workers or self.max_workers or os.cpu_count() or 1
+        chunk_size = chunk_size or self.chunk_size
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        loop = asyncio.get_running_loop()
+        pool = self._process_pool(max_workers)
+        in_flight: Set[asyncio.Future] = set()
+        for chunk in chunks:
+            if len(in_flight) >= 2 * max_workers:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                self._collect_chunks(done, result)
+            in_flight.add(loop.run_in_executor(
+                pool,
+                _analyze_chunk,
+                [str(path) for path in chunk],
+                self.encoding_detectors,
+                self.mmap_threshold
+            ))
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            self._collect_chunks(done, result)
+        return result
+
+    def _process_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        """The shared process pool, created on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        return self._pool
+
+    def _analyze_serial(self, paths: List[Path], result: BatchAnalysis) -> None:
+        """Analyze a small batch in the calling thread"""
+        for path in paths:
+            try:
+                result.analyses[path] = self.analyze_file_sync(path)
+            except Exception as e:
+                result.errors[path] = str(e)
+
+    def _collect_chunks(self, done: Set[asyncio.Future], result: BatchAnalysis) -> None:
+        """Merge finished worker chunks into the batch result and the cache"""
+        for future in done:
+            for path_str, cache_key, digest, analysis, error in future.result():
+                path = Path(path_str)
+                if error is not None:
+                    result.errors[path] = error
+                    continue
+                result.analyses[path] = analysis
+                if self.cache is not None:
+                    self.cache.put(cache_key, digest, analysis)
+
+    def _analyze_content(self, path: Path, stat: os.stat_result, content: FileContent) -> FileAnalysis:
+        """Build a FileAnalysis from already-read file content"""
+        file_type = path.suffix.lower()
         try:
-            with open(path, 'r', encoding=encoding) as f:
-                content = f.read()
-            line_count = len(content.splitlines())
+            text = content.text
+            line_count = len(text.splitlines())
             analyzer = self.analyzers.get(file_type)
-            code_analysis = await analyzer(content) if analyzer else None
+            code_analysis = analyzer(text) if analyzer else None
             return FileAnalysis(
                 path=path,
                 size=stat.st_size,
                 created=datetime.fromtimestamp(stat.st_ctime),
                 modified=datetime.fromtimestamp(stat.st_mtime),
                 file_type=file_type,
-                encoding=encoding,
+                encoding=content.encoding,
                 line_count=line_count,
                 code_analysis=code_analysis,
                 metadata={}
@@ -89,75 +290,61 @@ class FileAnalyzer:
         except Exception as e:
             raise RuntimeError(f"Analysis failed for {path}: {str(e)}")
 
+    def read_content(self, path: Path, size: Optional[int] = None) -> FileContent:
+        """
+        Read a file once into memory (mmap above ``mmap_threshold``).
+
+        Encoding detection and decoding both work on the returned buffer, and
+        callers needing the raw bytes can use ``FileContent.raw`` directly.
+        Call ``close()`` when done.
+        """
+        if size is None:
+            size = path.stat().st_size
+        with open(path, 'rb') as f:
+            if size >= self.mmap_threshold:
+                raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raw = f.read()
+        return FileContent(raw=raw, encoding_detectors=self.encoding_detectors)
+
     def _detect_encoding(self, path: Path) -> str:
         """Detect file encoding from a list of candidates."""
-        for enc in self.encoding_detectors:
-            try:
-                with open(path, 'r', encoding=enc) as f:
-                    f.read()
-                return enc
-            except UnicodeDecodeError:
-                continue
-        return "utf-8"  # Default encoding
+        content = self.read_content(path)
+        try:
+            return content.encoding
+        finally:
+            content.close()
 
-    async def _analyze_python(self, content: str) -> CodeAnalysis:
+    def _analyze_python(self, content: str) -> CodeAnalysis:
         """Analyze Python code: imports, classes, functions, complexity, and issues."""
+        extraction = extract_python(content)
+        if extraction.syntax_error is not None:
+            return CodeAnalysis(
+                imports=[],
+                classes=[],
+                functions=[],
+                dependencies=[],
+                complexity=0,
+                issues=[f"Syntax error: {str(extraction.syntax_error)}"],
+                metadata={}
+            )
         imports = []
-        classes = []
-        functions = []
-        dependencies = []
-        issues = []
-        try:
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    imports.extend(name.name for name in node.names)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.extend(f"{node.module}.{name.name}" for name in node.names)
-            for node in tree.body:
-                if isinstance(node, ast.ClassDef):
-                    classes.append(node.name)
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            functions.append(f"{node.name}.{item.name}")
-                elif isinstance(node, ast.FunctionDef):
-                    functions.append(node.name)
-            complexity = self._calculate_complexity(tree)
-            issues.extend(self._check_python_issues(tree))
-        except SyntaxError as e:
-            issues.append(f"Syntax error: {str(e)}")
+        for record in extraction.imports:
+            if record.name is None:
+                imports.append(record.module)
+            elif record.module:
+                imports.append(f"{record.module}.{record.name}")
         return CodeAnalysis(
             imports=list(set(imports)),
-            classes=classes,
-            functions=functions,
-            dependencies=dependencies,
-            complexity=complexity,
-            issues=issues,
-            metadata={}
+            classes=[c.name for c in extraction.classes if c.top_level],
+            functions=[f.qualname for f in extraction.functions if f.top_level],
+            dependencies=extraction.dependency_targets,
+            complexity=extraction.module_complexity,
+            issues=list(extraction.issues),
+            metadata={"docstrings": [doc[:500] for doc in extraction.docstrings]}
         )
 
-    def _calculate_complexity(self, tree: ast.AST) -> int:
-        """Calculate a simple complexity metric for Python code."""
-        complexity = 1
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.Try, ast.With, ast.ExceptHandler)):
-                complexity += 1
-        return complexity
-
-    def _check_python_issues(self, tree: ast.AST) -> List[str]:
-        """Check for common Python code issues."""
-        issues = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ExceptHandler) and node.type is None:
-                issues.append("Bare except found; consider catching specific exceptions")
-            if isinstance(node, ast.FunctionDef):
-                for default in node.args.defaults:
-                    if isinstance(default, (ast.List, ast.Dict, ast.Set)):
-                        issues.append(f"Mutable default argument in function {node.name}")
-        return issues
-
-    async def _analyze_javascript(self, content: str) -> CodeAnalysis:
+    def _analyze_javascript(self, content: str) -> CodeAnalysis:
         """Analyze JavaScript code."""
         import_pattern = r'(?:import|require)\s*\(?[\'"](.*?)[\'"]'
         func_pattern = r'(?:function|const|let|var)\s+(\w+)\s*(?:=)?\s*(?:function)?\s*\('
@@ -180,7 +367,7 @@ class FileAnalyzer:
             metadata={}
         )
 
-    async def _analyze_html(self, content: str) -> CodeAnalysis:
+    def _analyze_html(self, content: str) -> CodeAnalysis:
         """Analyze HTML content by extracting dependencies."""
         script_pattern = r'<script[^>]*src=[\'"]([^\'"]+)[\'"]'
         style_pattern = r'<link[^>]*href=[\'"]([^\'"]+)[\'"]'
@@ -200,7 +387,7 @@ class FileAnalyzer:
             metadata={}
         )
 
-    async def _analyze_css(self, content: str) -> CodeAnalysis:
+    def _analyze_css(self, content: str) -> CodeAnalysis:
         """Analyze CSS content by extracting selectors and properties."""
         selectors = {}
         current_selector = None
@@ -227,7 +414,7 @@ class FileAnalyzer:
             metadata={"selectors": selectors}
         )
 
-    async def _analyze_json(self, content: str) -> CodeAnalysis:
+    def _analyze_json(self, content: str) -> CodeAnalysis:
         """Analyze JSON content."""
         issues = []
         try:
@@ -246,7 +433,7 @@ class FileAnalyzer:
             metadata=metadata
         )
 
-    async def _analyze_yaml(self, content: str) -> CodeAnalysis:
+    def _analyze_yaml(self, content: str) -> CodeAnalysis:
         """Analyze YAML content."""
         issues = []
         try:
@@ -264,3 +451,31 @@ class FileAnalyzer:
             issues=issues,
             metadata=metadata
         )
+
+def _analyze_chunk(paths: List[str],
+                   encoding_detectors: List[str],
+                   mmap_threshold: int) -> List[Tuple[str, Any, Optional[str], Optional[FileAnalysis], Optional[str]]]:
+    """
+    Process pool worker: analyze a chunk of files without a cache.
+
+    Returns (path, cache key, digest, analysis, error) tuples, all picklable.
+    """
+    analyzer = FileAnalyzer(use_cache=False)
+    analyzer.encoding_detectors = encoding_detectors
+    analyzer.mmap_threshold = mmap_threshold
+
+    results = []
+    for path_str in paths:
+        path = Path(path_str)
+        try:
+            stat = path.stat()
+            content = analyzer.read_content(path, stat.st_size)
+            try:
+                digest = AnalysisCache.digest(content.raw, path.suffix.lower())
+                analysis = analyzer._analyze_content(path, stat, content)
+            finally:
+                content.close()
+            results.append((path_str, AnalysisCache.make_key(path, stat), digest, analysis, None))
+        except Exception as e:
+            results.append((path_str, None, None, None, str(e)))
+    return results
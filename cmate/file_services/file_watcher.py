@@ -1,9 +1,11 @@
 # src/file_services/file_watcher.py
-from typing import Dict, List, Optional, Any, Union, Callable
+from typing import Deque, Dict, List, Optional, Any, Union, Callable, Set, Tuple
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
 from pathlib import Path
+import threading
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
@@ -16,20 +18,73 @@ class FileChange:
     timestamp: datetime
     details: Optional[Dict[str, Any]] = None
 
+@dataclass
+class FileChangeBatch:
+    """Payload of a ``file_changed`` event: one batch of coalesced changes"""
+    workspace: Path
+    changes: List[FileChange]
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    @property
+    def paths(self) -> List[str]:
+        """Workspace-relative posix paths touched by the batch, including move sources"""
+        paths = []
+        for change in self.changes:
+            paths.append(Path(change.path).as_posix())
+            source = (change.details or {}).get("source_path") if change.event_type == "moved" else None
+            if source:
+                paths.append(Path(source).as_posix())
+        return paths
+
+    def to_builtin(self) -> Dict[str, Any]:
+        """JSON-friendly form for event transports; other processes only need the paths"""
+        return {"workspace": str(self.workspace), "paths": self.paths, "timestamp": self.timestamp.isoformat()}
+
+# Net effect of two consecutive events on the same path (None drops the path)
+COALESCED_EVENTS: Dict[Tuple[str, str], Optional[str]] = {
+    ("created", "created"): "created",
+    ("created", "modified"): "created",
+    ("created", "deleted"): None,
+    ("modified", "created"): "modified",
+    ("modified", "modified"): "modified",
+    ("modified", "deleted"): "deleted",
+    ("deleted", "created"): "modified",
+    ("deleted", "modified"): "modified",
+    ("deleted", "deleted"): "deleted"
+}
+
 class FileWatcher(FileSystemEventHandler):
-    """Watches for file system changes"""
-    
-    def __init__(self, workspace_path: Optional[str] = None):
+    """
+    Watches for file system changes.
+
+    Watchdog events arrive on the observer thread and are only coalesced
+    there: consecutive events on a path collapse into their net effect
+    (created+modified is a creation, created+deleted is nothing). A path is
+    released once it has been quiet for ``debounce_seconds`` (or pending for
+    ``max_delay_seconds``), and released changes are handed to the asyncio
+    loop as one batch. Batch handlers get the whole batch; per-type handlers
+    are still called once per coalesced change. The change log is a ring
+    buffer of the last ``max_changes`` changes.
+    """
+
+    def __init__(self,
+                 workspace_path: Optional[str] = None,
+                 debounce_seconds: float = 0.2,
+                 max_delay_seconds: float = 2.0,
+                 max_changes: int = 1000):
         super().__init__()
         self.workspace = Path(workspace_path) if workspace_path else Path("./Workspace")
         self.observer = Observer()
-        self.changes: List[FileChange] = []
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max(max_delay_seconds, debounce_seconds)
+        self.changes: Deque[FileChange] = deque(maxlen=max_changes)
         self.handlers: Dict[str, List[Callable]] = {
             "created": [],
             "modified": [],
             "deleted": [],
             "moved": []
         }
+        self.batch_handlers: List[Callable] = []
         self.watch_patterns: List[str] = []
         self.ignore_patterns: List[str] = [
             r'__pycache__',
@@ -37,88 +92,92 @@ class FileWatcher(FileSystemEventHandler):
             r'\.pytest_cache',
             r".*\.pyc"
         ]
+        self.stats = {"events": 0, "coalesced": 0, "batches": 0, "dispatched": 0}
         self._is_running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # path -> (coalesced change, first seen, last seen); guarded by _lock
+        self._pending: Dict[Path, Tuple[FileChange, float, float]] = {}
+        self._armed = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
 
     async def start_watching(self) -> None:
         """Start watching for changes"""
         if self._is_running:
             return
-            
+
+        self._loop = asyncio.get_running_loop()
         self._is_running = True
-        self.observer.schedule(self, str(self.workspace), recursive=True)
-        self.observer.start()
+        try:
+            self.observer.schedule(self, str(self.workspace), recursive=True)
+            self.observer.start()
+        except Exception:
+            self._is_running = False
+            self.observer = Observer()
+            raise
+        with self._lock:
+            arm = bool(self._pending) and not self._armed
+            self._armed = self._armed or arm
+        if arm:
+            self._schedule_flush()
 
     async def stop_watching(self) -> None:
         """Stop watching for changes"""
         if not self._is_running:
             return
-            
+
         self._is_running = False
         self.observer.stop()
         self.observer.join()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
 
     def on_created(self, event: FileSystemEvent) -> None:
         """Handle file creation event"""
         if not self._should_handle_event(event):
             return
-            
-        change = FileChange(
+        self._record(FileChange(
             path=Path(event.src_path).relative_to(self.workspace),
             event_type="created",
             timestamp=datetime.now()
-        )
-        self.changes.append(change)
-        
-        for handler in self.handlers["created"]:
-            asyncio.create_task(handler(change))
+        ))
 
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification event"""
-        if not self._should_handle_event(event):
+        # Directory mtimes change with every entry created inside them
+        if event.is_directory or not self._should_handle_event(event):
             return
-            
-        change = FileChange(
+        self._record(FileChange(
             path=Path(event.src_path).relative_to(self.workspace),
             event_type="modified",
             timestamp=datetime.now()
-        )
-        self.changes.append(change)
-        
-        for handler in self.handlers["modified"]:
-            asyncio.create_task(handler(change))
+        ))
 
     def on_deleted(self, event: FileSystemEvent) -> None:
         """Handle file deletion event"""
         if not self._should_handle_event(event):
             return
-            
-        change = FileChange(
+        self._record(FileChange(
             path=Path(event.src_path).relative_to(self.workspace),
             event_type="deleted",
             timestamp=datetime.now()
-        )
-        self.changes.append(change)
-        
-        for handler in self.handlers["deleted"]:
-            asyncio.create_task(handler(change))
+        ))
 
     def on_moved(self, event: FileSystemEvent) -> None:
         """Handle file move event"""
         if not self._should_handle_event(event):
             return
-            
-        change = FileChange(
+        self._record(FileChange(
             path=Path(event.dest_path).relative_to(self.workspace),
             event_type="moved",
             timestamp=datetime.now(),
             details={
                 "source_path": str(Path(event.src_path).relative_to(self.workspace))
             }
-        )
-        self.changes.append(change)
-        
-        for handler in self.handlers["moved"]:
-            asyncio.create_task(handler(change))
+        ))
 
     def add_handler(self, event_type: str, handler: Callable) -> None:
         """Add event handler"""
@@ -131,6 +190,23 @@ class FileWatcher(FileSystemEventHandler):
         if event_type in self.handlers:
             self.handlers[event_type].remove(handler)
 
+    def add_batch_handler(self, handler: Callable) -> None:
+        """Add a handler called with each batch (list) of coalesced changes"""
+        self.batch_handlers.append(handler)
+
+    def remove_batch_handler(self, handler: Callable) -> None:
+        """Remove batch handler"""
+        if handler in self.batch_handlers:
+            self.batch_handlers.remove(handler)
+
+    def publish_to(self, event_bus: Any, event_type: str = "file_changed", **publish_kwargs: Any) -> Callable:
+        """Publish every batch as a ``FileChangeBatch`` event on an EventBus; returns the batch handler"""
+        async def publish(batch: List[FileChange]) -> None:
+            await event_bus.publish(event_type, FileChangeBatch(self.workspace, batch), **publish_kwargs)
+
+        self.add_batch_handler(publish)
+        return publish
+
     def add_watch_pattern(self, pattern: str) -> None:
         """Add pattern to watch"""
         self.watch_patterns.append(pattern)
@@ -139,11 +215,11 @@ class FileWatcher(FileSystemEventHandler):
         """Add pattern to ignore"""
         self.ignore_patterns.append(pattern)
 
-    def get_changes(self, 
+    def get_changes(self,
                    limit: Optional[int] = None,
                    event_type: Optional[str] = None) -> List[FileChange]:
         """Get recorded changes"""
-        changes = self.changes
+        changes = list(self.changes)
         if event_type:
             changes = [c for c in changes if c.event_type == event_type]
         if limit:
@@ -154,21 +230,106 @@ class FileWatcher(FileSystemEventHandler):
         """Clear recorded changes"""
         self.changes.clear()
 
+    async def flush(self) -> List[FileChange]:
+        """Release every pending change now and wait for its handlers"""
+        with self._lock:
+            batch = [change for change, _, _ in self._pending.values()]
+            self._pending.clear()
+        tasks = self._dispatch(batch)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return batch
+
     def _should_handle_event(self, event: FileSystemEvent) -> bool:
         """Check if event should be handled"""
         path = Path(event.src_path)
-        
+
         # Check ignore patterns
         if any(path.match(pattern) for pattern in self.ignore_patterns):
             return False
-            
+
         # Check watch patterns
         if self.watch_patterns:
             return any(path.match(pattern) for pattern in self.watch_patterns)
-            
+
         return True
 
-    async def get_recent_changes(self, 
+    def _record(self, change: FileChange) -> None:
+        """Coalesce a change into the pending set (observer thread)"""
+        now = time.monotonic()
+        with self._lock:
+            self.stats["events"] += 1
+            first_seen = now
+            if change.event_type == "moved":
+                source = Path(change.details["source_path"])
+                moved = self._pending.pop(source, None)
+                if moved is not None:
+                    self.stats["coalesced"] += 1
+                    first_seen = moved[1]
+                    if moved[0].event_type == "created":
+                        change = FileChange(change.path, "created", change.timestamp)
+                    elif moved[0].event_type == "moved":
+                        change.details = dict(moved[0].details)
+            previous = self._pending.pop(change.path, None)
+            if previous is not None:
+                self.stats["coalesced"] += 1
+                first_seen = min(first_seen, previous[1])
+                change = _coalesce(previous[0], change)
+            if change is not None:
+                self._pending[change.path] = (change, first_seen, now)
+            arm = bool(self._pending) and not self._armed and self._loop is not None
+            self._armed = self._armed or arm
+        if arm:
+            try:
+                self._loop.call_soon_threadsafe(self._schedule_flush)
+            except RuntimeError:
+                # The loop has been closed; nothing is left to deliver to
+                with self._lock:
+                    self._armed = False
+
+    def _schedule_flush(self, delay: Optional[float] = None) -> None:
+        self._timer = self._loop.call_later(
+            self.debounce_seconds if delay is None else delay, self._flush_due
+        )
+
+    def _flush_due(self) -> None:
+        """Release paths that have settled and re-arm for the rest (loop thread)"""
+        now = time.monotonic()
+        with self._lock:
+            batch = []
+            next_due = None
+            for path, (change, first_seen, last_seen) in list(self._pending.items()):
+                due = min(last_seen + self.debounce_seconds, first_seen + self.max_delay_seconds)
+                if due <= now:
+                    batch.append(change)
+                    del self._pending[path]
+                elif next_due is None or due < next_due:
+                    next_due = due
+            self._armed = next_due is not None
+        self._timer = None
+        if next_due is not None:
+            self._schedule_flush(next_due - now)
+        self._dispatch(batch)
+
+    def _dispatch(self, batch: List[FileChange]) -> List[asyncio.Task]:
+        """Log a batch and start its handlers on the loop"""
+        if not batch:
+            return []
+        self.changes.extend(batch)
+        self.stats["batches"] += 1
+        self.stats["dispatched"] += len(batch)
+        tasks = [self._spawn(handler(batch)) for handler in self.batch_handlers]
+        for change in batch:
+            tasks.extend(self._spawn(handler(change)) for handler in self.handlers[change.event_type])
+        return tasks
+
+    def _spawn(self, coroutine: Any) -> asyncio.Task:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def get_recent_changes(self,
                                seconds: int = 60,
                                event_type: Optional[str] = None) -> List[FileChange]:
         """Get changes from last n seconds"""
@@ -179,3 +340,17 @@ class FileWatcher(FileSystemEventHandler):
             and (not event_type or change.event_type == event_type)
         ]
         return changes
+
+def _coalesce(previous: FileChange, change: FileChange) -> Optional[FileChange]:
+    """Net effect of ``previous`` followed by ``change`` on the same path"""
+    if previous.event_type == "moved":
+        if change.event_type == "deleted":
+            source = Path(previous.details["source_path"])
+            return FileChange(source, "deleted", change.timestamp)
+        return FileChange(change.path, "moved", change.timestamp, previous.details)
+    if change.event_type == "moved":
+        return change
+    event_type = COALESCED_EVENTS.get((previous.event_type, change.event_type), change.event_type)
+    if event_type is None:
+        return None
+    return FileChange(change.path, event_type, change.timestamp, change.details)
@@ -0,0 +1,223 @@
+# cmate/file_services/module_index.py
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pathlib import Path
+import json
+import os
+import threading
+
+MODULE_INDEX_VERSION = 1
+
+# Directory names treated as source roots (src-layout) when they are not packages
+SOURCE_ROOT_NAMES = ("src",)
+
+class ModuleIndex:
+    """
+    Table mapping dotted Python module names to workspace-relative files.
+
+    Built from the scan index rather than by probing the filesystem, so
+    resolving an import is a dictionary lookup. Modules are named relative
+    to the workspace root and to every ``src`` directory that is not itself
+    a package. When two files claim a name, the earlier root wins and a
+    package ``__init__.py`` wins over a same-named module, as in Python.
+    The table is persisted next to the scan index.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.files: Set[str] = set()
+        self.roots: List[str] = [""]
+        self.modules: Dict[str, str] = {}
+        self.signature = ""
+        self.ready = False
+        self._claims: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._lock = threading.RLock()
+
+    def sync(self,
+             all_files: Iterable[str],
+             added: Iterable[str],
+             removed: Iterable[str],
+             signature: str = "") -> bool:
+        """
+        Bring the table in line with a scan index refresh.
+
+        ``all_files`` is the full indexed file list and is only walked when
+        the table has to be rebuilt; otherwise the refresh diff is applied.
+        Returns whether the table changed.
+        """
+        with self._lock:
+            if not self.ready or signature != self.signature:
+                loaded = self.load(signature)
+                python_files = {rel for rel in all_files if rel.endswith(".py")}
+                if not loaded or len(python_files) != len(self.files):
+                    self.signature = signature
+                    self.build(python_files)
+                    self.save()
+                    return True
+            changed = self.update(added, removed)
+            if changed:
+                self.save()
+            return changed
+
+    def build(self, files: Iterable[str]) -> None:
+        """Rebuild the whole table from a list of relative posix paths"""
+        with self._lock:
+            self.files = {rel for rel in files if rel.endswith(".py")}
+            self.roots = self._find_roots(self.files)
+            self.modules.clear()
+            self._claims.clear()
+            for rel in self.files:
+                self._claim(rel)
+            self.ready = True
+
+    def update(self, added: Iterable[str], removed: Iterable[str]) -> bool:
+        """Apply added and removed files; falls back to a rebuild if the source roots change"""
+        with self._lock:
+            added = [rel for rel in added if rel.endswith(".py") and rel not in self.files]
+            removed = [rel for rel in removed if rel in self.files]
+            if not added and not removed:
+                return False
+            if any(_under_source_root(rel) for rel in added + removed):
+                files = (self.files | set(added)) - set(removed)
+                if self._find_roots(files) != self.roots:
+                    self.build(files)
+                    return True
+            for rel in removed:
+                self.files.discard(rel)
+                self._unclaim(rel)
+            for rel in added:
+                self.files.add(rel)
+                self._claim(rel)
+            return True
+
+    def resolve(self, name: str) -> Optional[str]:
+        """File providing an absolute module name"""
+        return self.modules.get(name)
+
+    def resolve_prefix(self, name: str, min_parts: int = 1) -> Optional[str]:
+        """
+        File for the longest importable prefix of a dotted name, so that
+        ``pkg.mod.Name`` resolves to ``pkg/mod.py`` and ``pkg.Name`` to the
+        package ``__init__.py``.
+        """
+        parts = name.split(".")
+        for end in range(len(parts), max(min_parts, 1) - 1, -1):
+            rel = self.modules.get(".".join(parts[:end]))
+            if rel is not None:
+                return rel
+        return None
+
+    def resolve_relative(self, target: str, importer: str) -> Optional[str]:
+        """Resolve a relative target such as ``..pkg.mod`` imported from a relative file path"""
+        absolute = self._absolute(target, importer)
+        if absolute is None:
+            return None
+        name, base_parts = absolute
+        return self.resolve_prefix(name, min_parts=max(base_parts, 1))
+
+    def absolute_name(self, target: str, importer: str) -> Optional[str]:
+        """Absolute dotted name of a (possibly relative) import target"""
+        if not target.startswith("."):
+            return target
+        absolute = self._absolute(target, importer)
+        return absolute[0] if absolute else None
+
+    def _absolute(self, target: str, importer: str) -> Optional[Tuple[str, int]]:
+        level = len(target) - len(target.lstrip("."))
+        rest = target[level:]
+        package = importer.split("/")[:-1]
+        if level - 1 > len(package):
+            return None
+        package = package[:len(package) - (level - 1)]
+        root = self._root_of(importer)
+        root_parts = root.split("/") if root else []
+        base = package[len(root_parts):]
+        name = ".".join(base + ([rest] if rest else []))
+        return (name, len(base)) if name else None
+
+    def module_names(self, rel: str) -> Set[str]:
+        """Every dotted name the given file can be imported as"""
+        return {name for name, _ in self._names(rel)}
+
+    def load(self, signature: str = "") -> bool:
+        """Load the table from disk; returns False when it is missing or stale"""
+        if not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != MODULE_INDEX_VERSION or data.get("signature") != signature:
+                return False
+            self.signature = signature
+            self.build(data.get("files", []))
+            return True
+        except Exception as e:
+            print(f"Error loading module index {self.index_path}: {str(e)}")
+            return False
+
+    def save(self) -> None:
+        """Write the table's file list to disk atomically"""
+        data = {
+            "version": MODULE_INDEX_VERSION,
+            "signature": self.signature,
+            "files": sorted(self.files)
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving module index {self.index_path}: {str(e)}")
+
+    def _find_roots(self, files: Set[str]) -> List[str]:
+        roots = set()
+        for rel in files:
+            parts = rel.split("/")[:-1]
+            for depth, part in enumerate(parts):
+                if part in SOURCE_ROOT_NAMES:
+                    root = "/".join(parts[:depth + 1])
+                    if f"{root}/__init__.py" not in files:
+                        roots.add(root)
+        return [""] + sorted(roots, key=lambda root: (root.count("/"), root))
+
+    def _root_of(self, rel: str) -> str:
+        best = ""
+        for root in self.roots:
+            if root and rel.startswith(root + "/") and len(root) > len(best):
+                best = root
+        return best
+
+    def _names(self, rel: str) -> Iterable[Tuple[str, Tuple[int, int]]]:
+        for index, root in enumerate(self.roots):
+            if root and not rel.startswith(root + "/"):
+                continue
+            parts = rel[len(root) + 1 if root else 0:-3].split("/")
+            is_package = parts[-1] == "__init__"
+            if is_package:
+                parts = parts[:-1]
+            if parts and all(part.isidentifier() for part in parts):
+                yield ".".join(parts), (index, 0 if is_package else 1)
+
+    def _claim(self, rel: str) -> None:
+        for name, priority in self._names(rel):
+            claims = self._claims.setdefault(name, {})
+            claims[rel] = priority
+            current = self.modules.get(name)
+            if current is None or priority < claims[current]:
+                self.modules[name] = rel
+
+    def _unclaim(self, rel: str) -> None:
+        for name, _ in self._names(rel):
+            claims = self._claims.get(name)
+            if not claims:
+                continue
+            claims.pop(rel, None)
+            if not claims:
+                del self._claims[name]
+                self.modules.pop(name, None)
+            elif self.modules.get(name) == rel:
+                self.modules[name] = min(claims, key=claims.get)
+
+def _under_source_root(rel: str) -> bool:
+    return any(part in SOURCE_ROOT_NAMES for part in rel.split("/")[:-1])
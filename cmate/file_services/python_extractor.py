@@ -0,0 +1,203 @@
+# cmate/file_services/python_extractor.py
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from functools import lru_cache
+import ast
+
+# Node types counted as branches by the complexity metrics
+BRANCH_NODES = (ast.If, ast.For, ast.While, ast.Try, ast.With, ast.ExceptHandler)
+
+@dataclass
+class ImportRecord:
+    """A single imported name (``name`` is None for plain ``import module``)"""
+    module: Optional[str]
+    name: Optional[str]
+    level: int = 0
+    lineno: int = 0
+
+    @property
+    def target(self) -> str:
+        """
+        Dotted name the import refers to, with leading dots for relative
+        imports. For ``from x import y`` this is ``x.y``, since ``y`` may be a
+        submodule; resolvers match the longest importable prefix.
+        """
+        if self.name is None:
+            return self.module or ""
+        base = "." * self.level + (self.module or "")
+        if self.name == "*":
+            return base
+        if self.module:
+            return f"{base}.{self.name}"
+        return base + self.name
+
+@dataclass
+class FunctionRecord:
+    """A function definition found in the tree"""
+    name: str
+    qualname: str
+    args: List[str]
+    complexity: int
+    node: ast.FunctionDef = field(repr=False)
+    class_name: Optional[str] = None
+    top_level: bool = False
+
+@dataclass
+class ClassRecord:
+    """A class definition found in the tree"""
+    name: str
+    node: ast.ClassDef = field(repr=False)
+    methods: List[FunctionRecord] = field(default_factory=list)
+    properties: List[str] = field(default_factory=list)
+    top_level: bool = False
+
+@dataclass
+class PythonExtraction:
+    """Everything collected from one traversal of a Python module"""
+    imports: List[ImportRecord] = field(default_factory=list)
+    classes: List[ClassRecord] = field(default_factory=list)
+    functions: List[FunctionRecord] = field(default_factory=list)
+    branch_count: int = 0
+    issues: List[str] = field(default_factory=list)
+    docstrings: List[str] = field(default_factory=list)
+    syntax_error: Optional[SyntaxError] = None
+    tree: Optional[ast.Module] = field(default=None, repr=False)
+
+    def new_syntax_error(self) -> SyntaxError:
+        """A fresh copy of the cached syntax error, so raising it never grows a shared traceback"""
+        e = self.syntax_error
+        return SyntaxError(e.msg, (e.filename, e.lineno, e.offset, e.text, e.end_lineno, e.end_offset))
+
+    @property
+    def module_complexity(self) -> int:
+        return 1 + self.branch_count
+
+    @property
+    def dependency_targets(self) -> List[str]:
+        """Unique import targets, in first-seen order"""
+        seen: Dict[str, None] = {}
+        for record in self.imports:
+            target = record.target
+            if target:
+                seen.setdefault(target, None)
+        return list(seen)
+
+class PythonExtractor(ast.NodeVisitor):
+    """
+    Collects imports, symbols, complexity, issues and dependency targets in a
+    single traversal of a Python AST.
+
+    Function complexity follows BackendValidator's metric (branches plus extra
+    boolean operands, including nested functions); module complexity follows
+    FileAnalyzer's (branches only).
+    """
+
+    def __init__(self):
+        self.result = PythonExtraction()
+        self._function_stack: List[FunctionRecord] = []
+        self._class_stack: List[ClassRecord] = []
+        self._depth = 0
+
+    def extract(self, tree: ast.Module) -> PythonExtraction:
+        self.result.tree = tree
+        self._add_docstring(tree)
+        for node in tree.body:
+            self.visit(node)
+        return self.result
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if isinstance(node, BRANCH_NODES):
+            self.result.branch_count += 1
+            for function in self._function_stack:
+                function.complexity += 1
+        elif isinstance(node, ast.BoolOp):
+            for function in self._function_stack:
+                function.complexity += len(node.values) - 1
+        self._depth += 1
+        super().generic_visit(node)
+        self._depth -= 1
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.result.imports.append(ImportRecord(module=alias.name, name=None, lineno=node.lineno))
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        for alias in node.names:
+            self.result.imports.append(ImportRecord(
+                module=node.module,
+                name=alias.name,
+                level=node.level or 0,
+                lineno=node.lineno
+            ))
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.type is None:
+            self.result.issues.append("Bare except found; consider catching specific exceptions")
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        record = ClassRecord(name=node.name, node=node, top_level=self._depth == 0)
+        self._add_docstring(node)
+        for item in node.body:
+            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+                record.properties.append(item.target.id)
+        self.result.classes.append(record)
+        self._class_stack.append(record)
+        depth = self._depth
+        self._depth = depth + 1
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                self._visit_function(item, record)
+            else:
+                self.visit(item)
+        for child in node.bases + node.keywords + node.decorator_list:
+            self.visit(child)
+        self._depth = depth
+        self._class_stack.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node, None)
+
+    def _visit_function(self, node: ast.FunctionDef, owner: Optional[ClassRecord]) -> None:
+        for default in node.args.defaults:
+            if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                self.result.issues.append(f"Mutable default argument in function {node.name}")
+        record = FunctionRecord(
+            name=node.name,
+            qualname=f"{owner.name}.{node.name}" if owner else node.name,
+            args=[arg.arg for arg in node.args.args],
+            complexity=1,
+            node=node,
+            class_name=owner.name if owner else None,
+            top_level=self._depth == 0 or (owner is not None and owner.top_level and self._depth == 1)
+        )
+        self.result.functions.append(record)
+        self._add_docstring(node)
+        if owner is not None:
+            owner.methods.append(record)
+        self._function_stack.append(record)
+        self.generic_visit(node)
+        self._function_stack.pop()
+
+    def _add_docstring(self, node: ast.AST) -> None:
+        docstring = ast.get_docstring(node)
+        if docstring:
+            self.result.docstrings.append(docstring)
+
+@lru_cache(maxsize=16)
+def extract_python(content: str) -> PythonExtraction:
+    """
+    Parse and extract a Python module in one pass.
+
+    Results are memoized by source text so the analyzer, validator and
+    dependency analyzer share one parse of the same content. The returned
+    object is shared and must be treated as read-only.
+    """
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        # Cached without its traceback, which would keep the parser frames alive
+        return PythonExtraction(syntax_error=e.with_traceback(None))
+    return PythonExtractor().extract(tree)
@@ -0,0 +1,231 @@
+# cmate/file_services/scan_index.py
+from typing import Dict, List, Optional, Callable, Set
+from dataclasses import dataclass, field
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+from ..utils.config import get_cache_dir
+
+INDEX_VERSION = 1
+
+@dataclass
+class FileFingerprint:
+    """Stat fingerprint of an indexed file"""
+    size: int
+    mtime_ns: int
+    ctime: float
+    inode: int
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result) -> "FileFingerprint":
+        return cls(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            ctime=stat.st_ctime,
+            inode=stat.st_ino
+        )
+
+@dataclass
+class DirectoryFingerprint:
+    """Cached listing of an indexed directory"""
+    mtime_ns: int
+    files: List[str] = field(default_factory=list)
+    dirs: List[str] = field(default_factory=list)
+
+@dataclass
+class IndexDiff:
+    """Changes detected by a scan index refresh (relative posix paths)"""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+class ScanIndex:
+    """
+    Persistent index of a workspace tree keyed by relative path.
+
+    Files are fingerprinted by size/mtime/inode and directories by mtime, so a
+    refresh only lists directories whose mtime changed. A directory's mtime
+    does not change when a file inside it is rewritten in place, so files in
+    unchanged directories are re-stat'd unless ``verify_files`` is disabled;
+    callers with an external change feed can use ``invalidate`` instead.
+    """
+
+    def __init__(self, workspace: Path, index_path: Optional[Path] = None):
+        self.workspace = Path(workspace)
+        self.index_path = Path(index_path) if index_path else self._default_index_path()
+        self.files: Dict[str, FileFingerprint] = {}
+        self.directories: Dict[str, DirectoryFingerprint] = {}
+        self.signature: str = ""
+        self._dirty: Set[str] = set()
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _default_index_path(self) -> Path:
+        digest = hashlib.sha1(str(self.workspace.resolve()).encode("utf-8")).hexdigest()[:16]
+        return get_cache_dir() / "scan_index" / f"{digest}.json"
+
+    def is_warm(self, signature: str = "") -> bool:
+        """Whether the index holds a usable listing (loading it from disk if needed)"""
+        with self._lock:
+            if not self._loaded:
+                self.load(signature)
+            return self.signature == signature and bool(self.directories)
+
+    def load(self, signature: str = "") -> None:
+        """Load the index from disk, discarding it if the ignore signature differs"""
+        self._loaded = True
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("signature") != signature:
+                return
+            self.files = {
+                rel: FileFingerprint(*values) for rel, values in data.get("files", {}).items()
+            }
+            self.directories = {
+                rel: DirectoryFingerprint(*values) for rel, values in data.get("directories", {}).items()
+            }
+            self.signature = signature
+        except Exception as e:
+            print(f"Error loading scan index {self.index_path}: {str(e)}")
+            self.files.clear()
+            self.directories.clear()
+
+    def save(self) -> None:
+        """Write the index to disk atomically"""
+        data = {
+            "version": INDEX_VERSION,
+            "workspace": str(self.workspace),
+            "signature": self.signature,
+            "files": {
+                rel: [fp.size, fp.mtime_ns, fp.ctime, fp.inode] for rel, fp in self.files.items()
+            },
+            "directories": {
+                rel: [d.mtime_ns, d.files, d.dirs] for rel, d in self.directories.items()
+            }
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving scan index {self.index_path}: {str(e)}")
+
+    def invalidate(self, paths: List[str]) -> None:
+        """Force the given relative paths (and their directories) to be re-read on next refresh"""
+        with self._lock:
+            for rel in paths:
+                rel = Path(rel).as_posix()
+                self._dirty.add(rel)
+                self.directories.pop(rel, None)
+                self.directories.pop(_parent(rel), None)
+
+    def refresh(self,
+                should_ignore: Callable[[str], bool],
+                signature: str = "",
+                verify_files: bool = True) -> IndexDiff:
+        """Bring the index up to date with the filesystem and return what changed"""
+        with self._lock:
+            return self._refresh(should_ignore, signature, verify_files)
+
+    def _refresh(self,
+                 should_ignore: Callable[[str], bool],
+                 signature: str,
+                 verify_files: bool) -> IndexDiff:
+        if not self._loaded:
+            self.load(signature)
+        if signature != self.signature:
+            self.files.clear()
+            self.directories.clear()
+            self.signature = signature
+
+        diff = IndexDiff()
+        files: Dict[str, FileFingerprint] = {}
+        directories: Dict[str, DirectoryFingerprint] = {}
+        stack = [""]
+
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                dir_stat = os.stat(self.workspace / rel_dir)
+            except OSError:
+                continue
+
+            cached = self.directories.get(rel_dir)
+            if cached is not None and cached.mtime_ns == dir_stat.st_mtime_ns:
+                listing = cached
+                listing_changed = False
+            else:
+                listing = self._list_directory(rel_dir, dir_stat.st_mtime_ns, should_ignore)
+                listing_changed = True
+            directories[rel_dir] = listing
+
+            for name in listing.files:
+                rel = _join(rel_dir, name)
+                previous = self.files.get(rel)
+                if previous is not None and not listing_changed and not verify_files and rel not in self._dirty:
+                    files[rel] = previous
+                    continue
+                try:
+                    fingerprint = FileFingerprint.from_stat(os.stat(self.workspace / rel))
+                except OSError:
+                    continue
+                files[rel] = fingerprint
+                if previous is None:
+                    diff.added.append(rel)
+                elif previous != fingerprint:
+                    diff.modified.append(rel)
+
+            stack.extend(_join(rel_dir, name) for name in listing.dirs)
+
+        diff.removed = [rel for rel in self.files if rel not in files]
+        directories_changed = directories.keys() != self.directories.keys() or any(
+            self.directories[rel] is not listing for rel, listing in directories.items()
+        )
+        self.files = files
+        self.directories = directories
+        self._dirty.clear()
+        if diff.has_changes or directories_changed:
+            self.save()
+        return diff
+
+    def _list_directory(self,
+                        rel_dir: str,
+                        mtime_ns: int,
+                        should_ignore: Callable[[str], bool]) -> DirectoryFingerprint:
+        """List a directory, splitting entries into files and subdirectories"""
+        listing = DirectoryFingerprint(mtime_ns=mtime_ns)
+        try:
+            with os.scandir(self.workspace / rel_dir) as entries:
+                for entry in entries:
+                    if should_ignore(entry.name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            listing.dirs.append(entry.name)
+                        elif entry.is_file():
+                            listing.files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Error scanning directory {rel_dir or '.'}: {str(e)}")
+        listing.files.sort()
+        listing.dirs.sort()
+        return listing
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+def _parent(rel: str) -> str:
+    return rel.rsplit("/", 1)[0] if "/" in rel else ""
@@ -0,0 +1,212 @@
+# cmate/file_services/symbol_index.py
+from typing import Dict, Iterable, List, Mapping, Optional, Any, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import math
+import os
+import re
+import threading
+
+SYMBOL_INDEX_VERSION = 1
+
+# Relative weight of a term occurrence per field (BM25F-style)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "path": 1.0,
+    "symbol": 2.0,
+    "import": 0.5,
+    "doc": 1.0
+}
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into",
+    "is", "it", "of", "on", "or", "the", "this", "that", "to", "with"
+})
+
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+_SUBWORD_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking snake_case and CamelCase identifiers"""
+    terms = []
+    for word in _WORD_PATTERN.findall(text):
+        for part in _SUBWORD_PATTERN.findall(word):
+            term = part.lower()
+            if len(term) > 1 and term not in STOPWORDS:
+                terms.append(term)
+    return terms
+
+@dataclass
+class IndexedDocument:
+    """Terms indexed for one file and the fingerprint they were built from"""
+    fingerprint: Tuple[int, int]
+    terms: Dict[str, float] = field(default_factory=dict)
+    length: float = 0.0
+
+class SymbolIndex:
+    """
+    Inverted index of workspace files for request relevance.
+
+    Documents are workspace-relative paths. Terms come from the path and,
+    when a ``FileAnalysis`` is available, from class/function names,
+    imports and docstrings, each weighted per field. Queries are scored
+    with BM25 and only touch the postings of the query terms.
+    """
+
+    def __init__(self, index_path: Optional[Path] = None, k1: float = 1.2, b: float = 0.75):
+        self.index_path = Path(index_path) if index_path else None
+        self.k1 = k1
+        self.b = b
+        self.documents: Dict[str, IndexedDocument] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.total_length = 0.0
+        self.ready = False
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def document_terms(rel: str, analysis: Optional[Any] = None) -> Dict[str, float]:
+        """Weighted term frequencies for a file"""
+        terms: Dict[str, float] = {}
+
+        def add(text: str, field_name: str) -> None:
+            weight = FIELD_WEIGHTS[field_name]
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0.0) + weight
+
+        path = Path(rel)
+        add(path.stem, "name")
+        add(" ".join(path.parts[:-1]), "path")
+        code_analysis = getattr(analysis, "code_analysis", None)
+        if code_analysis is not None:
+            for name in code_analysis.classes + code_analysis.functions:
+                add(name, "symbol")
+            for name in code_analysis.imports:
+                add(name, "import")
+            for docstring in code_analysis.metadata.get("docstrings", []):
+                add(docstring, "doc")
+        return terms
+
+    def add(self, rel: str, fingerprint: Tuple[int, int], analysis: Optional[Any] = None) -> None:
+        """Index (or re-index) one file"""
+        terms = self.document_terms(rel, analysis)
+        with self._lock:
+            self._remove(rel)
+            document = IndexedDocument(fingerprint=tuple(fingerprint), terms=terms, length=sum(terms.values()))
+            self._insert(rel, document)
+
+    def remove(self, rel: str) -> None:
+        with self._lock:
+            self._remove(rel)
+
+    def stale(self, files: Mapping[str, Tuple[int, int]]) -> List[str]:
+        """
+        Files whose fingerprint differs from the indexed one, or that are not
+        indexed yet. The persisted index is loaded on the first call, so
+        scan batches can be checked as they arrive.
+        """
+        with self._lock:
+            if not self.ready:
+                self.load()
+                self.ready = True
+            return [
+                rel for rel, fingerprint in files.items()
+                if rel not in self.documents or self.documents[rel].fingerprint != tuple(fingerprint)
+            ]
+
+    def missing(self, files: Iterable[str]) -> List[str]:
+        """Indexed files that are not in ``files``"""
+        seen = set(files)
+        with self._lock:
+            return [rel for rel in self.documents if rel not in seen]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Files matching any query term, best BM25 score first"""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self.documents)
+            if not terms or not count:
+                return []
+            average_length = self.total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for rel, frequency in postings.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self.documents[rel].length / average_length)
+                    scores[rel] = scores.get(rel, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self.documents),
+                "terms": len(self.postings),
+                "postings": sum(len(postings) for postings in self.postings.values())
+            }
+
+    def load(self) -> bool:
+        """Load persisted documents and rebuild the postings"""
+        if self.index_path is None or not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != SYMBOL_INDEX_VERSION:
+                return False
+            with self._lock:
+                self.documents.clear()
+                self.postings.clear()
+                self.total_length = 0.0
+                for rel, (fingerprint, terms) in data.get("documents", {}).items():
+                    self._insert(rel, IndexedDocument(
+                        fingerprint=tuple(fingerprint),
+                        terms=terms,
+                        length=sum(terms.values())
+                    ))
+            return True
+        except Exception as e:
+            print(f"Error loading symbol index {self.index_path}: {str(e)}")
+            return False
+
+    def save(self) -> None:
+        """Write the indexed documents to disk atomically"""
+        if self.index_path is None:
+            return
+        with self._lock:
+            data = {
+                "version": SYMBOL_INDEX_VERSION,
+                "documents": {
+                    rel: [list(document.fingerprint), document.terms]
+                    for rel, document in self.documents.items()
+                }
+            }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving symbol index {self.index_path}: {str(e)}")
+
+    def _insert(self, rel: str, document: IndexedDocument) -> None:
+        self.documents[rel] = document
+        self.total_length += document.length
+        for term, frequency in document.terms.items():
+            self.postings.setdefault(term, {})[rel] = frequency
+
+    def _remove(self, rel: str) -> None:
+        document = self.documents.pop(rel, None)
+        if document is None:
+            return
+        self.total_length -= document.length
+        for term in document.terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(rel, None)
+                if not postings:
+                    del self.postings[term]
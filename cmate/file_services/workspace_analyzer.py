@@ -14,10 +14,22 @@ class WorkspaceAnalyzer:
     - Classifies components (e.g. FRONTEND, BACKEND, TEST, CONFIGURATION).
     - Identifies file dependencies.
     """
-    def __init__(self, workspace_path: Optional[str] = None):
+    def __init__(self,
+                 workspace_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 chunk_size: int = 32,
+                 min_parallel_files: int = 16):
         self.workspace_path = Path(workspace_path) if workspace_path else Path("./Workspace")
         self.scanner = WorkspaceScanner(str(self.workspace_path))
-        self.file_analyzer = FileAnalyzer()
+        self.file_analyzer = FileAnalyzer(
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            min_parallel_files=min_parallel_files
+        )
+
+    def close(self) -> None:
+        """Shut down the file analyzer's process pool"""
+        self.file_analyzer.close()
 
     async def analyze_for_request(self, request: str, workspace_path: Path) -> Dict[str, Any]:
         """
@@ -28,19 +40,26 @@ class WorkspaceAnalyzer:
           - A mapping of file paths to their classified component type.
           - A mapping of file paths to their dependencies.
         """
-        scan_result = await self.scanner.scan_workspace()
+        scan_result = (await self.scanner.scan_incremental()).result
         relevant_files = []
         classifications = {}
         dependencies = {}
 
-        for file_info in scan_result.files:
+        keywords = request.lower().split()
+        candidates = [
             # A simple heuristic: consider the file relevant if any keyword from the request appears in the file name.
-            if any(keyword in file_info.path.name.lower() for keyword in request.lower().split()):
-                relevant_files.append(file_info.path)
-                component_type = await self.identify_component_type(file_info.path)
-                classifications[str(file_info.path)] = component_type
-                deps = await self.get_dependencies(file_info.path)
-                dependencies[str(file_info.path)] = [str(dep) for dep in deps]
+            file_info for file_info in scan_result.files
+            if any(keyword in file_info.path.name.lower() for keyword in keywords)
+        ]
+        # Parse all candidates up front (in parallel) so the per-file steps below hit the analysis cache
+        await self.file_analyzer.analyze_many([self.workspace_path / f.path for f in candidates])
+
+        for file_info in candidates:
+            relevant_files.append(file_info.path)
+            component_type = await self.identify_component_type(file_info.path)
+            classifications[str(file_info.path)] = component_type
+            deps = await self.get_dependencies(file_info.path)
+            dependencies[str(file_info.path)] = [str(dep) for dep in deps]
 
         return {
             "relevant_files": [str(p) for p in relevant_files],
@@ -72,7 +91,7 @@ class WorkspaceAnalyzer:
         For Python files, this can use the imports list from the FileAnalyzer.
         For other file types, additional logic can be added.
         """
-        analysis = await self.file_analyzer.analyze_file(file_path)
+        analysis = await self.file_analyzer.analyze_file(self.workspace_path / file_path)
         if file_path.suffix.lower() == ".py" and analysis.code_analysis:
             # Return dependencies as a list of (possibly unresolved) import names.
             return [Path(imp) for imp in analysis.code_analysis.imports]
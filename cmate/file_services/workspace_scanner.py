@@ -1,10 +1,17 @@
 # cmate/file_services/workspace_scanner.py
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Any, Pattern, Tuple, Union
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-import re
+import hashlib
+import os
 import asyncio
+import threading
+
+from .directory_walker import DirectoryWalker, compile_ignore_patterns
+from .module_index import ModuleIndex
+from .scan_index import IndexDiff, ScanIndex
 
 @dataclass
 class FileInfo:
@@ -26,10 +33,26 @@ class ScanResult:
     file_types: Dict[str, int]
     metadata: Dict[str, Any]
 
+@dataclass
+class ScanDiff:
+    """Result of an incremental workspace scan"""
+    result: ScanResult
+    added: List[Path] = field(default_factory=list)
+    modified: List[Path] = field(default_factory=list)
+    removed: List[Path] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
 class WorkspaceScanner:
     """Scans workspace directory structure"""
     
-    def __init__(self, workspace_path: Optional[str] = None):
+    def __init__(self,
+                 workspace_path: Optional[str] = None,
+                 index_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 history_limit: int = 10):
         self.workspace = Path(workspace_path) if workspace_path else Path("./Workspace")
         self.ignored_patterns = [
             r'__pycache__',
@@ -39,7 +62,14 @@ class WorkspaceScanner:
             r".*\.pyc",
             r".*\.pyo"
         ]
-        self.scan_history: List[ScanResult] = []
+        self.scan_history: Deque[ScanResult] = deque(maxlen=history_limit)
+        self.index = ScanIndex(self.workspace, Path(index_path) if index_path else None)
+        self.modules = ModuleIndex(self.index.index_path.with_suffix(".modules.json"))
+        self._file_infos: Dict[str, FileInfo] = {}
+        self._last_incremental: Optional[ScanResult] = None
+        self._ignore_cache: Tuple[Tuple[str, ...], Optional[Pattern]] = ((), None)
+        self.max_workers = max_workers
+        self._index_warmup: Optional[asyncio.Future] = None
 
     async def scan_workspace(self, 
                            max_depth: Optional[int] = None,
@@ -50,29 +80,10 @@ class WorkspaceScanner:
         file_types_count = {}
         
         try:
-            for file_path in self._scan_files(max_depth, file_types):
-                try:
-                    stat = file_path.stat()
-                    file_type = file_path.suffix.lower()[1:] if file_path.suffix else "unknown"
-                    
-                    # Update statistics
-                    total_size += stat.st_size
-                    file_types_count[file_type] = file_types_count.get(file_type, 0) + 1
-                    
-                    # Create file info
-                    file_info = FileInfo(
-                        path=file_path.relative_to(self.workspace),
-                        size=stat.st_size,
-                        created=datetime.fromtimestamp(stat.st_ctime),
-                        modified=datetime.fromtimestamp(stat.st_mtime),
-                        file_type=file_type,
-                        content_type=self._get_content_type(file_path)
-                    )
-                    
-                    files.append(file_info)
-                    
-                except Exception as e:
-                    print(f"Error processing file {file_path}: {str(e)}")
+            for file_info in self.iter_files(max_depth, file_types):
+                total_size += file_info.size
+                file_types_count[file_info.file_type] = file_types_count.get(file_info.file_type, 0) + 1
+                files.append(file_info)
                     
             result = ScanResult(
                 timestamp=datetime.now(),
@@ -92,32 +103,209 @@ class WorkspaceScanner:
         except Exception as e:
             raise RuntimeError(f"Workspace scan failed: {str(e)}")
 
-    def _scan_files(self, max_depth: Optional[int], file_types: Optional[List[str]]) -> List[Path]:
-        """Generator for scanning files"""
-        def should_ignore(path: Path) -> bool:
-            return any(re.match(pattern, str(path)) for pattern in self.ignored_patterns)
-            
-        def scan_directory(path: Path, current_depth: int) -> List[Path]:
-            if max_depth and current_depth > max_depth:
-                return []
-                
+    async def scan_incremental(self,
+                               max_depth: Optional[int] = None,
+                               file_types: Optional[List[str]] = None,
+                               verify_files: bool = True) -> ScanDiff:
+        """
+        Scan workspace using the persistent scan index.
+
+        Only directories whose mtime changed are listed again. When nothing
+        changed and the filters match the previous call, the cached
+        ScanResult is returned as-is.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            diff = await loop.run_in_executor(None, self._refresh_index, verify_files)
+            for rel in diff.removed + diff.modified:
+                self._file_infos.pop(rel, None)
+
+            previous = self._last_incremental
+            if (previous is not None
+                    and not diff.has_changes
+                    and previous.metadata.get("max_depth") == max_depth
+                    and previous.metadata.get("file_types") == file_types):
+                return ScanDiff(result=previous)
+
             files = []
+            total_size = 0
+            file_types_count = {}
+            for rel, fingerprint in self.index.files.items():
+                rel_path = Path(rel)
+                if max_depth and len(rel_path.parts) - 1 > max_depth:
+                    continue
+                file_type = rel_path.suffix.lower()[1:] if rel_path.suffix else "unknown"
+                if file_types and (not rel_path.suffix or file_type not in file_types):
+                    continue
+                file_info = self._file_infos.get(rel)
+                if file_info is None:
+                    file_info = FileInfo(
+                        path=rel_path,
+                        size=fingerprint.size,
+                        created=datetime.fromtimestamp(fingerprint.ctime),
+                        modified=datetime.fromtimestamp(fingerprint.mtime_ns / 1e9),
+                        file_type=file_type,
+                        content_type=self._get_content_type(rel_path),
+                        metadata={"inode": fingerprint.inode, "mtime_ns": fingerprint.mtime_ns}
+                    )
+                    self._file_infos[rel] = file_info
+                total_size += fingerprint.size
+                file_types_count[file_type] = file_types_count.get(file_type, 0) + 1
+                files.append(file_info)
+
+            result = ScanResult(
+                timestamp=datetime.now(),
+                files=files,
+                total_size=total_size,
+                file_types=file_types_count,
+                metadata={
+                    "workspace": str(self.workspace),
+                    "max_depth": max_depth,
+                    "file_types": file_types,
+                    "incremental": True
+                }
+            )
+            self._last_incremental = result
+            self.scan_history.append(result)
+            return ScanDiff(
+                result=result,
+                added=[Path(rel) for rel in diff.added],
+                modified=[Path(rel) for rel in diff.modified],
+                removed=[Path(rel) for rel in diff.removed]
+            )
+
+        except Exception as e:
+            raise RuntimeError(f"Incremental workspace scan failed: {str(e)}")
+
+    async def iter_workspace(self,
+                             max_depth: Optional[int] = None,
+                             file_types: Optional[List[str]] = None,
+                             batch_size: int = 256) -> AsyncIterator[List[FileInfo]]:
+        """
+        Yield batches of FileInfo as they are discovered.
+
+        With a warm scan index the cached file list is refreshed incrementally
+        and yielded in chunks. Otherwise the tree is walked on a background
+        thread and each batch is yielded as soon as it is available, so callers
+        can start working on the first files while the walk continues; the
+        index is then warmed in the background for the next call.
+        """
+        loop = asyncio.get_running_loop()
+        index_warm = await loop.run_in_executor(None, self.index.is_warm, self._ignore_signature())
+        if index_warm:
+            files = (await self.scan_incremental(max_depth, file_types)).result.files
+            for start in range(0, len(files), batch_size):
+                yield files[start:start + batch_size]
+            return
+
+        batches: asyncio.Queue = asyncio.Queue(maxsize=64)
+        stop = threading.Event()
+        done = object()
+
+        def produce() -> None:
+            walk = self._walker().walk_batches(max_depth, file_types)
             try:
-                for item in path.iterdir():
-                    if should_ignore(item):
-                        continue
-                        
-                    if item.is_file():
-                        if not file_types or (item.suffix and item.suffix[1:].lower() in file_types):
-                            files.append(item)
-                    elif item.is_dir():
-                        files.extend(scan_directory(item, current_depth + 1))
-            except Exception as e:
-                print(f"Error scanning directory {path}: {str(e)}")
-                
-            return files
-            
-        return scan_directory(self.workspace, 0)
+                for directory_batch in walk:
+                    if stop.is_set():
+                        break
+                    asyncio.run_coroutine_threadsafe(batches.put(directory_batch), loop).result()
+            finally:
+                walk.close()
+                if not stop.is_set():
+                    asyncio.run_coroutine_threadsafe(batches.put(done), loop).result()
+
+        producer = loop.run_in_executor(None, produce)
+        completed = False
+        try:
+            while not completed:
+                # Coalesce whatever directory batches are already queued
+                batch: List[FileInfo] = []
+                item = await batches.get()
+                while True:
+                    if item is done:
+                        completed = True
+                        break
+                    batch.extend(item)
+                    if len(batch) >= batch_size or batches.empty():
+                        break
+                    item = batches.get_nowait()
+                if batch:
+                    yield batch
+            await producer
+        finally:
+            if not completed:
+                stop.set()
+                while not producer.done():
+                    try:
+                        batches.get_nowait()
+                    except asyncio.QueueEmpty:
+                        await asyncio.sleep(0.01)
+        if completed and self._index_warmup is None:
+            self._index_warmup = loop.run_in_executor(None, self._refresh_index)
+
+    async def ensure_module_index(self) -> ModuleIndex:
+        """Module table for import resolution, refreshing the scan index if it was never built"""
+        if self._index_warmup is not None:
+            await self._index_warmup
+        if not self.modules.ready:
+            await asyncio.get_running_loop().run_in_executor(None, self._refresh_index)
+        return self.modules
+
+    def register_invalidation(self, registry: Any) -> Any:
+        """Mark changed paths dirty in the scan index so the next refresh re-reads only them"""
+        return registry.register(
+            "workspace_scan",
+            lambda keys, paths: self.index.invalidate(sorted(paths)),
+            globs=["*"]
+        )
+
+    def _refresh_index(self, verify_files: bool = True) -> IndexDiff:
+        """Refresh the scan index and apply the changes to the module table"""
+        signature = self._ignore_signature()
+        diff = self.index.refresh(self._should_ignore_name, signature, verify_files)
+        self.modules.sync(self.index.files, diff.added, diff.removed, signature)
+        return diff
+
+    def _should_ignore_name(self, name: str) -> bool:
+        """Check a single path component against the ignore patterns"""
+        patterns = tuple(self.ignored_patterns)
+        if patterns != self._ignore_cache[0]:
+            self._ignore_cache = (patterns, compile_ignore_patterns(list(patterns)))
+        regex = self._ignore_cache[1]
+        return regex is not None and regex.fullmatch(name) is not None
+
+    def _ignore_signature(self) -> str:
+        """Fingerprint of the ignore patterns, used to invalidate a stale scan index"""
+        return hashlib.sha1("\n".join(self.ignored_patterns).encode("utf-8")).hexdigest()
+
+    def iter_files(self,
+                   max_depth: Optional[int] = None,
+                   file_types: Optional[List[str]] = None) -> Iterator[FileInfo]:
+        """Stream FileInfo objects from a parallel os.scandir walk of the workspace"""
+        return self._walker().walk(max_depth, file_types)
+
+    def _walker(self) -> DirectoryWalker:
+        """Create a directory walker configured for this workspace"""
+        return DirectoryWalker(
+            self.workspace,
+            build_entry=self._file_info_from_entry,
+            ignore_patterns=self.ignored_patterns,
+            max_workers=self.max_workers
+        )
+
+    def _file_info_from_entry(self, entry: os.DirEntry, file_type: str) -> FileInfo:
+        """Build FileInfo from a directory entry using its cached stat data"""
+        stat = entry.stat()
+        path = Path(os.path.relpath(entry.path, self.workspace))
+        return FileInfo(
+            path=path,
+            size=stat.st_size,
+            created=datetime.fromtimestamp(stat.st_ctime),
+            modified=datetime.fromtimestamp(stat.st_mtime),
+            file_type=file_type,
+            content_type=self._get_content_type(path),
+            metadata={"mtime_ns": stat.st_mtime_ns}
+        )
 
     def _get_content_type(self, file_path: Path) -> Optional[str]:
         """Determine content type of file"""
@@ -7,7 +7,7 @@ It defines ModelProvider, ModelConfig, and ModelResponse,
 and an LLMManager class that initializes clients based on environment variables.
 """
 
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 from enum import Enum
 import os
 from datetime import datetime
@@ -87,6 +87,11 @@ class LLMManager:
                 provider=ModelProvider.LM_STUDIO,
                 model_name=os.getenv("LM_STUDIO_MODEL", "model-identifier"),
                 api_base=os.getenv("LM_STUDIO_BASE_URL", "http://localhost:1234/v1")
+            ),
+            "lm-studio-embedding": ModelConfig(
+                provider=ModelProvider.LM_STUDIO,
+                model_name=os.getenv("LM_STUDIO_EMBEDDING_MODEL", "text-embedding-nomic-embed-text-v1.5@q4_k_m"),
+                api_base=os.getenv("LM_STUDIO_BASE_URL", "http://localhost:1234/v1")
             )
         }
 
@@ -163,6 +168,31 @@ class LLMManager:
         except Exception as e:
             raise Exception(f"Error generating response with {model_name}: {str(e)}")
 
+    async def embed(
+        self,
+        texts: List[str],
+        model_name: Optional[str] = None,
+        batch_size: int = 32
+    ) -> List[List[float]]:
+        """Embed texts with an OpenAI-compatible embeddings endpoint, batch_size inputs per request"""
+        model_name = model_name or "lm-studio-embedding"
+        model_config = self.models[model_name]
+        if model_config.provider not in (ModelProvider.LM_STUDIO, ModelProvider.OPENAI):
+            raise ValueError(f"Provider {model_config.provider} does not support embeddings")
+        client = self.clients[model_config.provider]
+        vectors: List[List[float]] = []
+        try:
+            for start in range(0, len(texts), batch_size):
+                response = await asyncio.to_thread(
+                    client.embeddings.create,
+                    model=model_config.model_name,
+                    input=texts[start:start + batch_size]
+                )
+                vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+            return vectors
+        except Exception as e:
+            raise Exception(f"Error generating embeddings with {model_name}: {str(e)}")
+
     async def _generate_anthropic_response(self, messages, model_config: ModelConfig, **kwargs):
         client = self.clients[ModelProvider.ANTHROPIC]
         return await client.messages.create(
@@ -4,6 +4,10 @@ from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import pickle
+import sys
+
+from .eviction import EvictionPolicy, make_policy
+from .log_store import LogStore
 
 @dataclass
 class CacheItem:
@@ -14,38 +18,82 @@ class CacheItem:
     expires_at: Optional[datetime]
     metadata: Dict[str, Any] = field(default_factory=dict)
     access_count: int = 0
+    size_bytes: int = 0
 
 class CacheManager:
     """
     Manages temporary data caching.
     
-    If a cache directory is provided, items are stored persistently using pickle.
+    If a cache directory is provided, items are pickled into a single
+    append-only ``LogStore`` file in it. Only the store's key index is read
+    at startup; items are loaded into memory on their first ``get``.
+
+    The cache is bounded by ``max_size`` items and, optionally, by
+    ``max_memory_bytes``. Item sizes are measured once when they are set and
+    the total is kept incrementally. Victims come from a pluggable eviction
+    policy (``lru``, ``lfu`` or ``tinylfu``, see ``storage.eviction``).
     """
     
-    def __init__(self, cache_dir: Optional[str] = None, max_size: int = 1000, default_ttl: Optional[int] = None):
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 max_size: int = 1000,
+                 default_ttl: Optional[int] = None,
+                 eviction_policy: Union[str, EvictionPolicy] = "lfu",
+                 max_memory_bytes: Optional[int] = None):
         self.cache_dir = Path(cache_dir) if cache_dir else Path("temp/cache")
         self.max_size = max_size
+        self.max_memory_bytes = max_memory_bytes
         self.default_ttl = default_ttl
         self.cache: Dict[str, CacheItem] = {}
+        self.policy = make_policy(eviction_policy, max_size) if isinstance(eviction_policy, str) else eviction_policy
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "rejections": 0}
+        self._memory_bytes = 0
         self.persistent: bool = cache_dir is not None
+        self.store: Optional[LogStore] = None
+        self._invalidation: Optional[Any] = None
+        self._invalidation_id: Optional[Any] = None
         self._initialize_cache()
 
     def _initialize_cache(self) -> None:
-        """Initialize the cache system and load persistent items if needed"""
+        """Initialize the cache system and open the persistent store if needed"""
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         if self.persistent:
-            self._load_persistent_cache()
+            self.store = LogStore(self.cache_dir / "cache.log")
+            self._migrate_legacy_files()
 
-    def _load_persistent_cache(self) -> None:
-        """Load persistent cache items from disk"""
+    def _migrate_legacy_files(self) -> None:
+        """Move items from the old one-file-per-key layout into the log store"""
         for cache_file in self.cache_dir.glob("*.cache"):
             try:
-                with open(cache_file, 'rb') as f:
-                    item = pickle.load(f)
-                    if not self._is_expired(item):
-                        self.cache[item.key] = item
+                payload = cache_file.read_bytes()
+                item = pickle.loads(payload)
+                if isinstance(item, CacheItem) and not self._is_expired(item):
+                    self.store.put(item.key, payload)
+                cache_file.unlink()
             except Exception as e:
-                print(f"Error loading cache item {cache_file}: {str(e)}")
+                print(f"Error migrating cache item {cache_file}: {str(e)}")
+
+    def _load_item(self, key: str) -> Optional[CacheItem]:
+        """Load an item from the persistent store into memory"""
+        payload = self.store.get(key)
+        if payload is None:
+            return None
+        try:
+            item = pickle.loads(payload)
+        except Exception as e:
+            print(f"Error loading cache item {key}: {str(e)}")
+            self.store.delete(key)
+            return None
+        item.size_bytes = item.size_bytes or len(payload)
+        if self._is_expired(item):
+            self.store.delete(key)
+            return None
+        if self._has_room(item.size_bytes) or self.policy.admit(key):
+            self.cache[key] = item
+            self.policy.on_insert(key)
+            self._memory_bytes += item.size_bytes
+            self._evict(keep=key)
+        return item
 
     def _is_expired(self, item: CacheItem) -> bool:
         """Check if a cache item is expired"""
@@ -53,21 +101,32 @@ class CacheManager:
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get an item from the cache"""
-        item = self.cache.get(key)
+        item = self._resident(key)
         if not item:
+            self.stats["misses"] += 1
             return default
         if self._is_expired(item):
             self.delete(key)
+            self.stats["misses"] += 1
             return default
         item.access_count += 1
-        if self.persistent:
-            self._save_item(item)
+        self.policy.on_access(key)
+        self.stats["hits"] += 1
         return item.data
 
-    def set(self, key: str, data: Any, ttl: Optional[int] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
-        """Set a cache item"""
-        if len(self.cache) >= self.max_size:
-            self._cleanup()
+    def set(self,
+            key: str,
+            data: Any,
+            ttl: Optional[int] = None,
+            metadata: Optional[Dict[str, Any]] = None,
+            depends_on: Optional[List[str]] = None) -> None:
+        """
+        Set a cache item.
+
+        ``depends_on`` lists workspace paths or globs the item was derived
+        from; with an attached invalidation registry the item is deleted
+        when one of them changes.
+        """
         ttl_value = ttl if ttl is not None else self.default_ttl
         expires_at = datetime.now() + timedelta(seconds=ttl_value) if ttl_value else None
         item = CacheItem(
@@ -77,46 +136,117 @@ class CacheManager:
             expires_at=expires_at,
             metadata=metadata or {}
         )
+        payload = self._serialize(item)
+        item.size_bytes = len(payload) if payload is not None else sys.getsizeof(data)
+        existing = self.cache.get(key)
+        if existing is None:
+            if not self._has_room(item.size_bytes) and not self.policy.admit(key):
+                self.stats["rejections"] += 1
+                if self.store is not None:
+                    self._save_item(item, payload)
+                return
+            self.policy.on_insert(key)
+        else:
+            self._memory_bytes -= existing.size_bytes
+            self.policy.on_access(key)
         self.cache[key] = item
-        if self.persistent:
-            self._save_item(item)
+        self._memory_bytes += item.size_bytes
+        self._evict(keep=key)
+        if depends_on and self._invalidation is not None:
+            self._invalidation.depend(self._invalidation_id, key, paths=depends_on)
+        if self.store is not None:
+            self._save_item(item, payload)
+
+    def attach_invalidation(self, registry: Any, name: str = "cache_manager") -> None:
+        """Let a CacheInvalidationRegistry delete items whose ``depends_on`` paths change"""
+        self._invalidation = registry
+        self._invalidation_name = name
+        self._invalidation_id = registry.register(name, self._invalidate_keys)
+
+    def _invalidate_keys(self, keys: Any, paths: Any) -> None:
+        for key in keys:
+            if key is not None:
+                self.delete(key)
 
     def delete(self, key: str) -> bool:
         """Delete a cache item"""
+        stored = self.store is not None and self.store.delete(key)
         if key in self.cache:
-            del self.cache[key]
-            cache_file = self.cache_dir / f"{key}.cache"
-            if cache_file.exists():
-                cache_file.unlink()
-            return True
-        return False
+            self._unload(key)
+        elif not stored:
+            return False
+        if self._invalidation is not None:
+            self._invalidation.forget(self._invalidation_id, key)
+        return True
+
+    def _resident(self, key: str) -> Optional[CacheItem]:
+        """Item from memory, loading it from the store if necessary"""
+        item = self.cache.get(key)
+        if item is None and self.store is not None:
+            item = self._load_item(key)
+        return item
+
+    def _unload(self, key: str) -> None:
+        """Drop an item from memory only"""
+        item = self.cache.pop(key)
+        self._memory_bytes -= item.size_bytes
+        self.policy.on_remove(key)
 
     def clear(self) -> None:
         """Clear all cache items"""
         self.cache.clear()
-        for cache_file in self.cache_dir.glob("*.cache"):
-            cache_file.unlink()
+        self.policy.clear()
+        self._memory_bytes = 0
+        if self._invalidation is not None:
+            self._invalidation.unregister(self._invalidation_id)
+            self._invalidation_id = self._invalidation.register(self._invalidation_name, self._invalidate_keys)
+        if self.store is not None:
+            self.store.clear()
+
+    def close(self) -> None:
+        """Close the persistent store, saving its key index for a fast next start"""
+        if self.store is not None:
+            self.store.close()
 
     def _cleanup(self) -> None:
-        """Clean up expired and least-used items"""
-        # Remove expired items first
-        expired_keys = [key for key, item in self.cache.items() if self._is_expired(item)]
-        for key in expired_keys:
-            self.delete(key)
-        # If still over limit, remove least-accessed items
-        while len(self.cache) >= self.max_size:
-            sorted_items = sorted(self.cache.items(), key=lambda x: (x[1].access_count, -x[1].created_at.timestamp()))
-            if not sorted_items:
+        """Clean up expired items, then evict down to the limits"""
+        self.cleanup_expired()
+        self._evict()
+
+    def _has_room(self, size_bytes: int) -> bool:
+        """Whether an item of this size fits without evicting"""
+        if len(self.cache) >= self.max_size:
+            return False
+        return self.max_memory_bytes is None or self._memory_bytes + size_bytes <= self.max_memory_bytes
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Evict policy victims until the item count and memory budget are respected"""
+        while len(self.cache) > self.max_size or (
+            self.max_memory_bytes is not None and self._memory_bytes > self.max_memory_bytes
+        ):
+            # An item that was just set is never its own victim
+            victim = self.policy.victim(exclude=keep)
+            if victim is None:
                 break
-            key_to_remove, _ = sorted_items[0]
-            self.delete(key_to_remove)
+            # Persistent items stay in the store and are reloaded on demand
+            if self.store is not None:
+                self._unload(victim)
+            else:
+                self.delete(victim)
+            self.stats["evictions"] += 1
+
+    def _serialize(self, item: CacheItem) -> Optional[bytes]:
+        try:
+            return pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
 
-    def _save_item(self, item: CacheItem) -> None:
-        """Save a cache item to disk"""
+    def _save_item(self, item: CacheItem, payload: Optional[bytes] = None) -> None:
+        """Append a cache item to the persistent store"""
         try:
-            cache_file = self.cache_dir / f"{item.key}.cache"
-            with open(cache_file, 'wb') as f:
-                pickle.dump(item, f)
+            self.store.put(item.key, payload if payload is not None else pickle.dumps(item))
+            if self.store.needs_compaction():
+                self.store.compact_in_background()
         except Exception as e:
             print(f"Error saving cache item {item.key}: {str(e)}")
 
@@ -126,7 +256,7 @@ class CacheManager:
         expired_items = len([item for item in self.cache.values() if self._is_expired(item)])
         total_access = sum(item.access_count for item in self.cache.values())
         average_access = total_access / total_items if total_items else 0
-        memory_usage = sum(len(pickle.dumps(item)) for item in self.cache.values())
+        memory_usage = self._memory_bytes
         hits_by_key = {key: item.access_count for key, item in self.cache.items()}
         return {
             "total_items": total_items,
@@ -137,30 +267,33 @@ class CacheManager:
             "memory_usage": memory_usage,
             "hits_by_key": hits_by_key,
             "persistent": self.persistent,
-            "cache_usage_percent": (total_items / self.max_size) * 100
+            "persistent_items": len(self.store) if self.store is not None else 0,
+            "cache_usage_percent": (total_items / self.max_size) * 100,
+            "max_memory_bytes": self.max_memory_bytes,
+            "eviction_policy": self.policy.name,
+            **self.stats
         }
 
     def touch(self, key: str) -> bool:
         """Update the access time (via access count) for a cache item"""
-        if key in self.cache:
-            item = self.cache[key]
+        item = self._resident(key)
+        if item is not None:
             item.access_count += 1
-            if self.persistent:
-                self._save_item(item)
+            self.policy.on_access(key)
             return True
         return False
 
     def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a cache item"""
-        item = self.cache.get(key)
+        item = self._resident(key)
         return item.metadata if item else None
 
     def update_metadata(self, key: str, metadata: Dict[str, Any]) -> bool:
         """Update metadata for a cache item"""
-        if key in self.cache:
-            item = self.cache[key]
+        item = self._resident(key)
+        if item is not None:
             item.metadata.update(metadata)
-            if self.persistent:
+            if self.store is not None:
                 self._save_item(item)
             return True
         return False
@@ -178,7 +311,7 @@ class CacheManager:
 
     def exists(self, key: str) -> bool:
         """Check if a key exists in the cache"""
-        return key in self.cache
+        return key in self.cache or (self.store is not None and key in self.store)
 
     def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
         """Set multiple cache items at once"""
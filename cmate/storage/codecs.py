@@ -0,0 +1,225 @@
+"""
+Serialization codecs for persistent storage.
+
+A codec spec is ``<serializer>[+<compressor>[:<level>]]``, for example
+``pickle``, ``json+zstd:3`` or ``msgpack+lz4``.
+
+Serializers:
+  - ``pickle``: protocol 5; buffers that support out-of-band pickling
+    (numpy arrays, ``pickle.PickleBuffer``) are framed after the pickle
+    stream instead of being copied into it, and decoded without a copy.
+  - ``json``: orjson when installed, otherwise the standard library.
+    Values without a builtin form raise TypeError (see ``_to_builtin``).
+  - ``msgpack``: requires the ``msgpack`` package.
+
+Compressors: ``zlib`` (always available), ``zstd`` (``zstandard``) and
+``lz4`` (``lz4``). Specs naming a missing optional package are rejected
+by ``get_codec`` with a ValueError.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from uuid import UUID
+import dataclasses
+import json
+import pickle
+import struct
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+def _to_builtin(value: Any) -> Any:
+    """
+    Fallback for values the structured serializers cannot encode.
+
+    Only types with an unambiguous builtin form are converted: objects
+    with a ``to_builtin()`` method use it, other dataclasses become a dict
+    of their fields. Anything else raises TypeError rather than being
+    stored as its ``str()``.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (UUID, Path)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "to_builtin"):
+        return value.to_builtin()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    raise TypeError(f"Cannot encode {type(value).__name__} value")
+
+class Serializer:
+    """Turns a value into bytes and back"""
+
+    name = ""
+
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, payload: memoryview) -> Any:
+        raise NotImplementedError
+
+class PickleSerializer(Serializer):
+    """
+    Pickle protocol 5 with out-of-band buffers.
+
+    Layout: buffer count, pickle size and buffer sizes (little-endian
+    uint32/uint64s), then the pickle stream and the raw buffers. When the
+    payload is writable (e.g. a ``bytearray`` read from disk) the decoded
+    buffers are views on it; read-only payloads are copied so the decoded
+    arrays stay writable.
+    """
+
+    name = "pickle"
+    _COUNT = struct.Struct("<I")
+
+    def dumps(self, data: Any) -> bytes:
+        buffers: List[pickle.PickleBuffer] = []
+        body = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        sizes = struct.pack(f"<{len(raws) + 1}Q", len(body), *(raw.nbytes for raw in raws))
+        return b"".join([self._COUNT.pack(len(raws)), sizes, body, *raws])
+
+    def loads(self, payload: memoryview) -> Any:
+        view = memoryview(payload)
+        count, = self._COUNT.unpack_from(view)
+        offset = self._COUNT.size
+        sizes = struct.unpack_from(f"<{count + 1}Q", view, offset)
+        offset += 8 * (count + 1)
+        body = view[offset:offset + sizes[0]]
+        offset += sizes[0]
+        buffers = []
+        for size in sizes[1:]:
+            buffer = view[offset:offset + size]
+            buffers.append(bytearray(buffer) if view.readonly else buffer)
+            offset += size
+        return pickle.loads(body, buffers=buffers)
+
+class JSONSerializer(Serializer):
+    """JSON through orjson when installed (numpy arrays included), else the json module"""
+
+    name = "json"
+
+    def dumps(self, data: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data, default=_to_builtin,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                                | orjson.OPT_PASSTHROUGH_DATACLASS)
+        return json.dumps(data, default=_to_builtin).encode("utf-8")
+
+    def loads(self, payload: memoryview) -> Any:
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(bytes(payload))
+
+class MsgpackSerializer(Serializer):
+    """MessagePack; bytes stay bytes, other types fall back to builtins"""
+
+    name = "msgpack"
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True, default=_to_builtin)
+
+    def loads(self, payload: memoryview) -> Any:
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+def _zstd_compress(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+def _lz4_compress(data: bytes, level: int) -> bytes:
+    return lz4_frame.compress(data, compression_level=level)
+
+# name -> (compress(data, level), decompress(data), default level, required module)
+COMPRESSORS: Dict[str, Tuple[Callable, Callable, int, Any]] = {
+    "zlib": (lambda data, level: zlib.compress(data, level), zlib.decompress, 6, zlib),
+    "zstd": (_zstd_compress, _zstd_decompress, 3, zstandard),
+    "lz4": (_lz4_compress, lambda data: lz4_frame.decompress(data), 0, lz4_frame)
+}
+
+SERIALIZERS: Dict[str, Tuple[type, Any]] = {
+    "pickle": (PickleSerializer, pickle),
+    "json": (JSONSerializer, json),
+    "msgpack": (MsgpackSerializer, msgpack)
+}
+
+class Codec:
+    """A serializer with an optional compressor, built from a spec by ``get_codec``"""
+
+    def __init__(self, spec: str, serializer: Serializer, compressor: Optional[str] = None, level: Optional[int] = None):
+        self.spec = spec
+        self.serializer = serializer
+        self.compressor = compressor
+        self.level = level
+        if compressor is not None:
+            self._compress, self._decompress, default_level, _ = COMPRESSORS[compressor]
+            self.level = default_level if level is None else level
+
+    def encode(self, data: Any) -> bytes:
+        payload = self.serializer.dumps(data)
+        return self._compress(payload, self.level) if self.compressor else payload
+
+    def decode(self, payload: memoryview) -> Any:
+        if self.compressor:
+            payload = self._decompress(payload)
+        return self.serializer.loads(payload)
+
+    def __repr__(self) -> str:
+        return f"Codec({self.spec!r})"
+
+@lru_cache(maxsize=None)
+def get_codec(spec: str) -> Codec:
+    """Codec for a spec such as ``json+zstd:3``"""
+    serializer_name, _, compression = spec.lower().partition("+")
+    if serializer_name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer in codec spec: {spec}")
+    serializer_class, module = SERIALIZERS[serializer_name]
+    if module is None:
+        raise ValueError(f"Codec {spec} requires the '{serializer_name}' package")
+    compressor, level = None, None
+    if compression:
+        compressor, _, level_text = compression.partition(":")
+        if compressor not in COMPRESSORS:
+            raise ValueError(f"Unknown compressor in codec spec: {spec}")
+        if COMPRESSORS[compressor][3] is None:
+            raise ValueError(f"Codec {spec} requires the '{compressor}' compression package")
+        level = int(level_text) if level_text else None
+    return Codec(spec, serializer_class(), compressor, level)
+
+def available_codecs() -> List[str]:
+    """Serializer/compressor specs usable with the installed packages"""
+    specs = []
+    for name, (_, module) in SERIALIZERS.items():
+        if module is None:
+            continue
+        specs.append(name)
+        specs.extend(f"{name}+{compressor}" for compressor, entry in COMPRESSORS.items() if entry[3] is not None)
+    return specs
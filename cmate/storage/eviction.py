@@ -0,0 +1,227 @@
+from typing import Dict, Hashable, Iterator, Optional
+from collections import OrderedDict
+import hashlib
+
+class EvictionPolicy:
+    """
+    Bookkeeping for choosing cache victims.
+
+    The cache calls the hooks on every insert, hit and removal, and asks for
+    a ``victim()`` while it is over budget. All operations are O(1).
+    ``admit`` lets a policy refuse a new key instead of evicting for it.
+    """
+
+    name = "none"
+
+    def on_insert(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def on_access(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def on_remove(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def victim(self, exclude: Optional[Hashable] = None) -> Optional[Hashable]:
+        """Key to evict next other than ``exclude``, or None when there is none"""
+        raise NotImplementedError
+
+    def admit(self, key: Hashable) -> bool:
+        """Whether a new key may displace the current victim"""
+        return True
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used, on an OrderedDict kept in recency order"""
+
+    name = "lru"
+
+    def __init__(self):
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def on_insert(self, key: Hashable) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def on_access(self, key: Hashable) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def on_remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def victim(self, exclude: Optional[Hashable] = None) -> Optional[Hashable]:
+        for key in self._order:
+            if key != exclude:
+                return key
+        return None
+
+    def clear(self) -> None:
+        self._order.clear()
+
+class _FrequencyBucket:
+    __slots__ = ("count", "keys", "prev", "next")
+
+    def __init__(self, count: int):
+        self.count = count
+        self.keys: "OrderedDict[Hashable, None]" = OrderedDict()
+        self.prev: Optional["_FrequencyBucket"] = None
+        self.next: Optional["_FrequencyBucket"] = None
+
+class LFUPolicy(EvictionPolicy):
+    """
+    Least frequently used, ties broken by least recent use.
+
+    Keys sit in per-count buckets kept in a doubly linked list ordered by
+    count, so a hit moves a key to the neighbouring bucket and the victim is
+    the oldest key of the first bucket.
+    """
+
+    name = "lfu"
+
+    def __init__(self):
+        self._head = _FrequencyBucket(0)
+        self._head.next = self._head.prev = self._head
+        self._buckets: Dict[Hashable, _FrequencyBucket] = {}
+
+    def on_insert(self, key: Hashable) -> None:
+        if key in self._buckets:
+            self.on_access(key)
+            return
+        first = self._head.next
+        bucket = first if first.count == 1 else self._link_after(self._head, 1)
+        bucket.keys[key] = None
+        self._buckets[key] = bucket
+
+    def on_access(self, key: Hashable) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        following = bucket.next
+        if following.count != bucket.count + 1:
+            following = self._link_after(bucket, bucket.count + 1)
+        following.keys[key] = None
+        self._buckets[key] = following
+        self._detach(bucket, key)
+
+    def on_remove(self, key: Hashable) -> None:
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            self._detach(bucket, key)
+
+    def victim(self, exclude: Optional[Hashable] = None) -> Optional[Hashable]:
+        bucket = self._head.next
+        while bucket is not self._head:
+            for key in bucket.keys:
+                if key != exclude:
+                    return key
+            bucket = bucket.next
+        return None
+
+    def frequency(self, key: Hashable) -> int:
+        bucket = self._buckets.get(key)
+        return bucket.count if bucket else 0
+
+    def clear(self) -> None:
+        self._head.next = self._head.prev = self._head
+        self._buckets.clear()
+
+    def _link_after(self, bucket: _FrequencyBucket, count: int) -> _FrequencyBucket:
+        new = _FrequencyBucket(count)
+        new.prev, new.next = bucket, bucket.next
+        bucket.next.prev = new
+        bucket.next = new
+        return new
+
+    def _detach(self, bucket: _FrequencyBucket, key: Hashable) -> None:
+        del bucket.keys[key]
+        if not bucket.keys:
+            bucket.prev.next = bucket.next
+            bucket.next.prev = bucket.prev
+
+class FrequencySketch:
+    """
+    Count-min sketch of access frequencies with periodic halving.
+
+    Four hashed rows of small counters; an estimate is the minimum over the
+    rows. After ``sample_size`` increments every counter is halved, so old
+    popularity fades.
+    """
+
+    def __init__(self, width: int = 1024, sample_size: Optional[int] = None, max_count: int = 15):
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.rows = [bytearray(self.width) for _ in range(4)]
+        self.sample_size = sample_size or 10 * width
+        self.max_count = max_count
+        self.additions = 0
+
+    def _indexes(self, key: Hashable) -> Iterator[int]:
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+        mask = self.width - 1
+        for row in range(4):
+            yield int.from_bytes(digest[row * 4:row * 4 + 4], "little") & mask
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < self.max_count:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def _age(self) -> None:
+        for row in self.rows:
+            for index in range(self.width):
+                row[index] >>= 1
+        self.additions //= 2
+
+class TinyLFUPolicy(LRUPolicy):
+    """
+    LRU eviction behind a TinyLFU admission filter.
+
+    Every insert and hit is counted in a ``FrequencySketch`` (including keys
+    that are not cached). A new key is only admitted into a full cache when
+    it has been seen more often than the LRU victim it would displace, so
+    one-off keys cannot flush a working set.
+    """
+
+    name = "tinylfu"
+
+    def __init__(self, capacity: int = 1000):
+        super().__init__()
+        self.sketch = FrequencySketch(width=max(16, capacity))
+
+    def on_insert(self, key: Hashable) -> None:
+        self.sketch.increment(key)
+        super().on_insert(key)
+
+    def on_access(self, key: Hashable) -> None:
+        self.sketch.increment(key)
+        super().on_access(key)
+
+    def admit(self, key: Hashable) -> bool:
+        victim = self.victim()
+        # The candidate's own access is counted on insert, or here if it is rejected
+        if victim is None or self.sketch.estimate(key) + 1 > self.sketch.estimate(victim):
+            return True
+        self.sketch.increment(key)
+        return False
+
+EVICTION_POLICIES = {
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+    "tinylfu": TinyLFUPolicy
+}
+
+def make_policy(name: str, capacity: int = 1000) -> EvictionPolicy:
+    """Eviction policy by name (lru, lfu, tinylfu)"""
+    try:
+        policy_class = EVICTION_POLICIES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown eviction policy: {name}")
+    return policy_class(capacity) if policy_class is TinyLFUPolicy else policy_class()
@@ -0,0 +1,281 @@
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import os
+import struct
+import threading
+import zlib
+
+# Record header: magic, kind, key length, value length, crc32 of key + value
+_HEADER = struct.Struct("<4sBIII")
+_MAGIC = b"CMLS"
+_PUT = 0
+_DELETE = 1
+HINT_VERSION = 1
+
+@dataclass
+class LogEntry:
+    """Location of the live value of a key in the log"""
+    offset: int   # start of the record header
+    size: int     # whole record (header + key + value)
+    value_offset: int
+    value_size: int
+    crc: int
+
+class LogStore:
+    """
+    Append-only key/value store in a single data file.
+
+    Every put or delete appends one checksummed record; an in-memory offset
+    index points at the live record of each key, so a read is one
+    positioned read. The index is saved to a hint file on ``close()`` and
+    ``compact()``; on open only the part of the log written after the hint
+    is scanned (headers only), so startup does not read the values.
+    Superseded records are garbage until ``compact()`` rewrites the live
+    records into a fresh file and swaps it in with an atomic rename.
+    """
+
+    def __init__(self, path: Path, compact_ratio: float = 0.5, compact_min_bytes: int = 1024 * 1024):
+        self.path = Path(path)
+        self.hint_path = self.path.with_suffix(self.path.suffix + ".hint")
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.index: Dict[str, LogEntry] = {}
+        self.size = 0
+        self.dead_bytes = 0
+        self.stats = {"reads": 0, "writes": 0, "checksum_errors": 0, "compactions": 0}
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compacting = False
+        self._generation = 0  # bumped by clear(), which invalidates a running compaction
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open_files()
+        self._open()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self.index)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Value of a key, or None if it is missing or fails its checksum"""
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            value = self._read(entry.value_offset, entry.value_size)
+            self.stats["reads"] += 1
+            if zlib.crc32(value, zlib.crc32(key.encode("utf-8"))) != entry.crc:
+                self.stats["checksum_errors"] += 1
+                print(f"Checksum mismatch for cache record {key!r} in {self.path}")
+                self._drop(key)
+                return None
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._append(_PUT, key, value)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self.index:
+                return False
+            self._append(_DELETE, key, b"")
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._file.truncate(0)
+            self._generation += 1
+            self.index.clear()
+            self.size = self.dead_bytes = 0
+            self._save_hint()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._save_hint()
+            self._file.close()
+            self._reader.close()
+
+    def needs_compaction(self) -> bool:
+        return self.dead_bytes >= self.compact_min_bytes and self.dead_bytes >= self.size * self.compact_ratio
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """Start ``compact()`` on a daemon thread unless one is already running"""
+        with self._lock:
+            if self._compacting:
+                return None
+            self._compacting = True
+        thread = threading.Thread(target=self.compact, name="log-store-compaction", daemon=True)
+        thread.start()
+        return thread
+
+    def compact(self) -> None:
+        """
+        Rewrite the live records into a new file and swap it in atomically.
+
+        The live records of an index snapshot are copied without holding the
+        lock, so reads and writes carry on meanwhile; the lock is only taken
+        to append the records written since the snapshot and swap the files.
+        """
+        tmp_path = self.path.with_suffix(self.path.suffix + ".compact")
+        with self._compaction_lock:
+            try:
+                with self._lock:
+                    self._compacting = True
+                    snapshot = dict(self.index)
+                    snapshot_size = self.size
+                    generation = self._generation
+                index, offset = self._copy_live(snapshot, tmp_path)
+                with self._lock:
+                    if self._file.closed or self._generation != generation:
+                        # Closed or cleared while copying; the copy is stale
+                        return
+                    tail_size = self.size - snapshot_size
+                    with open(tmp_path, "ab") as out:
+                        out.write(self._read(snapshot_size, tail_size))
+                        out.flush()
+                        os.fsync(out.fileno())
+                    # Keys dropped for a checksum mismatch stay dropped
+                    for key in snapshot:
+                        if key not in self.index:
+                            index.pop(key, None)
+                    # A hint describing the old file must not outlive it
+                    if self.hint_path.exists():
+                        self.hint_path.unlink()
+                    self._file.close()
+                    self._reader.close()
+                    os.replace(tmp_path, self.path)
+                    self._open_files()
+                    self.index = index
+                    self.dead_bytes = 0
+                    # Replay the records written during the copy onto the new index
+                    self.size = self._scan(offset, offset + tail_size)
+                    self.stats["compactions"] += 1
+                    self._save_hint()
+            except Exception as e:
+                print(f"Error compacting {self.path}: {str(e)}")
+                with self._lock:
+                    if self._file.closed:
+                        self._open_files()
+            finally:
+                self._compacting = False
+                if tmp_path.exists():
+                    tmp_path.unlink()
+
+    def _copy_live(self, snapshot: Dict[str, LogEntry], tmp_path: Path) -> Tuple[Dict[str, LogEntry], int]:
+        """Copy the records of an index snapshot into a new file; returns its index and size"""
+        index: Dict[str, LogEntry] = {}
+        offset = 0
+        with open(self.path, "rb") as reader, open(tmp_path, "wb") as out:
+            for key, entry in snapshot.items():
+                reader.seek(entry.offset)
+                out.write(reader.read(entry.size))
+                key_size = entry.value_offset - entry.offset - _HEADER.size
+                index[key] = LogEntry(offset, entry.size, offset + _HEADER.size + key_size,
+                                      entry.value_size, entry.crc)
+                offset += entry.size
+            out.flush()
+            os.fsync(out.fileno())
+        return index, offset
+
+    def _open_files(self) -> None:
+        # Unbuffered appends, so positioned reads through the reader see every write
+        self._file = open(self.path, "ab", buffering=0)
+        self._reader = open(self.path, "rb")
+
+    def _read(self, offset: int, size: int) -> bytes:
+        self._reader.seek(offset)
+        return self._reader.read(size)
+
+    def _append(self, kind: int, key: str, value: bytes) -> None:
+        key_bytes = key.encode("utf-8")
+        crc = zlib.crc32(value, zlib.crc32(key_bytes))
+        header = _HEADER.pack(_MAGIC, kind, len(key_bytes), len(value), crc)
+        offset = self.size
+        self._file.write(header + key_bytes + value)
+        record_size = _HEADER.size + len(key_bytes) + len(value)
+        self.size += record_size
+        self.stats["writes"] += 1
+        self._apply(kind, key, LogEntry(offset, record_size, offset + _HEADER.size + len(key_bytes), len(value), crc))
+
+    def _apply(self, kind: int, key: str, entry: LogEntry) -> None:
+        previous = self.index.pop(key, None)
+        if previous is not None:
+            self.dead_bytes += previous.size
+        if kind == _PUT:
+            self.index[key] = entry
+        else:
+            self.dead_bytes += entry.size
+
+    def _drop(self, key: str) -> None:
+        entry = self.index.pop(key, None)
+        if entry is not None:
+            self.dead_bytes += entry.size
+
+    def _open(self) -> None:
+        file_size = os.path.getsize(self.path)
+        start = self._load_hint(file_size)
+        self.size = start
+        end = self._scan(start, file_size)
+        if end < file_size:
+            # A torn write at the tail (crash mid-append) is cut off
+            print(f"Truncating {file_size - end} bytes of incomplete records from {self.path}")
+            self._file.truncate(end)
+        self.size = end
+
+    def _scan(self, offset: int, file_size: int) -> int:
+        """Index the records in [offset, file_size) reading only their headers and keys"""
+        while offset + _HEADER.size <= file_size:
+            magic, kind, key_size, value_size, crc = _HEADER.unpack(self._read(offset, _HEADER.size))
+            record_size = _HEADER.size + key_size + value_size
+            if magic != _MAGIC or offset + record_size > file_size:
+                break
+            key = self._read(offset + _HEADER.size, key_size).decode("utf-8")
+            self._apply(kind, key, LogEntry(offset, record_size, offset + _HEADER.size + key_size, value_size, crc))
+            offset += record_size
+        return offset
+
+    def _load_hint(self, file_size: int) -> int:
+        """Load the saved index; returns the log offset it covers (0 if unusable)"""
+        if not self.hint_path.exists():
+            return 0
+        try:
+            with open(self.hint_path, "r", encoding="utf-8") as f:
+                hint = json.load(f)
+            if hint.get("version") != HINT_VERSION or hint["size"] > file_size:
+                return 0
+            self.index = {key: LogEntry(*values) for key, values in hint["index"].items()}
+            self.dead_bytes = hint.get("dead_bytes", 0)
+            return hint["size"]
+        except Exception as e:
+            print(f"Error loading index hint {self.hint_path}: {str(e)}")
+            self.index = {}
+            self.dead_bytes = 0
+            return 0
+
+    def _save_hint(self) -> None:
+        data = {
+            "version": HINT_VERSION,
+            "size": self.size,
+            "dead_bytes": self.dead_bytes,
+            "index": {
+                key: [e.offset, e.size, e.value_offset, e.value_size, e.crc]
+                for key, e in self.index.items()
+            }
+        }
+        try:
+            tmp_path = self.hint_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.hint_path)
+        except Exception as e:
+            print(f"Error saving index hint {self.hint_path}: {str(e)}")
@@ -1,24 +1,45 @@
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+import asyncio
 import json
+import os
 import pickle
 from pathlib import Path
 import shutil
+import struct
 import zlib
+import threading
+import time
 from uuid import UUID, uuid4
 
+from .codecs import get_codec
+
+# Item file header: magic, codec spec length, envelope length
+_ITEM_HEADER = struct.Struct("<4sHI")
+_ITEM_MAGIC = b"CMPI"
+
 @dataclass
 class StorageConfig:
     """
     Configuration for persistent storage.
-    For this merged version the default format is 'pickle'.
+
+    ``format`` is the default codec spec (see ``storage.codecs``), e.g.
+    ``pickle`` or ``json+zstd:3``; ``compression`` adds zlib to it when it
+    names no compressor. ``codecs`` overrides the spec per key or per
+    namespace, the part of a key before a ``:`` (``{"audit_log": "json",
+    "analysis": "msgpack+lz4"}``).
     """
     storage_path: Path
-    format: str = "pickle"  # Currently only 'pickle' is supported.
+    format: str = "pickle"
     compression: bool = False
+    codecs: Dict[str, str] = field(default_factory=dict)
     backup_enabled: bool = True
     max_backups: int = 5
+    checkpoint_interval: int = 100  # journal records between index.json rewrites
+    write_retries: int = 5  # attempts to write a failed batch again before dropping it
+    cache_size: int = 256  # items kept in memory after their first retrieval
 
 @dataclass
 class StorageItem:
@@ -29,72 +50,175 @@ class StorageItem:
     created_at: datetime
     updated_at: datetime
     metadata: Dict[str, Any] = field(default_factory=dict)
-    compressed: bool = False
+    compressed: bool = False  # legacy zlib-compressed pickle in ``data``
+    codec: Optional[str] = None
+
+@dataclass
+class _QueuedWrite:
+    """An item snapshot and its encoded data, waiting for the writer"""
+    item: StorageItem
+    payload: bytes
+    merge: bool = False  # take created_at and metadata from the stored file
 
 class PersistenceManager:
-    """Manages persistent data storage with optional compression and backup"""
+    """
+    Manages persistent data storage with pluggable codecs and backup.
+
+    Writes are write-behind: ``store``/``update`` encode the data (on a
+    worker thread, so an unencodable value raises to the caller), change
+    the in-memory state and queue the encoded item; ``delete`` queues a
+    removal. A background writer thread drains the queue in batches,
+    writing each item to a temp file that is renamed over
+    ``item_<id>.dat``, and appends the key changes to ``index.journal``.
+    Updating an item that is not in memory never reads it: the writer takes
+    its creation time and metadata from the stored file. A batch that fails
+    to write is queued again, up to ``write_retries`` times with backoff.
+    Every ``checkpoint_interval`` journal records the index is rewritten to
+    ``index.json`` by atomic rename and the journal is reset. Repeated writes
+    to a key that is still queued are coalesced. ``flush()`` waits for the
+    queue to drain; ``close()`` also writes a checkpoint.
+
+    Startup reads only the key index (checkpoint plus journal). Items are
+    loaded from their files on first use and kept in an LRU of
+    ``cache_size`` items; ``iter_items`` streams over stored items without
+    filling the LRU.
+
+    An item file holds a small header, the codec spec, the pickled item
+    envelope (everything but ``data``) and the data encoded by the item's
+    codec, so large payloads are never pickled twice and a file read into a
+    writable buffer decodes out-of-band pickle buffers without a copy.
+    """
     
-    def __init__(self, config: Optional[StorageConfig] = None, storage_path: Optional[str] = None, compression: bool = False):
+    def __init__(self,
+                 config: Optional[StorageConfig] = None,
+                 storage_path: Optional[str] = None,
+                 compression: bool = False,
+                 codecs: Optional[Dict[str, str]] = None):
         if config:
             self.config = config
         else:
             path = Path(storage_path) if storage_path else Path("storage")
-            self.config = StorageConfig(storage_path=path, compression=compression)
+            self.config = StorageConfig(storage_path=path, compression=compression, codecs=dict(codecs or {}))
         self.storage_path = self.config.storage_path
         self.compression = self.config.compression
-        self.items: Dict[UUID, StorageItem] = {}
+        self.default_codec = self.config.format
+        if self.compression and "+" not in self.default_codec:
+            self.default_codec += "+zlib"
+        # Fail at startup rather than on the first store with a bad spec
+        for spec in [self.default_codec, *self.config.codecs.values()]:
+            get_codec(spec)
+        # Resident items in least-recently-used order
+        self.items: "OrderedDict[UUID, StorageItem]" = OrderedDict()
         self.indices: Dict[str, UUID] = {}
+        self.stats = {"writes": 0, "batches": 0, "coalesced": 0, "checkpoints": 0, "errors": 0}
+        # Write-behind queue, guarded by _cond: item id -> queued write (None removes the file)
+        self._pending: Dict[UUID, Optional[_QueuedWrite]] = {}
+        self._inflight: Dict[UUID, Optional[_QueuedWrite]] = {}
+        self._journal: List[Dict[str, str]] = []
+        self._backup_requested = False
+        self._writing = False
+        self._writer: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        # Index as of the last journal record written; only the writer touches it
+        self._durable_index: Dict[str, str] = {}
+        self._journal_records = 0
         self._initialize_storage()
         
     def _initialize_storage(self) -> None:
         """Initialize the storage system and load existing data"""
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self._load_existing_data()
+
+    @property
+    def _index_file(self) -> Path:
+        return self.storage_path / "index.json"
+
+    @property
+    def _journal_file(self) -> Path:
+        return self.storage_path / "index.journal"
         
     def _load_existing_data(self) -> None:
-        """Load existing data and indices from storage"""
-        index_file = self.storage_path / "index.json"
-        if index_file.exists():
+        """Load the key index; items are read from disk on demand"""
+        self._durable_index = self._read_index()
+        self.indices = {k: UUID(v) for k, v in self._durable_index.items()}
+
+    def _read_index(self) -> Dict[str, str]:
+        """The last checkpoint with the journal replayed on top of it"""
+        index: Dict[str, str] = {}
+        if self._index_file.exists():
             try:
-                with open(index_file, 'r') as f:
-                    index_data = json.load(f)
-                    self.indices = {k: UUID(v) for k, v in index_data.items()}
+                with open(self._index_file, 'r') as f:
+                    index = json.load(f)
             except Exception as e:
                 print(f"Error loading index file: {str(e)}")
-        for item_file in self.storage_path.glob("item_*.dat"):
-            try:
-                with open(item_file, 'rb') as f:
-                    item = pickle.load(f)
-                    if isinstance(item, StorageItem):
-                        self.items[item.id] = item
-            except Exception as e:
-                print(f"Error loading item {item_file}: {str(e)}")
+        self._journal_records = 0
+        if self._journal_file.exists():
+            with open(self._journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last record from an interrupted append
+                        print(f"Ignoring incomplete record in {self._journal_file}")
+                        break
+                    if record["op"] == "set":
+                        index[record["key"]] = record["id"]
+                    else:
+                        index.pop(record["key"], None)
+                    self._journal_records += 1
+        return index
                 
-    async def store(self, key: str, data: Any, metadata: Optional[Dict[str, Any]] = None) -> UUID:
+    async def store(self,
+                    key: str,
+                    data: Any,
+                    metadata: Optional[Dict[str, Any]] = None,
+                    codec: Optional[str] = None) -> UUID:
         """
         Store data persistently under the given key.
         If the key already exists, the data is updated.
+        ``codec`` overrides the configured codec spec for this key.
+        Raises whatever the codec raises for data it cannot encode.
         """
+        await self._make_resident(key)
+        spec = self._write_codec(key, codec)
+        payload = await asyncio.to_thread(self._encode, spec, data)
+        return self._store(key, data, metadata, spec, payload)
+
+    def store_nowait(self,
+                     key: str,
+                     data: Any,
+                     metadata: Optional[Dict[str, Any]] = None,
+                     codec: Optional[str] = None) -> UUID:
+        """
+        Synchronous ``store`` for callers outside the event loop. The data is
+        encoded in the calling thread; the call never reads or writes disk.
+        """
+        spec = self._write_codec(key, codec)
+        return self._store(key, data, metadata, spec, self._encode(spec, data))
+
+    def _store(self,
+               key: str,
+               data: Any,
+               metadata: Optional[Dict[str, Any]],
+               spec: str,
+               payload: bytes) -> UUID:
         if key in self.indices:
-            return await self.update(key, data, metadata)
+            return self._update(key, data, metadata, spec, payload)
         item_id = uuid4()
         now = datetime.now()
-        stored_data = self._compress_data(data) if self.compression else data
         item = StorageItem(
             id=item_id,
             key=key,
-            data=stored_data,
+            data=data,
             created_at=now,
             updated_at=now,
             metadata=metadata or {},
-            compressed=self.compression
+            codec=spec
         )
-        self.items[item_id] = item
+        self._cache(item)
         self.indices[key] = item_id
-        await self._save_item(item)
-        await self._save_index()
-        if self.config.backup_enabled:
-            self.create_backup()
+        self._enqueue(item_id, _QueuedWrite(_snapshot(item), payload), {"op": "set", "key": key, "id": str(item_id)},
+                      backup=self.config.backup_enabled)
         return item_id
 
     async def retrieve(self, key: str) -> Any:
@@ -102,20 +226,84 @@ class PersistenceManager:
         item_id = self.indices.get(key)
         if not item_id:
             raise KeyError(f"Key not found: {key}")
-        item = self.items[item_id]
-        return self._decompress_data(item.data) if item.compressed else item.data
+        item = self.items.get(item_id)
+        if item is None:
+            item = await asyncio.to_thread(self._load_item, item_id)
+            if item is None:
+                raise StorageError(f"Stored item for key {key} is missing or unreadable")
+            self._cache(item)
+        else:
+            self.items.move_to_end(item_id)
+        return self._item_data(item)
 
-    async def update(self, key: str, data: Any, metadata: Optional[Dict[str, Any]] = None) -> UUID:
+    def keys(self) -> List[str]:
+        """All stored keys"""
+        return list(self.indices)
+
+    async def iter_items(self, prefix: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream ``(key, data)`` for stored items, optionally only keys with a
+        prefix. Items are read one at a time off the loop and not cached.
+        """
+        for key, item_id in list(self.indices.items()):
+            if prefix is not None and not key.startswith(prefix):
+                continue
+            item = self.items.get(item_id)
+            if item is None:
+                item = await asyncio.to_thread(self._load_item, item_id)
+                if item is None:
+                    continue
+            yield key, self._item_data(item)
+
+    async def update(self,
+                     key: str,
+                     data: Any,
+                     metadata: Optional[Dict[str, Any]] = None,
+                     codec: Optional[str] = None) -> UUID:
         """Update stored data for the given key"""
+        if key not in self.indices:
+            raise KeyError(f"Key not found: {key}")
+        await self._make_resident(key)
+        spec = self._write_codec(key, codec)
+        payload = await asyncio.to_thread(self._encode, spec, data)
+        return self._update(key, data, metadata, spec, payload)
+
+    def _update(self,
+                key: str,
+                data: Any,
+                metadata: Optional[Dict[str, Any]],
+                spec: str,
+                payload: bytes) -> UUID:
         item_id = self.indices.get(key)
         if not item_id:
             raise KeyError(f"Key not found: {key}")
-        item = self.items[item_id]
-        item.data = self._compress_data(data) if self.compression else data
-        item.updated_at = datetime.now()
+        now = datetime.now()
+        item = self.items.get(item_id)
+        queued = None
+        if item is None:
+            with self._cond:
+                queued = self._pending.get(item_id) or self._inflight.get(item_id)
+            if queued is not None and not queued.merge:
+                item = _snapshot(queued.item)
+                self._cache(item)
+        else:
+            self.items.move_to_end(item_id)
+        if item is None:
+            # Not in memory: the writer merges with the stored envelope, so
+            # the old payload is never read just to be replaced
+            merged = dict(queued.item.metadata) if queued is not None else {}
+            merged.update(metadata or {})
+            item = StorageItem(id=item_id, key=key, data=data, created_at=now, updated_at=now,
+                               metadata=merged, codec=spec)
+            self._enqueue(item_id, _QueuedWrite(item, payload, merge=True))
+            return item_id
+        item.data = data
+        item.compressed = False
+        item.codec = spec
+        item.updated_at = now
         if metadata:
             item.metadata.update(metadata)
-        await self._save_item(item)
+        self._enqueue(item_id, _QueuedWrite(_snapshot(item), payload))
         return item_id
 
     async def delete(self, key: str) -> None:
@@ -123,18 +311,66 @@ class PersistenceManager:
         item_id = self.indices.pop(key, None)
         if item_id:
             self.items.pop(item_id, None)
-            item_file = self.storage_path / f"item_{item_id}.dat"
-            if item_file.exists():
-                item_file.unlink()
-            await self._save_index()
+            self._enqueue(item_id, None, {"op": "del", "key": key})
 
-    def _compress_data(self, data: Any) -> bytes:
-        """Compress data using pickle and zlib"""
-        pickled = pickle.dumps(data)
-        return zlib.compress(pickled)
+    def codec_for(self, key: str) -> str:
+        """Codec spec for a key: an exact entry, then its namespace, then the default"""
+        codecs = self.config.codecs
+        if key in codecs:
+            return codecs[key]
+        namespace, separator, _ = key.partition(":")
+        if separator and namespace in codecs:
+            return codecs[namespace]
+        return self.default_codec
+
+    def _write_codec(self, key: str, codec: Optional[str]) -> str:
+        """Codec spec for a write: the given one, the resident item's, then ``codec_for``"""
+        if codec:
+            return codec
+        item_id = self.indices.get(key)
+        item = self.items.get(item_id) if item_id is not None else None
+        if item is not None and item.codec:
+            return item.codec
+        return self.codec_for(key)
+
+    @staticmethod
+    def _encode(spec: str, data: Any) -> bytes:
+        return get_codec(spec).encode(data)
+
+    def _item_data(self, item: StorageItem) -> Any:
+        return self._decompress_data(item.data) if item.compressed else item.data
+
+    def _cache(self, item: StorageItem) -> None:
+        """Make an item resident, dropping the least recently used beyond ``cache_size``"""
+        self.items[item.id] = item
+        self.items.move_to_end(item.id)
+        while len(self.items) > self.config.cache_size:
+            self.items.popitem(last=False)
+
+    async def _make_resident(self, key: str) -> None:
+        """Load the item of an existing key into the LRU off the loop, so updating it never blocks"""
+        item_id = self.indices.get(key)
+        if item_id is None or item_id in self.items:
+            return
+        item = await asyncio.to_thread(self._load_item, item_id)
+        # The key may have been deleted or its item loaded meanwhile
+        if item is not None and self.indices.get(key) == item_id and item_id not in self.items:
+            self._cache(item)
+
+    def _load_item(self, item_id: UUID) -> Optional[StorageItem]:
+        """Read an item, preferring a queued or in-flight write over its file"""
+        with self._cond:
+            queued = self._pending.get(item_id, self._inflight.get(item_id))
+        if queued is not None:
+            return self._merge_stored(queued) if queued.merge else _snapshot(queued.item)
+        try:
+            return self._deserialize(_read_file(self.storage_path / f"item_{item_id}.dat"))
+        except Exception as e:
+            print(f"Error loading item {item_id}: {str(e)}")
+            return None
 
     def _decompress_data(self, data: bytes) -> Any:
-        """Decompress data"""
+        """Decompress data of a legacy compressed item"""
         try:
             decompressed = zlib.decompress(data)
             return pickle.loads(decompressed)
@@ -142,27 +378,187 @@ class PersistenceManager:
             print(f"Decompression error: {str(e)}")
             return data
 
-    async def _save_item(self, item: StorageItem) -> None:
-        """Save a storage item to disk"""
-        item_file = self.storage_path / f"item_{item.id}.dat"
+    def _merge_stored(self, write: _QueuedWrite) -> StorageItem:
+        """A merge write's item with the creation time and metadata of the stored item"""
+        item = _snapshot(write.item)
         try:
-            with open(item_file, 'wb') as f:
-                pickle.dump(item, f)
+            stored = self._read_envelope(self.storage_path / f"item_{item.id}.dat")
         except Exception as e:
-            print(f"Error saving item {item.id}: {str(e)}")
+            print(f"Error reading stored envelope of item {item.id}: {str(e)}")
+            return item
+        item.created_at = stored.created_at
+        item.metadata = {**stored.metadata, **item.metadata}
+        return item
+
+    def _read_envelope(self, path: Path) -> StorageItem:
+        """An item file's envelope, without reading or decoding its data"""
+        with open(path, 'rb') as f:
+            header = f.read(_ITEM_HEADER.size)
+            if header[:len(_ITEM_MAGIC)] != _ITEM_MAGIC:
+                # Legacy files are a single pickle
+                f.seek(0)
+                return self._deserialize(f.read())
+            _, spec_size, envelope_size = _ITEM_HEADER.unpack(header)
+            f.seek(spec_size, os.SEEK_CUR)
+            return pickle.loads(f.read(envelope_size))
+
+    def _serialize(self, item: StorageItem, payload: bytes) -> bytes:
+        envelope = pickle.dumps(replace(item, data=None), protocol=pickle.HIGHEST_PROTOCOL)
+        spec = item.codec.encode("utf-8")
+        return b"".join([_ITEM_HEADER.pack(_ITEM_MAGIC, len(spec), len(envelope)), spec, envelope, payload])
 
-    async def _save_index(self) -> None:
-        """Save the index mapping to disk"""
-        index_file = self.storage_path / "index.json"
+    def _deserialize(self, payload: Union[bytes, bytearray]) -> Optional[StorageItem]:
+        view = memoryview(payload)
+        if bytes(view[:len(_ITEM_MAGIC)]) != _ITEM_MAGIC:
+            # Files written before codecs hold a pickled StorageItem
+            item = pickle.loads(payload)
+            return item if isinstance(item, StorageItem) else None
+        _, spec_size, envelope_size = _ITEM_HEADER.unpack_from(view)
+        offset = _ITEM_HEADER.size
+        spec = bytes(view[offset:offset + spec_size]).decode("utf-8")
+        offset += spec_size
+        item = pickle.loads(view[offset:offset + envelope_size])
+        item.data = get_codec(spec).decode(view[offset + envelope_size:])
+        return item
+
+    def _enqueue(self,
+                 item_id: UUID,
+                 write: Optional[_QueuedWrite],
+                 journal_record: Optional[Dict[str, str]] = None,
+                 backup: bool = False) -> None:
+        """Queue an item write (or removal) for the background writer"""
+        with self._cond:
+            if item_id in self._pending:
+                self.stats["coalesced"] += 1
+            self._pending[item_id] = write
+            if journal_record is not None:
+                self._journal.append(journal_record)
+            self._backup_requested = self._backup_requested or backup
+            # The writer exits once the queue is empty, so it never holds up interpreter exit
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="persistence-writer")
+                self._writer.start()
+            self._cond.notify_all()
+
+    def _write_loop(self) -> None:
+        """Write queued batches until the queue is empty (writer thread)"""
+        failures = 0
+        while True:
+            with self._cond:
+                if not (self._pending or self._journal or self._backup_requested):
+                    self._writer = None
+                    self._cond.notify_all()
+                    return
+                batch, self._pending = self._pending, {}
+                journal, self._journal = self._journal, []
+                backup, self._backup_requested = self._backup_requested, False
+                self._inflight = batch
+                self._writing = True
+            retry_delay = 0.0
+            try:
+                self._write_batch(batch, journal)
+                failures = 0
+                if backup:
+                    self._write_backup()
+            except Exception as e:
+                self.stats["errors"] += 1
+                failures += 1
+                if failures <= self.config.write_retries:
+                    print(f"Error writing storage batch (attempt {failures}), retrying: {str(e)}")
+                    self._requeue(batch, journal, backup)
+                    retry_delay = min(0.1 * 2 ** (failures - 1), 5.0)
+                else:
+                    print(f"Error writing storage batch, dropping {len(batch)} items: {str(e)}")
+                    failures = 0
+            finally:
+                with self._cond:
+                    self._inflight = {}
+                    self._writing = False
+                    self._cond.notify_all()
+            if retry_delay:
+                time.sleep(retry_delay)
+
+    def _requeue(self,
+                 batch: Dict[UUID, Optional[_QueuedWrite]],
+                 journal: List[Dict[str, str]],
+                 backup: bool) -> None:
+        """Put a failed batch back on the queue; writes queued since it was taken win"""
+        with self._cond:
+            for item_id, write in batch.items():
+                self._pending.setdefault(item_id, write)
+            self._journal[:0] = journal
+            self._backup_requested = self._backup_requested or backup
+
+    def _write_batch(self, batch: Dict[UUID, Optional[_QueuedWrite]], journal: List[Dict[str, str]]) -> None:
+        """
+        Item files first, then the journal, then removals: the index on disk
+        never names an item file that has not been written yet. A failed
+        write raises so the writer can queue the batch again.
+        """
+        for item_id, write in batch.items():
+            if write is None:
+                continue
+            item = self._merge_stored(write) if write.merge else write.item
+            _atomic_write(self.storage_path / f"item_{item_id}.dat", self._serialize(item, write.payload))
+            self.stats["writes"] += 1
+        if journal:
+            self._append_journal(journal)
+        for item_id, write in batch.items():
+            if write is None:
+                item_file = self.storage_path / f"item_{item_id}.dat"
+                if item_file.exists():
+                    item_file.unlink()
+        self.stats["batches"] += 1
+        if self._journal_records >= self.config.checkpoint_interval:
+            self._checkpoint()
+
+    def _append_journal(self, records: List[Dict[str, str]]) -> None:
+        with open(self._journal_file, 'a') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            if record["op"] == "set":
+                self._durable_index[record["key"]] = record["id"]
+            else:
+                self._durable_index.pop(record["key"], None)
+        self._journal_records += len(records)
+
+    def _checkpoint(self) -> None:
+        """Rewrite index.json from the journaled index and reset the journal"""
         try:
-            with open(index_file, 'w') as f:
-                json.dump({k: str(v) for k, v in self.indices.items()}, f)
+            _atomic_write(self._index_file, json.dumps(self._durable_index).encode("utf-8"))
+            # Replaying the old journal over the new checkpoint is harmless if we stop here
+            self._journal_file.unlink(missing_ok=True)
+            self._journal_records = 0
+            self.stats["checkpoints"] += 1
         except Exception as e:
+            self.stats["errors"] += 1
             print(f"Error saving index: {str(e)}")
 
+    def flush_sync(self) -> None:
+        """Block until every queued write is on disk"""
+        with self._cond:
+            while self._writer is not None or self._writing:
+                self._cond.wait()
+
+    async def flush(self) -> None:
+        """Wait for every queued write without blocking the event loop"""
+        await asyncio.to_thread(self.flush_sync)
+
+    def close(self) -> None:
+        """Flush queued writes and checkpoint the index"""
+        self.flush_sync()
+        if self._journal_records:
+            self._checkpoint()
+
     def create_backup(self) -> Path:
-        """Create a backup of the storage directory"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        """Create a backup of the storage directory once queued writes are on disk"""
+        self.flush_sync()
+        return self._write_backup()
+
+    def _write_backup(self) -> Path:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         backup_path = self.storage_path.parent / f"storage_backup_{timestamp}"
         try:
             shutil.copytree(self.storage_path, backup_path)
@@ -180,6 +576,7 @@ class PersistenceManager:
         backup_path = Path(backup_path)
         if not backup_path.exists():
             raise FileNotFoundError(f"Backup not found: {backup_path}")
+        self.flush_sync()
         # Clear current storage and copy backup
         if self.storage_path.exists():
             shutil.rmtree(self.storage_path)
@@ -189,6 +586,26 @@ class PersistenceManager:
         self.indices.clear()
         self._load_existing_data()
 
+def _snapshot(item: StorageItem) -> StorageItem:
+    """Copy of an item for the write queue; ``data`` itself is shared, not copied"""
+    return replace(item, metadata=dict(item.metadata))
+
+def _read_file(path: Path) -> bytearray:
+    """Read a whole file into a writable buffer"""
+    with open(path, 'rb') as f:
+        buffer = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(buffer)
+    return buffer
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    """Write a file through a temp file and rename, so readers never see a partial file"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 class StorageError(Exception):
     """Custom exception for storage-related errors"""
     pass
@@ -48,3 +48,15 @@ def load_config(config_path: str = None) -> dict:
         else:
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
     return config
+
+def get_cache_dir() -> Path:
+    """
+    Root directory for persistent indexes (scan index, dependency graph):
+    $CMATE_CACHE_DIR, else ``general.cache_dir`` from the configuration,
+    else the user cache directory (``$XDG_CACHE_HOME/cmate`` or
+    ``~/.cache/cmate``). Never the current working directory.
+    """
+    configured = os.getenv("CMATE_CACHE_DIR") or config.get("general", {}).get("cache_dir")
+    if configured:
+        return Path(configured).expanduser().resolve()
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "cmate"
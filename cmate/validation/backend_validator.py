@@ -6,6 +6,8 @@ import json
 import re
 from pathlib import Path
 
+from ..file_services.python_extractor import extract_python
+
 @dataclass
 class ValidationIssue:
     """Details of a validation issue."""
@@ -92,17 +94,16 @@ class BackendValidator:
         metrics = {"loc": len(content.splitlines()), "comments": len(re.findall(r'#.*$', content, re.MULTILINE))}
         
         try:
-            tree = ast.parse(content)
+            extraction = extract_python(content)
+            if extraction.syntax_error is not None:
+                raise extraction.new_syntax_error()
             
             # Analyze imports
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        imports.append(name.name)
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ''
-                    for name in node.names:
-                        imports.append(f"{module}.{name.name}")
+            for record in extraction.imports:
+                if record.name is None:
+                    imports.append(record.module)
+                else:
+                    imports.append(f"{record.module or ''}.{record.name}")
             # Check duplicate imports
             dupes = {x for x in imports if imports.count(x) > 1}
             if dupes:
@@ -114,96 +115,77 @@ class BackendValidator:
                 ))
             
             # Analyze functions
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    args = [arg.arg for arg in node.args.args]
-                    returns = self._get_type_name(node.returns) if node.returns else None
-                    docstring = ast.get_docstring(node)
-                    complexity = self._calculate_complexity(node)
-                    func = CodeFunction(
-                        name=node.name,
-                        args=args,
-                        returns=returns,
-                        docstring=docstring,
-                        complexity=complexity,
-                        source=ast.unparse(node) if hasattr(ast, "unparse") else ""
-                    )
-                    functions.append(func)
-                    # Validate function details
-                    if complexity > self.max_complexity:
-                        issues.append(ValidationIssue(
-                            level="warning",
-                            message=f"Function {node.name} has high complexity ({complexity})",
-                            location=f"function {node.name}",
-                            suggestion="Consider refactoring into smaller functions"
-                        ))
-                    if self.required_docstrings and not docstring:
-                        issues.append(ValidationIssue(
-                            level="warning",
-                            message=f"Missing docstring in function {node.name}",
-                            location=f"function {node.name}",
-                            suggestion="Add a docstring describing the function's purpose and parameters"
-                        ))
-                    if self.check_type_hints and not returns:
-                        issues.append(ValidationIssue(
-                            level="info",
-                            message=f"Missing return type hint in function {node.name}",
-                            location=f"function {node.name}",
-                            suggestion="Add return type hint"
-                        ))
+            code_functions: Dict[int, CodeFunction] = {}
+            for record in extraction.functions:
+                node = record.node
+                func = CodeFunction(
+                    name=record.name,
+                    args=record.args,
+                    returns=self._get_type_name(node.returns) if node.returns else None,
+                    docstring=ast.get_docstring(node),
+                    complexity=record.complexity,
+                    source=ast.unparse(node) if hasattr(ast, "unparse") else ""
+                )
+                code_functions[id(record)] = func
+                functions.append(func)
+                # Validate function details
+                if func.complexity > self.max_complexity:
+                    issues.append(ValidationIssue(
+                        level="warning",
+                        message=f"Function {func.name} has high complexity ({func.complexity})",
+                        location=f"function {func.name}",
+                        suggestion="Consider refactoring into smaller functions"
+                    ))
+                if self.required_docstrings and not func.docstring:
+                    issues.append(ValidationIssue(
+                        level="warning",
+                        message=f"Missing docstring in function {func.name}",
+                        location=f"function {func.name}",
+                        suggestion="Add a docstring describing the function's purpose and parameters"
+                    ))
+                if self.check_type_hints and not func.returns:
+                    issues.append(ValidationIssue(
+                        level="info",
+                        message=f"Missing return type hint in function {func.name}",
+                        location=f"function {func.name}",
+                        suggestion="Add return type hint"
+                    ))
             
             # Analyze classes
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    bases = [self._get_type_name(base) for base in node.bases]
-                    methods = []
-                    properties = []
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            args = [arg.arg for arg in item.args.args]
-                            ret = self._get_type_name(item.returns) if item.returns else None
-                            doc = ast.get_docstring(item)
-                            comp = self._calculate_complexity(item)
-                            methods.append(CodeFunction(
-                                name=item.name,
-                                args=args,
-                                returns=ret,
-                                docstring=doc,
-                                complexity=comp,
-                                source=ast.unparse(item) if hasattr(ast, "unparse") else ""
-                            ))
-                        elif isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
-                            properties.append(item.target.id)
-                    cls = CodeClass(
-                        name=node.name,
-                        bases=bases,
-                        methods=methods,
-                        docstring=ast.get_docstring(node),
-                        properties=properties
-                    )
-                    classes.append(cls)
-                    if self.required_docstrings and not cls.docstring:
+            for record in extraction.classes:
+                node = record.node
+                bases = [self._get_type_name(base) for base in node.bases]
+                methods = [code_functions[id(method)] for method in record.methods]
+                cls = CodeClass(
+                    name=record.name,
+                    bases=bases,
+                    methods=methods,
+                    docstring=ast.get_docstring(node),
+                    properties=list(record.properties)
+                )
+                classes.append(cls)
+                if self.required_docstrings and not cls.docstring:
+                    issues.append(ValidationIssue(
+                        level="warning",
+                        message=f"Missing docstring in class {node.name}",
+                        location=f"class {node.name}",
+                        suggestion="Add a docstring describing the class's purpose"
+                    ))
+                if not bases:
+                    issues.append(ValidationIssue(
+                        level="info",
+                        message=f"Class {node.name} has no base classes",
+                        location=f"class {node.name}",
+                        suggestion="Consider whether inheritance is applicable"
+                    ))
+                for method in methods:
+                    if method.complexity > self.max_complexity:
                         issues.append(ValidationIssue(
                             level="warning",
-                            message=f"Missing docstring in class {node.name}",
-                            location=f"class {node.name}",
-                            suggestion="Add a docstring describing the class's purpose"
-                        ))
-                    if not bases:
-                        issues.append(ValidationIssue(
-                            level="info",
-                            message=f"Class {node.name} has no base classes",
+                            message=f"Method {method.name} in class {node.name} has high complexity ({method.complexity})",
                             location=f"class {node.name}",
-                            suggestion="Consider whether inheritance is applicable"
+                            suggestion="Refactor the method into simpler sub-methods"
                         ))
-                    for method in methods:
-                        if method.complexity > self.max_complexity:
-                            issues.append(ValidationIssue(
-                                level="warning",
-                                message=f"Method {method.name} in class {node.name} has high complexity ({method.complexity})",
-                                location=f"class {node.name}",
-                                suggestion="Refactor the method into simpler sub-methods"
-                            ))
             
             overall_complexity = sum(func.complexity for func in functions) + sum(
                 sum(m.complexity for m in cls.methods) for cls in classes
@@ -249,16 +231,6 @@ class BackendValidator:
         else:
             return str(node)
 
-    def _calculate_complexity(self, node: ast.AST) -> int:
-        """Calculate a simple cyclomatic complexity metric for a node."""
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.Try, ast.With, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
-        return complexity
-
     async def _validate_json(self, content: str, path: Path) -> BackendValidationResult:
         """Validate a JSON configuration file."""
         errors = []
@@ -1,6 +1,8 @@
 # config/gunicorn.py
 import multiprocessing
 
+from cmate.utils.config import load_config
+
 # Gunicorn config
 bind = "0.0.0.0:8000"
 workers = multiprocessing.cpu_count() * 2 + 1
@@ -15,26 +17,15 @@ accesslog = "-"
 errorlog = "-"
 loglevel = "info"
 
-# nginx/nginx.conf
-events {
-    worker_connections 1024;
-}
-
-http {
-    upstream agent_server {
-        server agent:8000;
-    }
-
-    server {
-        listen 80;
-        server_name localhost;
+# With events.transport "socket" the master runs the broker that connects the workers' EventBuses
+def on_starting(server):
+    events = load_config().get("events", {})
+    if events.get("transport", "none") == "socket":
+        from cmate.core.event_transport import start_broker_process
+        server.event_broker = start_broker_process(events.get("broker_address", "temp/eventbus.sock"))
 
-        location / {
-            proxy_pass http://agent_server;
-            proxy_set_header Host $host;
-            proxy_set_header X-Real-IP $remote_addr;
-            proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
-            proxy_set_header X-Forwarded-Proto $scheme;
-        }
-    }
-}
+def on_exit(server):
+    broker = getattr(server, "event_broker", None)
+    if broker is not None:
+        broker.terminate()
+        broker.join(timeout=5)
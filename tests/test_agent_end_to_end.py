@@ -1,11 +1,19 @@
 import unittest
 import asyncio
+import tempfile
+from unittest import mock
 from cmate.core.agent_coordinator import AgentCoordinator, AgentConfig
 from cmate.core.state_manager import StateManager
 from cmate.core.workflow_manager import WorkflowManager
 
 class TestAgentEndToEnd(unittest.TestCase):
     def setUp(self):
+        # Keep the scan index and dependency graph out of the user cache
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        patcher = mock.patch.dict("os.environ", {"CMATE_CACHE_DIR": cache.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
         config = AgentConfig(
             workspace_path="./Workspace",
             max_files_per_scan=5,
@@ -33,5 +41,19 @@ class TestAgentEndToEnd(unittest.TestCase):
             self.assertIsInstance(code, str)
         asyncio.run(run_test())
 
+    def test_start_and_shutdown_services(self):
+        async def run_test():
+            await self.agent.start()
+            self.assertTrue(self.agent._started)
+            self.assertIsNotNone(self.agent.event_bus._scheduler)
+            await self.agent.shutdown()
+            self.assertFalse(self.agent._started)
+        asyncio.run(run_test())
+
+    def test_file_changes_reach_cache_invalidation(self):
+        caches = self.agent.cache_invalidation.get_stats()["caches"]
+        self.assertIn("dependency_cache", caches)
+        self.assertTrue(self.agent.file_watcher.batch_handlers)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import asyncio
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from cmate.core.cache_invalidation import CacheInvalidationRegistry, FILE_CHANGED_EVENT, WHOLE_CACHE
+from cmate.core.event_bus import EventBus
+from cmate.file_services.file_watcher import FileChange, FileChangeBatch, FileWatcher
+from cmate.storage.cache_manager import CacheManager
+
+class TestCacheInvalidationRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = CacheInvalidationRegistry()
+        self.calls = []
+        self.cache_id = self.registry.register("test", lambda keys, paths: self.calls.append((keys, paths)))
+
+    def test_only_dependent_entries_are_invalidated(self):
+        self.registry.depend(self.cache_id, "a", paths=["pkg/a.py", "pkg/shared.py"])
+        self.registry.depend(self.cache_id, "b", paths=["pkg/b.py"])
+        asyncio.run(self.registry.invalidate(["pkg/shared.py"]))
+        self.assertEqual(self.calls, [({"a"}, {"pkg/shared.py"})])
+
+    def test_glob_dependencies(self):
+        self.registry.depend(self.cache_id, "styles", globs=["static/*.css"])
+        self.registry.depend(self.cache_id, "python", paths=["src/**/*.py"])
+        asyncio.run(self.registry.invalidate(["static/site.css", "README.md"]))
+        asyncio.run(self.registry.invalidate(["src/pkg/mod.py"]))
+        self.assertEqual([keys for keys, _ in self.calls], [{"styles"}, {"python"}])
+
+    def test_invalidated_entries_are_forgotten(self):
+        self.registry.depend(self.cache_id, "a", paths=["a.py"])
+        asyncio.run(self.registry.invalidate(["a.py"]))
+        asyncio.run(self.registry.invalidate(["a.py"]))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_whole_cache_dependencies_persist(self):
+        registry_id = self.registry.register("scan", lambda keys, paths: self.calls.append(keys), globs=["*"])
+        asyncio.run(self.registry.invalidate(["x.txt"]))
+        asyncio.run(self.registry.invalidate(["y.txt"]))
+        self.assertEqual(self.calls, [{WHOLE_CACHE}, {WHOLE_CACHE}])
+        self.assertTrue(self.registry.unregister(registry_id))
+
+    def test_cache_manager_items_follow_their_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CacheManager(cache_dir=tmp)
+            cache.attach_invalidation(self.registry)
+            cache.set("analysis:a", {"ok": True}, depends_on=["a.py"])
+            cache.set("analysis:b", {"ok": True}, depends_on=["b.py"])
+            asyncio.run(self.registry.invalidate(["a.py"]))
+            self.assertFalse(cache.exists("analysis:a"))
+            self.assertTrue(cache.exists("analysis:b"))
+
+class TestFileChangedEvents(unittest.TestCase):
+    def test_watcher_batches_invalidate_through_event_bus(self):
+        registry = CacheInvalidationRegistry()
+        invalidated = []
+        cache_id = registry.register("test", lambda keys, paths: invalidated.extend(sorted(paths)))
+        registry.depend(cache_id, "entry", paths=["old.py", "b.py"])
+
+        async def run_test():
+            event_bus = EventBus()
+            await event_bus.start()
+            registry.attach(event_bus)
+            watcher = FileWatcher(tempfile.gettempdir())
+            watcher.publish_to(event_bus)
+            await watcher.batch_handlers[0]([
+                FileChange(Path("new.py"), "moved", datetime.now(), {"source_path": "old.py"})
+            ])
+            await asyncio.sleep(0.1)
+            await event_bus.stop()
+            return event_bus.get_event_history(event_type=FILE_CHANGED_EVENT)
+
+        history = asyncio.run(run_test())
+        self.assertIsInstance(history[0]["data"], FileChangeBatch)
+        self.assertEqual(invalidated, ["old.py"])
+
+if __name__ == '__main__':
+    unittest.main()
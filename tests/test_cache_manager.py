@@ -1,4 +1,5 @@
 import unittest
+from pathlib import Path
 from cmate.storage.cache_manager import CacheManager
 
 class TestCacheManager(unittest.TestCase):
@@ -22,3 +23,90 @@ class TestCacheManager(unittest.TestCase):
 
 if __name__ == '__main__':
     unittest.main()
+
+class TestCacheEviction(unittest.TestCase):
+    def _cache(self, **kwargs):
+        return CacheManager(**kwargs)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = self._cache(max_size=2, eviction_policy="lru")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertTrue(cache.exists("a"))
+        self.assertFalse(cache.exists("b"))
+        self.assertTrue(cache.exists("c"))
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = self._cache(max_size=2, eviction_policy="lfu")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        for _ in range(3):
+            cache.get("b")
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertFalse(cache.exists("a"))
+        self.assertTrue(cache.exists("b"))
+        self.assertTrue(cache.exists("c"))
+
+    def test_tinylfu_rejects_one_off_keys(self):
+        cache = self._cache(max_size=2, eviction_policy="tinylfu")
+        cache.set("hot1", 1)
+        cache.set("hot2", 2)
+        for _ in range(5):
+            cache.get("hot1")
+            cache.get("hot2")
+        cache.set("scan", 3)
+        self.assertFalse(cache.exists("scan"))
+        self.assertTrue(cache.exists("hot1") and cache.exists("hot2"))
+        self.assertEqual(cache.get_stats()["rejections"], 1)
+
+    def test_memory_budget_and_incremental_accounting(self):
+        cache = self._cache(max_size=100, eviction_policy="lru", max_memory_bytes=3000)
+        for i in range(10):
+            cache.set(f"k{i}", "x" * 500)
+        stats = cache.get_stats()
+        self.assertLessEqual(stats["memory_usage"], 3000)
+        self.assertLess(stats["total_items"], 10)
+        self.assertTrue(cache.exists("k9"))
+        self.assertEqual(stats["memory_usage"], sum(item.size_bytes for item in cache.cache.values()))
+        cache.clear()
+        self.assertEqual(cache.get_stats()["memory_usage"], 0)
+
+    def test_replacing_a_key_does_not_grow_accounting(self):
+        cache = self._cache(max_size=10)
+        cache.set("a", "x" * 100)
+        before = cache.get_stats()["memory_usage"]
+        cache.set("a", "x" * 100)
+        self.assertEqual(cache.get_stats()["memory_usage"], before)
+        self.assertEqual(len(cache.cache), 1)
+
+class TestPersistentCache(unittest.TestCase):
+    def test_items_load_lazily_from_single_file(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CacheManager(cache_dir=tmp)
+            for i in range(20):
+                cache.set(f"k{i}", {"value": i})
+            cache.close()
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["cache.log", "cache.log.hint"])
+
+            reopened = CacheManager(cache_dir=tmp)
+            self.assertEqual(len(reopened.cache), 0)
+            self.assertTrue(reopened.exists("k3"))
+            self.assertEqual(reopened.get("k3"), {"value": 3})
+            self.assertEqual(len(reopened.cache), 1)
+            self.assertTrue(reopened.delete("k4"))
+            self.assertIsNone(reopened.get("k4"))
+            reopened.close()
+
+    def test_evicted_persistent_items_are_reloaded(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CacheManager(cache_dir=tmp, max_size=2, eviction_policy="lru")
+            for key in "abc":
+                cache.set(key, key.upper())
+            self.assertEqual(len(cache.cache), 2)
+            self.assertEqual(cache.get("a"), "A")
+            cache.close()
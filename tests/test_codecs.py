@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from cmate.storage.codecs import available_codecs, get_codec
+
+class TestCodecs(unittest.TestCase):
+    def test_round_trip_for_available_codecs(self):
+        data = {"request_id": "abc", "steps": [1, 2, 3], "ok": True, "score": 0.5, "note": None}
+        for spec in available_codecs():
+            codec = get_codec(spec)
+            self.assertEqual(codec.decode(codec.encode(data)), data, spec)
+
+    def test_spec_with_level(self):
+        codec = get_codec("pickle+zlib:9")
+        self.assertEqual(codec.compressor, "zlib")
+        self.assertEqual(codec.level, 9)
+        self.assertEqual(get_codec("json+zlib").level, 6)
+
+    def test_unknown_specs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+        with self.assertRaises(ValueError):
+            get_codec("pickle+brotli")
+
+    def test_pickle_out_of_band_buffers(self):
+        codec = get_codec("pickle")
+        vectors = np.arange(4096, dtype=np.float32).reshape(64, 64)
+        payload = codec.encode({"vectors": vectors})
+        # The array is framed raw after the pickle stream, not copied into it
+        self.assertLess(len(payload) - vectors.nbytes, 512)
+        decoded = codec.decode(bytearray(payload))["vectors"]
+        np.testing.assert_array_equal(decoded, vectors)
+        self.assertTrue(decoded.flags.writeable)
+        self.assertTrue(codec.decode(payload)["vectors"].flags.writeable)
+
+    def test_json_falls_back_to_strings(self):
+        from datetime import datetime
+        codec = get_codec("json")
+        when = datetime(2024, 1, 2, 3, 4, 5)
+        self.assertEqual(codec.decode(codec.encode({"when": when})), {"when": when.isoformat()})
+
+    def test_json_uses_builtin_forms_of_dataclasses(self):
+        from datetime import datetime
+        from pathlib import Path
+        from cmate.file_services.file_watcher import FileChange, FileChangeBatch
+        codec = get_codec("json")
+        change = FileChange(Path("a.py"), "modified", datetime(2024, 1, 2))
+        self.assertEqual(codec.decode(codec.encode(change)),
+                         {"path": "a.py", "event_type": "modified", "timestamp": "2024-01-02T00:00:00", "details": None})
+        batch = FileChangeBatch(Path("ws"), [change], datetime(2024, 1, 2))
+        self.assertEqual(codec.decode(codec.encode({"data": batch})),
+                         {"data": {"workspace": "ws", "paths": ["a.py"], "timestamp": "2024-01-02T00:00:00"}})
+
+    def test_json_rejects_values_without_a_builtin_form(self):
+        with self.assertRaises(TypeError):
+            get_codec("json").encode({"request": object()})
+
+if __name__ == '__main__':
+    unittest.main()
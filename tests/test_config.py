@@ -1,5 +1,8 @@
 import unittest
-from cmate.utils.config import load_config
+import os
+from pathlib import Path
+from unittest import mock
+from cmate.utils.config import load_config, get_cache_dir
 
 class TestConfig(unittest.TestCase):
     def test_load_default_config(self):
@@ -7,5 +10,12 @@ class TestConfig(unittest.TestCase):
         self.assertIsInstance(config, dict)
         self.assertIn("general", config)
 
+    def test_cache_dir_is_configurable_and_not_the_working_directory(self):
+        with mock.patch.dict("os.environ", {"CMATE_CACHE_DIR": "/tmp/cmate-cache"}):
+            self.assertEqual(get_cache_dir(), Path("/tmp/cmate-cache").resolve())
+        with mock.patch.dict("os.environ", {"CMATE_CACHE_DIR": ""}):
+            self.assertTrue(get_cache_dir().is_absolute())
+            self.assertNotEqual(get_cache_dir().parent, Path(os.getcwd()))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+import cmate.utils.logger  # registers Logger.success used by the executor
+from cmate.core.dependency_graph import ProjectDependencyGraph, file_fingerprint
+from cmate.core.navigation_executor import NavigationActionExecutor
+from cmate.file_services.file_watcher import FileWatcher, FileChange
+
+class TestProjectDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name) / "ws"
+        self.workspace.mkdir()
+        for name in ("a.py", "b.py", "c.py", "d.py"):
+            (self.workspace / name).write_text("")
+        self.graph_path = Path(self.tmp.name) / "graph.json"
+        self.graph = ProjectDependencyGraph(self.workspace, self.graph_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _p(self, name):
+        return self.workspace / name
+
+    def test_direct_reverse_and_transitive_queries(self):
+        self.graph.set_edges(self._p("a.py"), [self._p("b.py")])
+        self.graph.set_edges(self._p("b.py"), [self._p("c.py")])
+        self.assertEqual(self.graph.direct(self._p("a.py")), [self._p("b.py")])
+        self.assertEqual(self.graph.reverse(self._p("c.py")), [self._p("b.py")])
+        self.assertEqual(sorted(self.graph.transitive(self._p("a.py"))), [self._p("b.py"), self._p("c.py")])
+        self.assertEqual(self.graph.transitive_reverse(self._p("c.py")), [self._p("b.py"), self._p("a.py")])
+
+    def test_set_edges_patches_reverse_index(self):
+        self.graph.set_edges(self._p("a.py"), [self._p("b.py"), self._p("c.py")])
+        added, removed = self.graph.set_edges(self._p("a.py"), [self._p("c.py"), self._p("d.py")])
+        self.assertEqual(added, {"d.py"})
+        self.assertEqual(removed, {"b.py"})
+        self.assertNotIn("b.py", self.graph.reverse_nodes)
+        self.assertEqual(self.graph.reverse(self._p("d.py")), [self._p("a.py")])
+
+    def test_remove_returns_dependents(self):
+        self.graph.set_edges(self._p("a.py"), [self._p("b.py")])
+        self.graph.set_edges(self._p("b.py"), [self._p("c.py")])
+        dependents = self.graph.remove(self._p("b.py"))
+        self.assertEqual(dependents, {self._p("a.py")})
+        self.assertEqual(self.graph.direct(self._p("a.py")), [])
+        self.assertEqual(self.graph.reverse(self._p("c.py")), [])
+
+    def test_unresolved_references_are_tracked(self):
+        self.graph.set_edges(self._p("a.py"), [], unresolved=["pkg.mod"])
+        self.assertEqual(self.graph.waiting_for(["pkg.mod"]), {self._p("a.py")})
+        self.graph.set_edges(self._p("a.py"), [])
+        self.assertEqual(self.graph.waiting_for(["pkg.mod"]), set())
+
+    def test_persists_edges_and_fingerprints(self):
+        self.graph.set_edges(self._p("a.py"), [self._p("b.py")], unresolved=["x"])
+        self.graph.save()
+        loaded = ProjectDependencyGraph(self.workspace, self.graph_path)
+        self.assertTrue(loaded.load())
+        self.assertEqual(loaded.direct(self._p("a.py")), [self._p("b.py")])
+        self.assertEqual(loaded.reverse(self._p("b.py")), [self._p("a.py")])
+        self.assertEqual(loaded.waiting_for(["x"]), {self._p("a.py")})
+        self.assertTrue(loaded.is_current(self._p("a.py")))
+
+        path = self._p("a.py")
+        path.write_text("import b\n")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+        self.assertFalse(loaded.is_current(path))
+        self.assertEqual(file_fingerprint(path)[0], len("import b\n"))
+
+class TestExecutorDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.dict("os.environ", {"CMATE_CACHE_DIR": str(Path(self.tmp.name) / "cache")})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.workspace = Path(self.tmp.name) / "ws"
+        self.workspace.mkdir()
+        (self.workspace / "a.py").write_text("import b\n")
+        (self.workspace / "b.py").write_text("")
+        (self.workspace / "c.py").write_text("")
+
+    def test_start_builds_the_graph_and_follows_watcher_batches(self):
+        executor = NavigationActionExecutor(str(self.workspace))
+        watcher = FileWatcher(str(self.workspace))
+        graph = executor.dependency_analyzer.graph
+
+        async def run():
+            stats = await executor.start(watcher)
+            self.assertEqual(stats["files"], 3)
+            self.assertEqual(graph.direct(self.workspace / "a.py"), [self.workspace / "b.py"])
+            (self.workspace / "a.py").write_text("import c\n")
+            for handler in watcher.batch_handlers:
+                await handler([FileChange(Path("a.py"), "modified", datetime.now())])
+            self.assertEqual(graph.direct(self.workspace / "a.py"), [self.workspace / "c.py"])
+            executor.close()
+        asyncio.run(run())
+        self.assertEqual(watcher.batch_handlers, [])
+        self.assertTrue(graph.graph_path.exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import asyncio
+import tempfile
+from pathlib import Path
+import numpy as np
+from cmate.file_services.embedding_index import EmbeddingIndex, HashingEmbedder
+
+def _module(name, body_lines=30):
+    lines = [f"def {name}_function():"] + [f"    {name}_value = {i}" for i in range(body_lines)]
+    return "\n".join(lines)
+
+class TestEmbeddingIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_dir = Path(self.tmp.name) / "embeddings"
+        self.embedder = HashingEmbedder(dimension=64)
+        self.index = EmbeddingIndex(self.index_dir, self.embedder, chunk_lines=20, batch_size=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, coro):
+        return asyncio.run(coro)
+
+    def test_hashing_embedder_is_deterministic(self):
+        first = self._run(self.embedder.embed(["parse config file"]))
+        second = self._run(HashingEmbedder(dimension=64).embed(["parse config file"]))
+        self.assertEqual(first, second)
+
+    def test_search_ranks_matching_file_first(self):
+        self._run(self.index.index_files({
+            "billing.py": "def compute_invoice_total(invoice):\n    return invoice.total\n",
+            "users.py": "def load_user_profile(user):\n    return user.profile\n"
+        }))
+        matches = self._run(self.index.search("invoice total", k=1))
+        self.assertEqual(matches[0].chunk.path, "billing.py")
+        self.assertGreater(matches[0].score, 0.0)
+
+    def test_only_changed_chunks_are_embedded(self):
+        text = "\n".join([_module("alpha"), _module("beta"), _module("gamma")])
+        counts = self._run(self.index.index_files({"mod.py": text}))
+        self.assertGreaterEqual(counts["embedded"], 3)
+
+        edited = "\n".join([_module("alpha"), _module("beta").replace("= 3", "= 300"), _module("gamma")])
+        counts = self._run(self.index.index_files({"mod.py": edited}))
+        self.assertEqual(counts["embedded"], 1)
+        self.assertGreaterEqual(counts["kept"], 2)
+
+    def test_duplicate_content_reuses_vectors(self):
+        self._run(self.index.index_files({"a.py": _module("shared")}))
+        calls = self.embedder.calls
+        counts = self._run(self.index.index_files({"b.py": _module("shared")}))
+        self.assertEqual(counts["embedded"], 0)
+        self.assertGreater(counts["copied"], 0)
+        self.assertEqual(self.embedder.calls, calls)
+
+    def test_chunk_moved_between_files_in_one_call(self):
+        self._run(self.index.index_files({"a.py": _module("foo"), "b.py": "x = 2\n"}))
+        calls = self.embedder.calls
+        counts = self._run(self.index.index_files({"a.py": "x = 3\n", "b.py": _module("foo")}))
+        self.assertEqual(self.embedder.calls, calls + 1)
+        self.assertGreater(counts["copied"], 0)
+        matches = self._run(self.index.search("foo_function foo_value", k=1))
+        self.assertEqual(matches[0].chunk.path, "b.py")
+        self.assertEqual(self.index.get_stats()["chunks"], len(self.index.chunks["a.py"]) + len(self.index.chunks["b.py"]))
+
+    def test_embedding_calls_are_batched(self):
+        texts = {f"m{i}.py": f"def unique_name_{i}():\n    return {i}\n" for i in range(10)}
+        self._run(self.index.index_files(texts))
+        self.assertEqual(self.embedder.calls, 3)
+
+    def test_removed_file_rows_are_reused(self):
+        self._run(self.index.index_files({"a.py": "def first():\n    pass\n"}))
+        rows = self.index.get_stats()["rows"]
+        self.index.remove_files(["a.py"])
+        self.assertEqual(self._run(self.index.search("first")), [])
+        self._run(self.index.index_files({"b.py": "def second():\n    pass\n"}))
+        self.assertEqual(self.index.get_stats()["rows"], rows)
+
+    def test_persists_and_reloads_memory_mapped_vectors(self):
+        self._run(self.index.index_files({"a.py": "def parse_settings():\n    pass\n"}, {"a.py": (10, 1)}))
+        self.index.save()
+        loaded = EmbeddingIndex(self.index_dir, HashingEmbedder(dimension=64))
+        self.assertIsInstance(loaded._vectors, np.memmap)
+        self.assertEqual(loaded.fingerprints["a.py"], (10, 1))
+        matches = self._run(loaded.search("parse settings", k=1))
+        self.assertEqual(matches[0].chunk.path, "a.py")
+
+        other = EmbeddingIndex(self.index_dir, HashingEmbedder(dimension=32))
+        self.assertEqual(other.chunks, {})
+
+    def test_sync_workspace_reads_only_changed_files(self):
+        workspace = Path(self.tmp.name) / "ws"
+        workspace.mkdir()
+        (workspace / "a.py").write_text("def alpha():\n    pass\n")
+        (workspace / "b.py").write_text("def beta():\n    pass\n")
+        counts = self._run(self.index.sync_workspace(workspace, {"a.py": (1, 1), "b.py": (1, 1)}))
+        self.assertEqual(counts["files"], 2)
+        counts = self._run(self.index.sync_workspace(workspace, {"a.py": (1, 2)}))
+        self.assertEqual(counts["files"], 1)
+        self.assertEqual(counts["removed"], 1)
+        self.assertEqual(set(self.index.chunks), {"a.py"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,5 +49,253 @@ class TestEventBus(unittest.TestCase):
         self.loop.run_until_complete(asyncio.sleep(0.2))
         self.assertEqual(len(events), 0)
 
+class TestEventBusBackpressure(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def _drain(self, event_bus):
+        self._run(event_bus.start())
+        self._run(asyncio.sleep(0.05))
+        self._run(event_bus.stop())
+
+    def test_drop_oldest(self):
+        event_bus = EventBus(max_queue_size=2, backpressure="drop_oldest")
+        received = []
+        event_bus.subscribe("tick", lambda event: received.append(event["data"]))
+        for i in range(3):
+            self._run(event_bus.publish("tick", i))
+        self.assertEqual(event_bus.get_stats()["dropped"], 1)
+        self._drain(event_bus)
+        self.assertEqual(received, [1, 2])
+
+    def test_coalesce_keeps_latest_per_key(self):
+        event_bus = EventBus(backpressure="coalesce")
+        received = []
+        event_bus.subscribe("progress", lambda event: received.append(event["data"]))
+        for i in range(5):
+            self._run(event_bus.publish("progress", i, metadata={"coalesce_key": "task-1"}))
+        self._run(event_bus.publish("progress", "other", metadata={"coalesce_key": "task-2"}))
+        self.assertEqual(event_bus.get_stats()["coalesced"], 4)
+        self._drain(event_bus)
+        self.assertEqual(received, [4, "other"])
+        # History still records every published event
+        self.assertEqual(len(event_bus.get_event_history(event_type="progress")), 6)
+
+    def test_coalesce_leaves_events_without_a_key_alone(self):
+        event_bus = EventBus(backpressure="coalesce")
+        received = []
+        event_bus.subscribe("log", lambda event: received.append(event["data"]))
+        for i in range(3):
+            self._run(event_bus.publish("log", i))
+        self.assertEqual(event_bus.get_stats()["coalesced"], 0)
+        self._drain(event_bus)
+        self.assertEqual(received, [0, 1, 2])
+
+    def test_block_waits_for_space(self):
+        event_bus = EventBus(max_queue_size=1, backpressure="block")
+        release = asyncio.Event()
+        received = []
+
+        async def slow_handler(event):
+            await release.wait()
+            received.append(event["data"])
+
+        event_bus.subscribe("job", slow_handler)
+
+        async def run_test():
+            await event_bus.start()
+            await event_bus.publish("job", 1)
+            await asyncio.sleep(0.01)   # the worker takes event 1 and waits in the handler
+            await event_bus.publish("job", 2)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(event_bus.publish("job", 3), 0.05)
+            release.set()
+            await event_bus.publish("job", 4)
+            await asyncio.sleep(0.05)
+            await event_bus.stop()
+
+        self._run(run_test())
+        self.assertEqual(received, [1, 2, 4])
+
+    def test_publish_from_a_delivery_does_not_deadlock(self):
+        event_bus = EventBus(max_queue_size=2, backpressure="block")
+        received = []
+
+        async def fan_out(event):
+            received.append(event["data"])
+            if event["data"] == "start":
+                # Fills this handler's own priority queue, whose lane is busy with us
+                for i in range(4):
+                    await event_bus.publish("step", i)
+
+        event_bus.subscribe("step", fan_out)
+
+        async def run_test():
+            await event_bus.start()
+            await event_bus.publish("step", "start")
+            await asyncio.sleep(0.05)
+            await event_bus.stop()
+
+        self._run(asyncio.wait_for(run_test(), 2))
+        self.assertEqual(received, ["start", 0, 1, 2, 3])
+        self.assertEqual(event_bus.get_stats()["overflowed"], 2)
+
+    def test_batch_subscriber_receives_lists(self):
+        event_bus = EventBus(dispatch_batch_size=10)
+        batches = []
+        single = []
+        event_bus.subscribe("file_changed", lambda events: batches.append([e["data"] for e in events]), batch=True)
+        event_bus.subscribe("file_changed", lambda event: single.append(event["data"]))
+        for i in range(15):
+            self._run(event_bus.publish("file_changed", i))
+        self._drain(event_bus)
+        self.assertEqual(batches, [list(range(10)), list(range(10, 15))])
+        self.assertEqual(single, list(range(15)))
+
+    def test_async_subscriber_gets_events_in_order(self):
+        event_bus = EventBus()
+        received = []
+
+        async def handler(event):
+            await asyncio.sleep(0)
+            received.append(event["data"])
+
+        event_bus.subscribe("step", handler)
+        for i in range(20):
+            self._run(event_bus.publish("step", i))
+        self._drain(event_bus)
+        self.assertEqual(received, list(range(20)))
+
+class TestEventBusScheduling(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _order(self, event_bus, published):
+        received = []
+        event_bus.subscribe("job", lambda event: received.append(event["data"]))
+
+        async def run_test():
+            for data, priority in published:
+                await event_bus.publish("job", data, priority=priority)
+            await event_bus.start()
+            await asyncio.sleep(0.05)
+            await event_bus.stop()
+
+        self.loop.run_until_complete(run_test())
+        return received
+
+    def test_strict_priority_order(self):
+        event_bus = EventBus(dispatch_batch_size=1, starvation_seconds=60)
+        received = self._order(event_bus, [
+            ("low", EventPriority.LOW),
+            ("normal", EventPriority.NORMAL),
+            ("critical", EventPriority.CRITICAL),
+            ("high", EventPriority.HIGH)
+        ])
+        self.assertEqual(received, ["critical", "high", "normal", "low"])
+
+    def test_weighted_shares_dispatch_slots(self):
+        event_bus = EventBus(dispatch_batch_size=1, scheduling="weighted", starvation_seconds=60)
+        published = [(f"low{i}", EventPriority.LOW) for i in range(10)]
+        published += [(f"critical{i}", EventPriority.CRITICAL) for i in range(10)]
+        received = self._order(event_bus, published)
+        first = received[:9]
+        self.assertEqual(sum(1 for data in first if data.startswith("critical")), 8)
+        self.assertEqual(sum(1 for data in first if data.startswith("low")), 1)
+
+    def test_starved_queue_is_served(self):
+        event_bus = EventBus(dispatch_batch_size=1, starvation_seconds=0)
+        published = [(f"low{i}", EventPriority.LOW) for i in range(2)]
+        published += [(f"critical{i}", EventPriority.CRITICAL) for i in range(2)]
+        received = self._order(event_bus, published)
+        self.assertEqual(received, ["low0", "critical0", "low1", "critical1"])
+        self.assertEqual(event_bus.get_stats()["starvation_rescues"], 2)
+
+    def test_slow_low_subscriber_does_not_delay_critical(self):
+        event_bus = EventBus()
+        release = asyncio.Event()
+        handled = []
+
+        async def slow_telemetry(event):
+            await release.wait()
+
+        event_bus.subscribe("telemetry", slow_telemetry)
+        event_bus.subscribe("request_failed", lambda event: handled.append(event["data"]))
+
+        async def run_test():
+            await event_bus.start()
+            await event_bus.publish("telemetry", 1, priority=EventPriority.LOW)
+            await asyncio.sleep(0.01)
+            await event_bus.publish("request_failed", "boom", priority=EventPriority.CRITICAL)
+            await asyncio.sleep(0.01)
+            self.assertEqual(handled, ["boom"])
+            release.set()
+            await event_bus.stop()
+
+        self.loop.run_until_complete(run_test())
+        latencies = event_bus.analyze_event_patterns()["queue_latency_ms"]
+        self.assertEqual(latencies["CRITICAL"]["count"], 1)
+        self.assertLess(latencies["CRITICAL"]["max_ms"], 100)
+
+class TestSubscriptionMatching(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.event_bus = EventBus()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _matched(self, event_type, **fields):
+        event = {"type": event_type, "category": None, "chain_id": None, **fields}
+        return self.event_bus._match(event)
+
+    def test_wildcard_event_types(self):
+        file_events = self.event_bus.subscribe("file.*", lambda event: None)
+        everything = self.event_bus.subscribe("*", lambda event: None)
+        exact = self.event_bus.subscribe("file.changed", lambda event: None)
+        ids = lambda matched: sorted(str(s.id) for s in matched)
+        self.assertEqual(ids(self._matched("file.changed")), sorted(map(str, [file_events, everything, exact])))
+        self.assertEqual(ids(self._matched("file.created")), sorted(map(str, [file_events, everything])))
+        self.assertEqual(ids(self._matched("filesystem")), [str(everything)])
+
+    def test_equality_filters_use_the_index(self):
+        calls = []
+        matches = self.event_bus._matches_filters
+        self.event_bus._matches_filters = lambda data, filters: calls.append(filters) or matches(data, filters)
+        for i in range(200):
+            self.event_bus.subscribe("plugin_event", lambda event: None, filters={"chain_id": str(i)})
+        target = self.event_bus.subscribe("plugin_event", lambda event: None,
+                                          filters={"chain_id": "7", "category": "user"})
+        matched = self._matched("plugin_event", chain_id="7", category="user")
+        self.assertEqual(len(matched), 2)
+        self.assertIn(target, [s.id for s in matched])
+        # Only the candidate with a second filter is checked in full
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(self._matched("plugin_event", chain_id="7", category="system")), 1)
+        self.assertEqual(self._matched("plugin_event", chain_id="none"), [])
+
+    def test_unhashable_filters_and_unsubscribe(self):
+        listed = self.event_bus.subscribe("tagged", lambda event: None, filters={"metadata": {"tag": "a"}})
+        self.assertEqual(len(self._matched("tagged", metadata={"tag": "a"})), 1)
+        self.assertEqual(self._matched("tagged", metadata={"tag": "b"}), [])
+        pattern = self.event_bus.subscribe("tag*", lambda event: None)
+        self.assertEqual(len(self._matched("tagged", metadata={"tag": "a"})), 2)
+        self.assertTrue(self.event_bus.unsubscribe(listed))
+        self.assertTrue(self.event_bus.unsubscribe(pattern))
+        self.assertEqual(self._matched("tagged", metadata={"tag": "a"}), [])
+        self.assertEqual(self.event_bus.get_stats()["subscriptions"], 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from cmate.core.event_bus import EventPriority
+from cmate.core.event_history import EventHistory
+
+def make_event(event_type, timestamp, chain_id=None, category=None, priority=EventPriority.NORMAL):
+    return {"type": event_type, "priority": priority, "category": category,
+            "chain_id": chain_id, "timestamp": timestamp.isoformat(), "data": None}
+
+class TestEventHistory(unittest.TestCase):
+    def test_incremental_counters_match_a_rescan(self):
+        rng = random.Random(7)
+        history = EventHistory(capacity=50, payload_capacity=10)
+        start = datetime.now() - timedelta(minutes=5)
+        events = []
+        for i in range(500):
+            event = make_event(rng.choice("abcd"), start + timedelta(milliseconds=i),
+                               chain_id=rng.choice([None, "c1", "c2", f"c{i}"]),
+                               priority=rng.choice(list(EventPriority)))
+            events.append(event)
+            history.append(event)
+        window = events[-50:]
+        summary = history.summary()
+        self.assertEqual(summary["total_events"], 50)
+        self.assertEqual(summary["events_by_type"], dict(Counter(e["type"] for e in window)))
+        self.assertEqual(summary["events_by_priority"], dict(Counter(str(e["priority"]) for e in window)))
+        chains = Counter(e["chain_id"] for e in window if e["chain_id"])
+        self.assertAlmostEqual(summary["average_chain_length"], sum(chains.values()) / len(chains))
+        sequences = Counter(tuple(e["type"] for e in window[i:i + 3]) for i in range(48))
+        self.assertEqual(history.sequence_counts.total(), sum(sequences.values()))
+        top = sequences.most_common(1)[0][1]
+        self.assertEqual(sequences[tuple(summary["common_sequences"][0])], top)
+        # Chains that left the ring are no longer interned
+        self.assertEqual(len(history._chain_ids), len(chains))
+
+    def test_payloads_are_kept_for_the_latest_events(self):
+        history = EventHistory(capacity=100, payload_capacity=5)
+        now = datetime.now()
+        for i in range(20):
+            history.append(make_event("tick" if i % 2 else "tock", now + timedelta(seconds=i)))
+        self.assertEqual(len(history), 20)
+        self.assertEqual(len(history.events()), 5)
+        self.assertEqual([e["timestamp"] for e in history.events(event_type="tick", limit=2)],
+                         [(now + timedelta(seconds=i)).isoformat() for i in (17, 19)])
+        self.assertEqual(history.events(event_type="unknown"), [])
+
+    def test_windowed_and_category_summaries(self):
+        history = EventHistory(capacity=100)
+        now = datetime.now()
+        for i in range(10):
+            history.append(make_event("old", now - timedelta(hours=2, seconds=i)))
+        for i in range(4):
+            history.append(make_event("recent", now - timedelta(seconds=10 - i),
+                                      category="navigation" if i % 2 else None))
+        recent = history.summary(since=now - timedelta(minutes=60))
+        self.assertEqual(recent["events_by_type"], {"recent": 4})
+        navigation = history.summary(category="navigation")
+        self.assertEqual(navigation["total_events"], 2)
+        self.assertEqual(len(history.events(start_time=now - timedelta(minutes=1))), 4)
+
+    def test_large_capacity_stays_compact(self):
+        history = EventHistory(capacity=100000)
+        self.assertLess(history.memory_bytes(), 3 * 1024 * 1024)
+
+if __name__ == '__main__':
+    unittest.main()
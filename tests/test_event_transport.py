@@ -0,0 +1,136 @@
+import unittest
+import asyncio
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from cmate.core.event_bus import EventBus, EventPriority
+from cmate.core.event_transport import EventBroker, SocketTransport, _Outbox, _PUBLISH, make_transport
+from cmate.core.cache_invalidation import CacheInvalidationRegistry, FILE_CHANGED_EVENT
+from cmate.file_services.file_watcher import FileChange, FileChangeBatch
+
+class TestEventTransport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.address = str(Path(self.tmp.name) / "events.sock")
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.broker = EventBroker(self.address)
+        self.loop.run_until_complete(self.broker.start())
+        self.buses = []
+
+    def tearDown(self):
+        for bus in self.buses:
+            self.loop.run_until_complete(bus.stop())
+        self.loop.run_until_complete(self.broker.stop())
+        self.loop.close()
+        self.tmp.cleanup()
+
+    def _bus(self, **transport_options):
+        transport = SocketTransport(self.address, reconnect_seconds=0.05, **transport_options)
+        bus = EventBus(transport=transport)
+        self.loop.run_until_complete(bus.start())
+        self.assertTrue(self.loop.run_until_complete(transport.wait_connected(2)))
+        self.buses.append(bus)
+        return bus
+
+    def _wait_for(self, condition, timeout=3.0):
+        async def wait():
+            deadline = self.loop.time() + timeout
+            while not condition() and self.loop.time() < deadline:
+                await asyncio.sleep(0.01)
+        self.loop.run_until_complete(wait())
+
+    def test_events_reach_other_buses_in_batches(self):
+        publisher, receiver = self._bus(), self._bus()
+        local, remote = [], []
+        publisher.subscribe("job.*", local.append)
+        receiver.subscribe("job.*", remote.append)
+
+        async def publish():
+            for i in range(500):
+                await publisher.publish("job.progress", {"i": i}, priority=EventPriority.HIGH)
+        self.loop.run_until_complete(publish())
+        self._wait_for(lambda: len(remote) == 500)
+        self.assertEqual([event["data"]["i"] for event in remote], list(range(500)))
+        self.assertEqual(remote[0]["priority"], EventPriority.HIGH)
+        # Not echoed back to the publishing process
+        self.assertEqual(len(local), 500)
+        stats = publisher.transport.get_stats()
+        self.assertLess(stats["frames_sent"], 10)
+        self.assertEqual(receiver.get_stats()["received"], 500)
+        self.assertEqual(len(receiver.get_event_history(event_type="job.progress")), 500)
+
+    def test_events_published_while_disconnected_are_redelivered(self):
+        publisher, receiver = self._bus(), self._bus()
+        remote = []
+        receiver.subscribe("tick", remote.append)
+
+        async def publish(start, count):
+            for i in range(start, start + count):
+                await publisher.publish("tick", i)
+            publisher.transport.flush()
+        self.loop.run_until_complete(publish(0, 10))
+        self._wait_for(lambda: len(remote) == 10)
+        # Drop the receiver's connection and publish while it reconnects
+        self.broker._peers[receiver.transport.client_id].writer.close()
+        self.loop.run_until_complete(publish(10, 50))
+        self._wait_for(lambda: len(remote) == 60)
+        self.assertEqual([event["data"] for event in remote], list(range(60)))
+        self.assertGreaterEqual(receiver.transport.get_stats()["reconnects"], 1)
+
+    def test_unencodable_events_stay_local(self):
+        publisher, receiver = self._bus(), self._bus()
+        remote = []
+        receiver.subscribe("*", remote.append)
+
+        async def publish():
+            await publisher.publish("callback", lambda: None)
+            await publisher.publish("plain", {"ok": True})
+        self.loop.run_until_complete(publish())
+        self._wait_for(lambda: len(remote) == 1)
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual([event["type"] for event in remote], ["plain"])
+        self.assertEqual(publisher.transport.get_stats()["unencodable"], 1)
+
+    def test_file_change_batches_invalidate_other_processes(self):
+        publisher, receiver = self._bus(), self._bus()
+        invalidated = []
+        registry = CacheInvalidationRegistry()
+        cache_id = registry.register("test", lambda keys, paths: invalidated.extend(sorted(paths)))
+        registry.depend(cache_id, "entry", paths=["old.py"])
+        registry.attach(receiver)
+
+        async def publish():
+            change = FileChange(Path("new.py"), "moved", datetime.now(), {"source_path": "old.py"})
+            await publisher.publish(FILE_CHANGED_EVENT, FileChangeBatch(Path(self.tmp.name), [change]))
+        self.loop.run_until_complete(publish())
+        self._wait_for(lambda: invalidated)
+        self.assertEqual(invalidated, ["old.py"])
+        self.assertEqual(publisher.transport.get_stats()["unencodable"], 0)
+
+    def test_outbox_acknowledgement_and_rewind(self):
+        outbox = _Outbox(_PUBLISH, max_frames=3)
+        for i in range(4):
+            outbox.push(bytes([i]))
+        self.assertEqual(outbox.dropped, 1)
+        self.assertEqual([seq for seq, _ in outbox.frames], [2, 3, 4])
+        outbox.sent_through = 4
+        outbox.ack(3)
+        outbox.rewind()
+        self.assertEqual(outbox.sent_through, 3)
+        self.assertEqual(len(outbox), 1)
+
+    def test_pickle_is_refused_over_tcp(self):
+        with self.assertRaises(ValueError):
+            SocketTransport("127.0.0.1:7700", codec="pickle")
+        self.assertEqual(SocketTransport("127.0.0.1:7700").codec.spec, "json")
+        self.assertEqual(SocketTransport(self.address, codec="pickle").codec.spec, "pickle")
+
+    def test_make_transport(self):
+        self.assertIsNone(make_transport("none"))
+        self.assertIsInstance(make_transport("socket", self.address), SocketTransport)
+        with self.assertRaises(ValueError):
+            make_transport("carrier-pigeon")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import random
+from cmate.storage.eviction import LFUPolicy, LRUPolicy, FrequencySketch, make_policy
+
+class TestEvictionPolicies(unittest.TestCase):
+    def test_lfu_matches_reference_order(self):
+        policy = LFUPolicy()
+        counts = {}
+        order = []
+        rng = random.Random(7)
+        for step in range(2000):
+            key = rng.randrange(50)
+            if key in counts:
+                policy.on_access(key)
+                counts[key] += 1
+                order.remove(key)
+            else:
+                policy.on_insert(key)
+                counts[key] = 1
+            order.append(key)
+            if step % 7 == 0:
+                victim = policy.victim()
+                expected = min(order, key=lambda k: (counts[k], order.index(k)))
+                self.assertEqual(victim, expected)
+                policy.on_remove(victim)
+                del counts[victim]
+                order.remove(victim)
+
+    def test_lru_victim_order(self):
+        policy = LRUPolicy()
+        for key in "abc":
+            policy.on_insert(key)
+        policy.on_access("a")
+        self.assertEqual(policy.victim(), "b")
+
+    def test_victim_skips_excluded_key(self):
+        lru = LRUPolicy()
+        lfu = LFUPolicy()
+        for key in "abc":
+            lru.on_insert(key)
+            lfu.on_insert(key)
+        lfu.on_access("b")
+        lfu.on_access("c")
+        self.assertEqual(lru.victim(exclude="a"), "b")
+        self.assertEqual(lfu.victim(exclude="a"), "b")
+        self.assertEqual(lfu.frequency("a"), 1)
+        lfu.on_remove("b")
+        lfu.on_remove("c")
+        self.assertIsNone(lfu.victim(exclude="a"))
+        self.assertEqual(lfu.victim(), "a")
+
+    def test_sketch_ages_counts(self):
+        sketch = FrequencySketch(width=16, sample_size=40)
+        for _ in range(10):
+            sketch.increment("hot")
+        self.assertGreaterEqual(sketch.estimate("hot"), 10)
+        for i in range(40):
+            sketch.increment(f"cold{i}")
+        self.assertLess(sketch.estimate("hot"), 10)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            make_policy("fifo")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from cmate.file_services.analysis_cache import AnalysisCache
+from cmate.file_services.file_analyzer import FileAnalyzer
+from cmate.file_services.python_extractor import extract_python
+
+class TestFileAnalyzerCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.file = self.root / "module.py"
+        self.file.write_text("import os\n\nclass A:\n    def run(self):\n        pass\n")
+        self.cache = AnalysisCache()
+        self.analyzer = FileAnalyzer(cache=self.cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeat_analysis_hits_cache(self):
+        first = asyncio.run(self.analyzer.analyze_file(self.file))
+        second = asyncio.run(FileAnalyzer(cache=self.cache).analyze_file(self.file))
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+        self.assertEqual(first.code_analysis.classes, ["A"])
+
+    def test_touch_without_content_change_uses_digest(self):
+        asyncio.run(self.analyzer.analyze_file(self.file))
+        stat = self.file.stat()
+        os.utime(self.file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        analysis = asyncio.run(self.analyzer.analyze_file(self.file))
+        self.assertEqual(self.cache.get_stats()["digest_hits"], 1)
+        self.assertAlmostEqual(analysis.modified.timestamp(), self.file.stat().st_mtime, places=3)
+
+    def test_content_change_reanalyzes(self):
+        asyncio.run(self.analyzer.analyze_file(self.file))
+        self.file.write_text("class B:\n    pass\n\nclass C:\n    pass\n")
+        analysis = asyncio.run(self.analyzer.analyze_file(self.file))
+        self.assertEqual(analysis.code_analysis.classes, ["B", "C"])
+        self.assertEqual(self.cache.get_stats()["entries"], 1)
+
+    def test_memory_budget_evicts_least_recent(self):
+        cache = AnalysisCache(max_memory_bytes=1)
+        analyzer = FileAnalyzer(cache=cache)
+        other = self.root / "other.py"
+        other.write_text("x = 1\n")
+        asyncio.run(analyzer.analyze_file(self.file))
+        asyncio.run(analyzer.analyze_file(other))
+        stats = cache.get_stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_disk_tier_survives_restart(self):
+        disk_dir = str(self.root / "analysis_cache")
+        asyncio.run(FileAnalyzer(cache=AnalysisCache(disk_dir=disk_dir)).analyze_file(self.file))
+        fresh = AnalysisCache(disk_dir=disk_dir)
+        analysis = asyncio.run(FileAnalyzer(cache=fresh).analyze_file(self.file))
+        self.assertEqual(fresh.get_stats()["disk_hits"], 1)
+        self.assertEqual(analysis.code_analysis.functions, ["A.run"])
+
+class TestAnalyzeMany(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.paths = []
+        for i in range(12):
+            path = self.root / f"mod{i}.py"
+            path.write_text(f"def f{i}():\n    return {i}\n")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_process_pool_batch(self):
+        cache = AnalysisCache()
+        analyzer = FileAnalyzer(cache=cache, chunk_size=3, min_parallel_files=1)
+        self.addCleanup(analyzer.close)
+        missing = self.root / "missing.py"
+        result = asyncio.run(analyzer.analyze_many(self.paths + [missing], max_workers=2))
+        self.assertEqual(len(result.analyses), 12)
+        self.assertIn(missing, result.errors)
+        self.assertEqual(result.analyses[self.paths[5]].code_analysis.functions, ["f5"])
+        self.assertEqual(cache.get_stats()["entries"], 12)
+
+        again = asyncio.run(analyzer.analyze_many(self.paths, max_workers=2))
+        self.assertEqual(len(again.analyses), 12)
+        self.assertEqual(cache.get_stats()["hits"], 12)
+
+    def test_process_pool_is_reused_until_closed(self):
+        analyzer = FileAnalyzer(cache=AnalysisCache(), chunk_size=3, min_parallel_files=1)
+        self.addCleanup(analyzer.close)
+
+        async def run():
+            await analyzer.analyze_many(self.paths[:6], max_workers=2)
+            pool = analyzer._pool
+            await analyzer.analyze_many(self.paths[6:], max_workers=2)
+            return pool
+
+        pool = asyncio.run(run())
+        self.assertIsNotNone(pool)
+        self.assertIs(analyzer._pool, pool)
+        analyzer.close()
+        self.assertIsNone(analyzer._pool)
+
+    def test_small_batch_runs_in_process(self):
+        analyzer = FileAnalyzer(cache=AnalysisCache(), min_parallel_files=100)
+        result = asyncio.run(analyzer.analyze_many(self.paths[:2]))
+        self.assertEqual(sorted(result.analyses), sorted(self.paths[:2]))
+        self.assertIsNone(analyzer._pool)
+
+class TestFileAnalyzerEncoding(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.analyzer = FileAnalyzer(use_cache=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _analyze(self, name, raw):
+        path = self.root / name
+        path.write_bytes(raw)
+        return asyncio.run(self.analyzer.analyze_file(path))
+
+    def test_utf8(self):
+        analysis = self._analyze("a.py", "name = 'h\u00e9'\n".encode("utf-8"))
+        self.assertEqual(analysis.encoding, "utf-8")
+
+    def test_utf8_bom(self):
+        analysis = self._analyze("a.json", b"\xef\xbb\xbf" + b'{"key": 1}')
+        self.assertEqual(analysis.encoding, "utf-8-sig")
+        self.assertEqual(analysis.code_analysis.metadata["keys"], ["key"])
+
+    def test_utf16_bom(self):
+        analysis = self._analyze("a.yaml", "key: value\n".encode("utf-16"))
+        self.assertEqual(analysis.encoding, "utf-16")
+        self.assertEqual(analysis.code_analysis.metadata["keys"], ["key"])
+
+    def test_invalid_utf8_falls_back(self):
+        analysis = self._analyze("a.txt", b"caf\xe9\n")
+        self.assertEqual(analysis.encoding, "latin-1")
+        self.assertEqual(analysis.line_count, 1)
+
+    def test_large_file_uses_mmap(self):
+        self.analyzer.mmap_threshold = 16
+        analysis = self._analyze("big.json", b'{"a": 1, "b": 2, "c": 3}')
+        self.assertEqual(analysis.code_analysis.metadata["keys"], ["a", "b", "c"])
+
+class TestPythonExtractor(unittest.TestCase):
+    SOURCE = (
+        "import os\n"
+        "from . import sibling\n"
+        "from .pkg.mod import thing\n"
+        "\n"
+        "class A:\n"
+        "    name: str\n"
+        "    def run(self, x=[]):\n"
+        "        if x and self.name or x:\n"
+        "            pass\n"
+        "        try:\n"
+        "            pass\n"
+        "        except:\n"
+        "            pass\n"
+        "\n"
+        "def outer():\n"
+        "    def inner():\n"
+        "        for _ in range(3):\n"
+        "            pass\n"
+        "    return inner\n"
+    )
+
+    def test_single_pass_collects_everything(self):
+        extraction = extract_python(self.SOURCE)
+        self.assertEqual(extraction.dependency_targets, ["os", ".sibling", ".pkg.mod.thing"])
+        self.assertEqual([c.name for c in extraction.classes], ["A"])
+        self.assertEqual(extraction.classes[0].properties, ["name"])
+        top_level = [f.qualname for f in extraction.functions if f.top_level]
+        self.assertEqual(top_level, ["A.run", "outer"])
+        functions = {f.qualname: f for f in extraction.functions}
+        self.assertEqual(functions["A.run"].complexity, 6)
+        self.assertEqual(functions["outer"].complexity, 2)
+        self.assertEqual(extraction.module_complexity, 5)
+        self.assertEqual(len(extraction.issues), 2)
+
+    def test_results_are_shared_and_syntax_errors_reported(self):
+        self.assertIs(extract_python(self.SOURCE), extract_python(self.SOURCE))
+        self.assertIsNotNone(extract_python("def broken(:\n").syntax_error)
+
+    def test_cached_syntax_error_is_raised_as_a_fresh_exception(self):
+        extraction = extract_python("def broken(:\n")
+        raised = []
+        for _ in range(3):
+            try:
+                raise extraction.new_syntax_error()
+            except SyntaxError as e:
+                raised.append(e)
+        self.assertIsNot(raised[0], raised[1])
+        self.assertIsNone(extraction.syntax_error.__traceback__)
+        self.assertEqual(raised[2].lineno, extraction.syntax_error.lineno)
+        self.assertEqual(raised[2].msg, extraction.syntax_error.msg)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
 import asyncio
+import tempfile
+from pathlib import Path
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileDeletedEvent, FileMovedEvent, DirModifiedEvent
 from cmate.file_services.file_watcher import FileWatcher
 
 class TestFileWatcher(unittest.TestCase):
@@ -16,5 +19,89 @@ class TestFileWatcher(unittest.TestCase):
             self.assertFalse(self.file_watcher._is_running)
         asyncio.run(run_test())
 
+class TestFileWatcherCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name)
+        self.watcher = FileWatcher(str(self.workspace), debounce_seconds=0.05, max_delay_seconds=0.5, max_changes=5)
+        self.batches = []
+
+        async def on_batch(batch):
+            self.batches.append(batch)
+
+        self.watcher.add_batch_handler(on_batch)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _p(self, name):
+        return str(self.workspace / name)
+
+    def _events(self, net):
+        return {(str(change.path), change.event_type) for change in net}
+
+    def test_burst_is_debounced_into_one_batch(self):
+        async def run_test():
+            await self.watcher.start_watching()
+            try:
+                for _ in range(500):
+                    self.watcher.on_modified(FileModifiedEvent(self._p("a.py")))
+                self.watcher.on_modified(FileModifiedEvent(self._p("b.py")))
+                self.watcher.on_modified(DirModifiedEvent(self._p("pkg")))
+                await asyncio.sleep(0.2)
+            finally:
+                await self.watcher.stop_watching()
+        asyncio.run(run_test())
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(self._events(self.batches[0]), {("a.py", "modified"), ("b.py", "modified")})
+        self.assertEqual(self.watcher.stats["events"], 501)
+
+    def test_event_sequences_collapse_to_net_effect(self):
+        async def run_test():
+            self.watcher.on_created(FileCreatedEvent(self._p("tmp.py")))
+            self.watcher.on_modified(FileModifiedEvent(self._p("tmp.py")))
+            self.watcher.on_deleted(FileDeletedEvent(self._p("tmp.py")))
+            self.watcher.on_created(FileCreatedEvent(self._p("new.py")))
+            self.watcher.on_modified(FileModifiedEvent(self._p("new.py")))
+            self.watcher.on_deleted(FileDeletedEvent(self._p("saved.py")))
+            self.watcher.on_created(FileCreatedEvent(self._p("saved.py")))
+            self.watcher.on_created(FileCreatedEvent(self._p("draft.py")))
+            self.watcher.on_moved(FileMovedEvent(self._p("draft.py"), self._p("final.py")))
+            self.watcher.on_moved(FileMovedEvent(self._p("old.py"), self._p("renamed.py")))
+            self.watcher.on_modified(FileModifiedEvent(self._p("renamed.py")))
+            return await self.watcher.flush()
+        batch = asyncio.run(run_test())
+        self.assertEqual(self._events(batch), {
+            ("new.py", "created"),
+            ("saved.py", "modified"),
+            ("final.py", "created"),
+            ("renamed.py", "moved")
+        })
+        moved = next(change for change in batch if change.event_type == "moved")
+        self.assertEqual(moved.details["source_path"], "old.py")
+
+    def test_per_type_handlers_receive_coalesced_changes(self):
+        received = []
+
+        async def on_modified(change):
+            received.append(change)
+
+        self.watcher.add_handler("modified", on_modified)
+
+        async def run_test():
+            for _ in range(10):
+                self.watcher.on_modified(FileModifiedEvent(self._p("a.py")))
+            await self.watcher.flush()
+        asyncio.run(run_test())
+        self.assertEqual(len(received), 1)
+
+    def test_change_log_is_bounded(self):
+        async def run_test():
+            for i in range(20):
+                self.watcher.on_created(FileCreatedEvent(self._p(f"f{i}.py")))
+            await self.watcher.flush()
+        asyncio.run(run_test())
+        self.assertEqual(len(self.watcher.get_changes()), 5)
+
 if __name__ == '__main__':
     unittest.main()
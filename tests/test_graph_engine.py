@@ -0,0 +1,98 @@
+import unittest
+import random
+from cmate.core.graph_engine import SCCGraphEngine
+
+def brute_reachable(adjacency, start):
+    seen = set()
+    pending = [start]
+    while pending:
+        for target in adjacency.get(pending.pop(), ()):
+            if target not in seen:
+                seen.add(target)
+                pending.append(target)
+    seen.discard(start)
+    return seen
+
+class TestSCCGraphEngine(unittest.TestCase):
+    def setUp(self):
+        self.adjacency = {}
+        self.reverse = {}
+        self.engine = SCCGraphEngine(self.adjacency, self.reverse)
+
+    def add(self, source, target):
+        self.adjacency.setdefault(source, set()).add(target)
+        self.reverse.setdefault(target, set()).add(source)
+        self.engine.edge_added(source, target)
+
+    def remove(self, source, target):
+        self.adjacency[source].discard(target)
+        self.reverse[target].discard(source)
+        self.engine.edge_removed(source, target)
+
+    def test_components_and_closure(self):
+        for source, target in [("a", "b"), ("b", "c"), ("c", "b"), ("c", "d")]:
+            self.add(source, target)
+        self.assertEqual(sorted(self.engine.component("b")), ["b", "c"])
+        self.assertEqual(sorted(self.engine.reachable("a")), ["b", "c", "d"])
+        self.assertEqual(sorted(self.engine.reachable("b")), ["c", "d"])
+        self.assertEqual(self.engine.cycles_from("a"), [["b", "c", "b"]])
+        self.assertEqual(self.engine.cycles_from("d"), [])
+
+    def test_edge_closing_a_cycle_merges_components(self):
+        for source, target in [("a", "b"), ("b", "c"), ("c", "d")]:
+            self.add(source, target)
+        self.assertEqual(self.engine.get_stats()["cyclic_components"], 0)
+        self.add("d", "b")
+        self.assertEqual(sorted(self.engine.component("c")), ["b", "c", "d"])
+        self.assertEqual(self.engine.stats["merges"], 1)
+        self.assertEqual(self.engine.stats["full_builds"], 1)
+        self.assertEqual(sorted(self.engine.reachable("a")), ["b", "c", "d"])
+
+    def test_removing_a_cycle_edge_splits_only_that_component(self):
+        for source, target in [("a", "b"), ("b", "c"), ("c", "a"), ("x", "y")]:
+            self.add(source, target)
+        self.engine.reachable("x")
+        self.remove("c", "a")
+        self.assertEqual(self.engine.stats["splits"], 1)
+        self.assertEqual(self.engine.component("a"), ["a"])
+        self.assertEqual(sorted(self.engine.reachable("a")), ["b", "c"])
+        self.assertEqual(self.engine.reachable("c"), [])
+        self.assertEqual(self.engine.stats["full_builds"], 1)
+
+    def test_new_dag_edge_invalidates_ancestor_closures(self):
+        for source, target in [("a", "b"), ("c", "d")]:
+            self.add(source, target)
+        self.assertEqual(self.engine.reachable("a"), ["b"])
+        self.add("b", "c")
+        self.assertEqual(sorted(self.engine.reachable("a")), ["b", "c", "d"])
+        self.remove("b", "c")
+        self.assertEqual(self.engine.reachable("a"), ["b"])
+
+    def test_incremental_updates_match_full_rebuild(self):
+        rng = random.Random(7)
+        nodes = [f"n{i}" for i in range(30)]
+        for _ in range(60):
+            self.add(rng.choice(nodes), rng.choice(nodes))
+        self.engine.reachable("n0")
+        for _ in range(300):
+            source, target = rng.choice(nodes), rng.choice(nodes)
+            if target in self.adjacency.get(source, ()):
+                self.remove(source, target)
+            elif source != target:
+                self.add(source, target)
+            node = rng.choice(nodes)
+            self.assertEqual(set(self.engine.reachable(node)), brute_reachable(self.adjacency, node) - {node})
+        fresh = SCCGraphEngine(self.adjacency, self.reverse)
+        components = sorted(sorted(c) for c in self.engine.cyclic_components())
+        self.assertEqual(components, sorted(sorted(c) for c in fresh.cyclic_components()))
+        self.assertEqual(self.engine.stats["full_builds"], 1)
+
+    def test_large_chain_is_iterative(self):
+        for i in range(5000):
+            self.add(f"m{i}", f"m{i + 1}")
+        self.add("m5000", "m0")
+        self.assertEqual(len(self.engine.component("m0")), 5001)
+        self.assertEqual(len(self.engine.cycles_from("m10")[0]), 5002)
+
+if __name__ == '__main__':
+    unittest.main()
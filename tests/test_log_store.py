@@ -0,0 +1,138 @@
+import unittest
+import tempfile
+import threading
+from pathlib import Path
+from cmate.storage.log_store import LogStore
+
+class TestLogStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache.log"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put_get_delete(self):
+        store = LogStore(self.path)
+        store.put("a", b"one")
+        store.put("b", b"two")
+        store.put("a", b"uno")
+        self.assertEqual(store.get("a"), b"uno")
+        self.assertTrue(store.delete("b"))
+        self.assertIsNone(store.get("b"))
+        self.assertEqual(len(store), 1)
+        store.close()
+
+    def test_reopen_without_hint_scans_log(self):
+        store = LogStore(self.path)
+        store.put("a", b"one")
+        store.put("b", b"two")
+        store.delete("b")
+        reopened = LogStore(self.path)
+        self.assertEqual(reopened.keys(), ["a"])
+        self.assertEqual(reopened.get("a"), b"one")
+        store.close()
+        reopened.close()
+
+    def test_hint_covers_prefix_and_tail_is_scanned(self):
+        store = LogStore(self.path)
+        store.put("a", b"one")
+        store.close()
+        store = LogStore(self.path)
+        store.put("b", b"two")
+        # Simulate a crash: no close(), so the hint only covers "a"
+        reopened = LogStore(self.path)
+        self.assertEqual(sorted(reopened.keys()), ["a", "b"])
+        self.assertEqual(reopened.get("b"), b"two")
+
+    def test_checksum_mismatch_is_rejected(self):
+        store = LogStore(self.path)
+        store.put("key", b"value")
+        store.close()
+        data = bytearray(self.path.read_bytes())
+        data[-1] ^= 0xFF
+        self.path.write_bytes(bytes(data))
+        reopened = LogStore(self.path)
+        self.assertIsNone(reopened.get("key"))
+        self.assertEqual(reopened.stats["checksum_errors"], 1)
+
+    def test_torn_tail_is_truncated(self):
+        store = LogStore(self.path)
+        store.put("a", b"one")
+        store.close()
+        with open(self.path, "ab") as f:
+            f.write(b"CMLS\x00partial")
+        reopened = LogStore(self.path)
+        self.assertEqual(reopened.get("a"), b"one")
+        reopened.put("b", b"two")
+        self.assertEqual(LogStore(self.path).get("b"), b"two")
+
+    def test_compaction_drops_garbage(self):
+        store = LogStore(self.path, compact_min_bytes=0)
+        for i in range(50):
+            store.put("hot", b"x" * 100)
+            store.put(f"k{i}", b"y")
+        for i in range(25):
+            store.delete(f"k{i}")
+        self.assertTrue(store.needs_compaction())
+        before = self.path.stat().st_size
+        store.compact_in_background().join()
+        self.assertLess(self.path.stat().st_size, before)
+        self.assertEqual(store.dead_bytes, 0)
+        self.assertEqual(store.get("hot"), b"x" * 100)
+        self.assertEqual(len(store), 26)
+        store.put("after", b"z")
+        store.close()
+        reopened = LogStore(self.path)
+        self.assertEqual(reopened.get("after"), b"z")
+        self.assertEqual(len(reopened), 27)
+
+    def test_writes_during_compaction_are_kept(self):
+        store = LogStore(self.path, compact_min_bytes=0)
+        for i in range(10):
+            store.put(f"k{i}", b"old")
+            store.put(f"k{i}", b"value")
+        copy_live = store._copy_live
+
+        def copy_and_write(snapshot, tmp_path):
+            result = copy_live(snapshot, tmp_path)
+            # The lock is free while the live records are copied
+            writer = threading.Thread(target=lambda: (
+                store.put("k0", b"updated"), store.delete("k1"), store.put("new", b"added")
+            ))
+            writer.start()
+            writer.join(timeout=5)
+            self.assertFalse(writer.is_alive())
+            return result
+
+        store._copy_live = copy_and_write
+        store.compact()
+        self.assertEqual(store.stats["compactions"], 1)
+        self.assertEqual(store.get("k0"), b"updated")
+        self.assertIsNone(store.get("k1"))
+        self.assertEqual(store.get("new"), b"added")
+        self.assertEqual(store.get("k9"), b"value")
+        store.close()
+        reopened = LogStore(self.path)
+        self.assertEqual(sorted(reopened.keys()), sorted(["new"] + [f"k{i}" for i in range(10) if i != 1]))
+        self.assertEqual(reopened.get("k0"), b"updated")
+
+    def test_clear_during_compaction_abandons_it(self):
+        store = LogStore(self.path, compact_min_bytes=0)
+        store.put("a", b"1")
+        copy_live = store._copy_live
+
+        def copy_and_clear(snapshot, tmp_path):
+            result = copy_live(snapshot, tmp_path)
+            store.clear()
+            store.put("b", b"2")
+            return result
+
+        store._copy_live = copy_and_clear
+        store.compact()
+        self.assertEqual(store.stats["compactions"], 0)
+        self.assertEqual(store.keys(), ["b"])
+        self.assertEqual(store.get("b"), b"2")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import asyncio
+import tempfile
+from pathlib import Path
+from cmate.file_services.module_index import ModuleIndex
+from cmate.file_services.workspace_scanner import WorkspaceScanner
+
+class TestModuleIndex(unittest.TestCase):
+    FILES = [
+        "app/__init__.py",
+        "app/main.py",
+        "app/sub/__init__.py",
+        "app/sub/util.py",
+        "src/lib/__init__.py",
+        "src/lib/core.py",
+        "tools.py",
+        "tools/__init__.py",
+        "my-scripts/run.py",
+        "README.md"
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = ModuleIndex(Path(self.tmp.name) / "modules.json")
+        self.index.build(self.FILES)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_absolute_and_member_imports(self):
+        self.assertEqual(self.index.resolve("app.sub.util"), "app/sub/util.py")
+        self.assertEqual(self.index.resolve_prefix("app.sub.util.helper"), "app/sub/util.py")
+        self.assertEqual(self.index.resolve_prefix("app.Thing"), "app/__init__.py")
+        self.assertIsNone(self.index.resolve_prefix("os.path"))
+        self.assertIsNone(self.index.resolve("my-scripts.run"))
+
+    def test_package_wins_over_module(self):
+        self.assertEqual(self.index.resolve("tools"), "tools/__init__.py")
+        self.index.update([], ["tools/__init__.py"])
+        self.assertEqual(self.index.resolve("tools"), "tools.py")
+
+    def test_src_layout(self):
+        self.assertEqual(self.index.roots, ["", "src"])
+        self.assertEqual(self.index.resolve("lib.core"), "src/lib/core.py")
+        self.index.update(["src/__init__.py"], [])
+        self.assertEqual(self.index.roots, [""])
+        self.assertIsNone(self.index.resolve("lib.core"))
+        self.assertEqual(self.index.resolve("src.lib.core"), "src/lib/core.py")
+
+    def test_relative_imports(self):
+        self.assertEqual(self.index.resolve_relative(".util", "app/sub/__init__.py"), "app/sub/util.py")
+        self.assertEqual(self.index.resolve_relative("..main.run", "app/sub/util.py"), "app/main.py")
+        self.assertEqual(self.index.resolve_relative(".missing", "app/main.py"), "app/__init__.py")
+        self.assertEqual(self.index.resolve_relative(".core", "src/lib/__init__.py"), "src/lib/core.py")
+        self.assertEqual(self.index.absolute_name("..x", "app/sub/util.py"), "app.x")
+
+    def test_persists_and_resyncs(self):
+        self.index.save()
+        loaded = ModuleIndex(self.index.index_path)
+        self.assertFalse(loaded.sync(self.FILES, [], []))
+        self.assertEqual(loaded.modules, self.index.modules)
+        self.assertTrue(loaded.sync(self.FILES + ["extra.py"], ["extra.py"], []))
+        self.assertEqual(loaded.resolve("extra"), "extra.py")
+
+class TestScannerModuleIndex(unittest.TestCase):
+    def test_scan_builds_module_table_next_to_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            workspace = Path(tmp) / "ws"
+            (workspace / "pkg").mkdir(parents=True)
+            (workspace / "pkg" / "__init__.py").write_text("")
+            (workspace / "pkg" / "mod.py").write_text("")
+            index_path = Path(tmp) / "index.json"
+            scanner = WorkspaceScanner(str(workspace), index_path=str(index_path))
+            asyncio.run(scanner.scan_incremental())
+            self.assertEqual(scanner.modules.resolve("pkg.mod"), "pkg/mod.py")
+            self.assertTrue((Path(tmp) / "index.modules.json").exists())
+
+            (workspace / "pkg" / "mod.py").unlink()
+            fresh = WorkspaceScanner(str(workspace), index_path=str(index_path))
+            modules = asyncio.run(fresh.ensure_module_index())
+            self.assertIsNone(modules.resolve("pkg.mod"))
+            self.assertEqual(modules.resolve("pkg"), "pkg/__init__.py")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,22 @@
 import unittest
 import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+import cmate.utils.logger  # registers Logger.success used at import time
 from cmate.core.navigation_system import NavigationDecisionSystem, NavigationContext, NavigationResult
 from cmate.core.state_manager import AgentState
 
 class TestNavigationSystem(unittest.TestCase):
     def setUp(self):
+        # Keep the scan index and dependency graph out of the user cache
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        patcher = mock.patch.dict("os.environ", {"CMATE_CACHE_DIR": cache.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.workspace_path = "./Workspace"
         self.nav_system = NavigationDecisionSystem(self.workspace_path)
     
@@ -19,5 +31,123 @@ class TestNavigationSystem(unittest.TestCase):
             self.assertTrue(result.success)
         asyncio.run(run_test())
 
+class TestComponentAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name)
+        (self.workspace / "pkg").mkdir()
+        (self.workspace / "pkg" / "__init__.py").write_text("")
+        (self.workspace / "pkg" / "shared.py").write_text("VALUE = 1\n")
+        for i in range(6):
+            (self.workspace / "pkg" / f"mod{i}.py").write_text("from . import shared\nimport pkg.shared\n")
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        patcher = mock.patch.dict("os.environ", {"CMATE_CACHE_DIR": cache.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.nav_system = NavigationDecisionSystem(str(self.workspace), max_concurrency=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_components_are_analyzed_with_bounded_concurrency(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+        original = self.nav_system.file_analyzer.analyze_file_sync
+
+        def tracked(path):
+            with lock:
+                active.append(path)
+                peak.append(len(active))
+            time.sleep(0.02)
+            try:
+                return original(path)
+            finally:
+                with lock:
+                    active.remove(path)
+
+        self.nav_system.file_analyzer.analyze_file_sync = tracked
+        components = [Path(f"pkg/mod{i}.py") for i in range(6)]
+        dependencies, timings = asyncio.run(self.nav_system._analyze_components(components))
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(set(timings), set(components))
+        for component in components:
+            self.assertEqual(dependencies[component], [self.workspace / "pkg" / "shared.py"])
+
+    def test_import_resolution_is_shared_between_components(self):
+        calls = []
+        original = self.nav_system._import_to_path
+
+        def counting(target, importer=None):
+            calls.append(target)
+            return original(target, importer)
+
+        self.nav_system._import_to_path = counting
+        components = [Path(f"pkg/mod{i}.py") for i in range(6)]
+        asyncio.run(self.nav_system._analyze_components(components))
+        self.assertEqual(sorted(calls), sorted(set(calls)))
+
+    def test_close_shuts_down_analysis_pool(self):
+        self.nav_system.close()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.nav_system._analyze_dependencies(Path("pkg/mod0.py")))
+
+    def test_streamed_scan_keeps_symbol_index_current(self):
+        asyncio.run(self.nav_system._refresh_symbol_index())
+        self.assertIn("pkg/mod0.py", self.nav_system.symbol_index.documents)
+        (self.workspace / "pkg" / "mod1.py").unlink()
+        (self.workspace / "pkg" / "billing.py").write_text("class InvoiceBuilder:\n    pass\n")
+        analyzed = []
+        original = self.nav_system._index_files
+
+        async def tracked(files, fingerprints):
+            analyzed.extend(files)
+            return await original(files, fingerprints)
+
+        self.nav_system._index_files = tracked
+        asyncio.run(self.nav_system._refresh_symbol_index())
+        self.assertEqual(analyzed, ["pkg/billing.py"])
+        self.assertNotIn("pkg/mod1.py", self.nav_system.symbol_index.documents)
+        self.assertEqual(self.nav_system.symbol_index.search("invoice builder")[0][0], "pkg/billing.py")
+
+    def test_streamed_scan_bounds_batches_in_flight(self):
+        for i in range(10):
+            (self.workspace / "pkg" / f"extra{i}.py").write_text(f"def extra_{i}():\n    pass\n")
+        scanner = self.nav_system.scanner
+        original_iter = scanner.iter_workspace
+
+        async def small_batches():
+            async for batch in original_iter():
+                for start in range(0, len(batch), 2):
+                    yield batch[start:start + 2]
+
+        scanner.iter_workspace = small_batches
+        active = []
+        peak = []
+        original = self.nav_system._index_files
+
+        async def tracked(files, fingerprints):
+            active.append(files)
+            peak.append(len(active))
+            try:
+                await asyncio.sleep(0.01)
+                return await original(files, fingerprints)
+            finally:
+                active.remove(files)
+
+        self.nav_system._index_files = tracked
+        count = asyncio.run(self.nav_system._refresh_symbol_index())
+        self.assertEqual(count, 18)
+        self.assertGreater(len(peak), 2)
+        self.assertLessEqual(max(peak), self.nav_system.max_index_batches)
+        self.assertEqual(len(self.nav_system.symbol_index.documents), 18)
+
+    def test_target_components_are_limited_by_default(self):
+        for i in range(15):
+            (self.workspace / "pkg" / f"invoice{i}.py").write_text("class InvoiceBuilder:\n    pass\n")
+        context = asyncio.run(self.nav_system.prepare_decision_context("invoice builder", {}, AgentState.IDLE))
+        self.assertEqual(len(context.target_components), 10)
+
 if __name__ == '__main__':
     unittest.main()
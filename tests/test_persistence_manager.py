@@ -1,6 +1,11 @@
 import unittest
 import asyncio
-from cmate.storage.persistence_manager import PersistenceManager
+import json
+import tempfile
+import threading
+from unittest import mock
+from cmate.storage import persistence_manager
+from cmate.storage.persistence_manager import PersistenceManager, StorageConfig
 from pathlib import Path
 
 class TestPersistenceManager(unittest.TestCase):
@@ -18,5 +23,246 @@ class TestPersistenceManager(unittest.TestCase):
             self.assertEqual(retrieved, data)
         asyncio.run(run_test())
 
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "storage"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _manager(self, **kwargs):
+        return PersistenceManager(StorageConfig(storage_path=self.path, backup_enabled=False, **kwargs))
+
+    def test_flush_writes_items_and_journal(self):
+        async def run_test():
+            pm = self._manager()
+            item_id = await pm.store("a", {"value": 1})
+            await pm.store("a", {"value": 2})
+            await pm.flush()
+            self.assertTrue((self.path / f"item_{item_id}.dat").exists())
+            records = [json.loads(line) for line in (self.path / "index.journal").read_text().splitlines()]
+            self.assertEqual(records, [{"op": "set", "key": "a", "id": str(item_id)}])
+            self.assertFalse(list(self.path.glob("*.tmp")))
+        asyncio.run(run_test())
+
+    def test_reopen_replays_journal(self):
+        async def run_test():
+            pm = self._manager()
+            await pm.store("a", [1, 2, 3])
+            await pm.store("b", "gone")
+            await pm.delete("b")
+            await pm.flush()
+            reopened = self._manager()
+            self.assertEqual(await reopened.retrieve("a"), [1, 2, 3])
+            self.assertNotIn("b", reopened.indices)
+        asyncio.run(run_test())
+
+    def test_checkpoint_resets_journal(self):
+        pm = self._manager(checkpoint_interval=3)
+        for i in range(4):
+            pm.store_nowait(f"key{i}", i)
+            pm.flush_sync()
+        self.assertGreaterEqual(pm.stats["checkpoints"], 1)
+        pm.close()
+        self.assertFalse((self.path / "index.journal").exists())
+        index = json.loads((self.path / "index.json").read_text())
+        self.assertEqual(sorted(index), ["key0", "key1", "key2", "key3"])
+
+    def test_torn_journal_record_is_ignored(self):
+        pm = self._manager()
+        pm.store_nowait("a", 1)
+        pm.flush_sync()
+        with open(self.path / "index.journal", "a") as f:
+            f.write('{"op": "set", "key": "b"')
+        reopened = self._manager()
+        self.assertEqual(list(reopened.indices), ["a"])
+
+class TestLazyLoading(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "storage"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _manager(self, **kwargs):
+        return PersistenceManager(StorageConfig(storage_path=self.path, backup_enabled=False, **kwargs))
+
+    def test_startup_reads_only_the_index(self):
+        async def run_test():
+            pm = self._manager()
+            for i in range(5):
+                await pm.store(f"key{i}", {"value": i})
+            pm.close()
+            reopened = self._manager()
+            self.assertEqual(len(reopened.items), 0)
+            self.assertEqual(sorted(reopened.keys()), [f"key{i}" for i in range(5)])
+            self.assertEqual(await reopened.retrieve("key3"), {"value": 3})
+            self.assertEqual(len(reopened.items), 1)
+            reopened.close()
+        asyncio.run(run_test())
+
+    def test_lru_bounds_resident_items(self):
+        async def run_test():
+            pm = self._manager(cache_size=2)
+            for i in range(4):
+                await pm.store(f"key{i}", i)
+            self.assertEqual(len(pm.items), 2)
+            # Evicted items are served from the write queue or disk
+            self.assertEqual(await pm.retrieve("key0"), 0)
+            await pm.update("key1", 10)
+            self.assertEqual(await pm.retrieve("key1"), 10)
+            self.assertEqual(len(pm.items), 2)
+            pm.close()
+        asyncio.run(run_test())
+
+    def test_encoding_and_loading_stay_off_the_loop(self):
+        async def run_test():
+            pm = self._manager(cache_size=1)
+            threads = []
+            encode, serialize, load_item = pm._encode, pm._serialize, pm._load_item
+
+            def tracked(function):
+                def wrapper(*args):
+                    threads.append((function.__name__, threading.current_thread()))
+                    return function(*args)
+                return wrapper
+
+            pm._encode, pm._serialize, pm._load_item = tracked(encode), tracked(serialize), tracked(load_item)
+            await pm.store("a", 1)
+            await pm.store("b", 2)
+            await pm.flush()
+            await pm.update("a", 3)
+            await pm.flush()
+            self.assertEqual(await pm.retrieve("a"), 3)
+            self.assertEqual({name for name, _ in threads}, {"_encode", "_serialize", "_load_item"})
+            self.assertNotIn(threading.main_thread(), [thread for _, thread in threads])
+        asyncio.run(run_test())
+
+    def test_failed_batch_is_retried(self):
+        async def run_test():
+            pm = self._manager()
+            failures = []
+            atomic_write = persistence_manager._atomic_write
+
+            def flaky(path, payload):
+                if len(failures) < 2:
+                    failures.append(path)
+                    raise OSError("disk full")
+                atomic_write(path, payload)
+
+            with mock.patch.object(persistence_manager, "_atomic_write", flaky):
+                item_id = await pm.store("a", {"value": 1})
+                await pm.flush()
+            self.assertEqual(len(failures), 2)
+            self.assertTrue((self.path / f"item_{item_id}.dat").exists())
+            self.assertEqual(await self._manager().retrieve("a"), {"value": 1})
+        asyncio.run(run_test())
+
+    def test_unencodable_data_raises_to_the_caller(self):
+        async def run_test():
+            pm = self._manager(codecs={"audit": "json"})
+            with self.assertRaises(Exception):
+                await pm.store("unpicklable", {"value": lambda: None})
+            await pm.store("audit", [1])
+            with self.assertRaises(TypeError):
+                await pm.update("audit", [object()])
+            with self.assertRaises(TypeError):
+                pm.store_nowait("audit", {"when": object()})
+            self.assertEqual(await pm.retrieve("audit"), [1])
+            pm.close()
+            reopened = self._manager(codecs={"audit": "json"})
+            self.assertEqual(reopened.keys(), ["audit"])
+            self.assertEqual(await reopened.retrieve("audit"), [1])
+        asyncio.run(run_test())
+
+    def test_store_nowait_does_not_load_an_evicted_item(self):
+        async def run_test():
+            pm = self._manager()
+            await pm.store("log", [1], metadata={"owner": "agent"})
+            created_at = pm.items[pm.indices["log"]].created_at
+            pm.close()
+            reopened = self._manager()
+            with mock.patch.object(reopened, "_load_item", side_effect=AssertionError("loaded")):
+                reopened.store_nowait("log", [1, 2], metadata={"entries": 2})
+                reopened.store_nowait("log", [1, 2, 3])
+            self.assertEqual(len(reopened.items), 0)
+            reopened.close()
+            item = self._manager()._load_item(reopened.indices["log"])
+            self.assertEqual(item.data, [1, 2, 3])
+            self.assertEqual(item.created_at, created_at)
+            self.assertEqual(item.metadata, {"owner": "agent", "entries": 2})
+        asyncio.run(run_test())
+
+    def test_iter_items_streams_without_caching(self):
+        async def run_test():
+            pm = self._manager()
+            await pm.store("audit:1", "a")
+            await pm.store("audit:2", "b")
+            await pm.store("analysis:1", "c")
+            pm.close()
+            reopened = self._manager()
+            items = [item async for item in reopened.iter_items(prefix="audit:")]
+            self.assertEqual(sorted(items), [("audit:1", "a"), ("audit:2", "b")])
+            self.assertEqual(len(reopened.items), 0)
+        asyncio.run(run_test())
+
+class TestCodecSelection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "storage"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_codec_per_key_and_namespace(self):
+        async def run_test():
+            pm = PersistenceManager(StorageConfig(
+                storage_path=self.path, backup_enabled=False,
+                codecs={"audit_log": "json", "analysis": "pickle+zlib:1"}
+            ))
+            self.assertEqual(pm.codec_for("audit_log"), "json")
+            self.assertEqual(pm.codec_for("analysis:main.py"), "pickle+zlib:1")
+            self.assertEqual(pm.codec_for("other"), "pickle")
+            await pm.store("audit_log", [{"request_id": "1"}])
+            await pm.store("analysis:main.py", {"imports": ("os",)})
+            await pm.store("raw", b"x" * 10, codec="pickle+zlib")
+            pm.close()
+            reopened = PersistenceManager(StorageConfig(storage_path=self.path, backup_enabled=False))
+            self.assertEqual(await reopened.retrieve("audit_log"), [{"request_id": "1"}])
+            self.assertEqual(await reopened.retrieve("analysis:main.py"), {"imports": ("os",)})
+            self.assertEqual(await reopened.retrieve("raw"), b"x" * 10)
+        asyncio.run(run_test())
+
+    def test_compression_flag_adds_zlib(self):
+        pm = PersistenceManager(storage_path=str(self.path), compression=True)
+        self.assertEqual(pm.codec_for("key"), "pickle+zlib")
+
+    def test_unknown_codec_fails_at_startup(self):
+        with self.assertRaises(ValueError):
+            PersistenceManager(StorageConfig(storage_path=self.path, codecs={"a": "yaml"}))
+
+    def test_reads_legacy_item_files(self):
+        import pickle
+        import zlib
+        from datetime import datetime
+        from uuid import uuid4
+        from cmate.storage.persistence_manager import StorageItem
+        self.path.mkdir(parents=True)
+        item_id = uuid4()
+        item = StorageItem(id=item_id, key="old", data=zlib.compress(pickle.dumps([1, 2])),
+                           created_at=datetime.now(), updated_at=datetime.now(), compressed=True)
+        (self.path / f"item_{item_id}.dat").write_bytes(pickle.dumps(item))
+        (self.path / "index.json").write_text(json.dumps({"old": str(item_id)}))
+        async def run_test():
+            pm = PersistenceManager(StorageConfig(storage_path=self.path, backup_enabled=False))
+            self.assertEqual(await pm.retrieve("old"), [1, 2])
+            await pm.update("old", [3])
+            pm.close()
+            reopened = PersistenceManager(StorageConfig(storage_path=self.path, backup_enabled=False))
+            self.assertEqual(await reopened.retrieve("old"), [3])
+        asyncio.run(run_test())
+
 if __name__ == '__main__':
     unittest.main()
@@ -13,5 +13,10 @@ class TestStateManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.state_manager.update_state(AgentState.CODING, {"user_request": "invalid transition"})
 
+    def test_shutdown_from_idle(self):
+        self.state_manager.update_state(AgentState.CONTEXT_SWITCHING)
+        self.state_manager.update_state(AgentState.SHUTDOWN)
+        self.assertEqual(self.state_manager.current_state, AgentState.SHUTDOWN)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from cmate.file_services.symbol_index import SymbolIndex, tokenize
+
+def analysis(classes=(), functions=(), imports=(), docstrings=()):
+    return SimpleNamespace(code_analysis=SimpleNamespace(
+        classes=list(classes),
+        functions=list(functions),
+        imports=list(imports),
+        metadata={"docstrings": list(docstrings)}
+    ))
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = SymbolIndex(Path(self.tmp.name) / "symbols.json")
+        self.index.add("backend/user_service.py", (1, 1), analysis(
+            classes=["UserService"], functions=["UserService.create_user"], docstrings=["Manage user accounts"]
+        ))
+        self.index.add("backend/billing.py", (1, 1), analysis(
+            classes=["InvoiceBuilder"], imports=["backend.user_service.UserService"]
+        ))
+        self.index.add("frontend/login.html", (1, 1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tokenize_splits_identifiers(self):
+        self.assertEqual(tokenize("HTTPServer parse_user_id to the db2"), ["http", "server", "parse", "user", "id", "db"])
+
+    def test_ranks_by_field_and_frequency(self):
+        results = self.index.search("create a user")
+        self.assertEqual([rel for rel, _ in results], ["backend/user_service.py", "backend/billing.py"])
+        self.assertGreater(results[0][1], results[1][1])
+        self.assertEqual(self.index.search("login page"), [("frontend/login.html", self.index.search("login")[0][1])])
+        self.assertEqual(self.index.search("unrelated words"), [])
+        self.assertEqual(len(self.index.search("user", limit=1)), 1)
+
+    def test_incremental_updates(self):
+        self.index.add("backend/billing.py", (2, 2), analysis(classes=["Invoice"]))
+        self.assertEqual([rel for rel, _ in self.index.search("user")], ["backend/user_service.py"])
+        self.index.remove("backend/user_service.py")
+        self.assertEqual(self.index.search("user"), [])
+        self.assertNotIn("user", self.index.postings)
+
+    def test_stale_loads_persisted_index_and_compares_fingerprints(self):
+        self.index.save()
+        fresh = SymbolIndex(self.index.index_path)
+        self.assertEqual(fresh.stale({"backend/billing.py": (5, 5), "new.py": (1, 1)}), ["backend/billing.py", "new.py"])
+        self.assertEqual(fresh.stale({"backend/user_service.py": (1, 1)}), [])
+        self.assertEqual(fresh.missing(["backend/user_service.py", "backend/billing.py"]), ["frontend/login.html"])
+        self.assertEqual(fresh.search("accounts")[0][0], "backend/user_service.py")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,16 @@
 import unittest
 import asyncio
-from cmate.file_services.workspace_scanner import WorkspaceScanner, ScanResult
+import os
+import tempfile
+from pathlib import Path
+from cmate.file_services.workspace_scanner import WorkspaceScanner, ScanResult, ScanDiff
 
 class TestWorkspaceScanner(unittest.TestCase):
     def setUp(self):
-        self.scanner = WorkspaceScanner("./Workspace")
-    
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.scanner = WorkspaceScanner("./Workspace", index_path=str(Path(self.tmp.name) / "index.json"))
+
     def test_scan_workspace(self):
         async def run_test():
             result = await self.scanner.scan_workspace(max_depth=2)
@@ -13,5 +18,112 @@ class TestWorkspaceScanner(unittest.TestCase):
             self.assertIsInstance(result.files, list)
         asyncio.run(run_test())
 
+class TestScannerOnTempWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name) / "ws"
+        (self.workspace / "pkg").mkdir(parents=True)
+        (self.workspace / "__pycache__").mkdir()
+        (self.workspace / "main.py").write_text("print('hi')\n")
+        (self.workspace / "pkg" / "util.py").write_text("X = 1\n")
+        (self.workspace / "__pycache__" / "main.cpython.pyc").write_bytes(b"\0")
+        self.index_path = str(Path(self.tmp.name) / "index.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scan(self, scanner=None, **kwargs):
+        scanner = scanner or WorkspaceScanner(str(self.workspace), index_path=self.index_path)
+        return asyncio.run(scanner.scan_incremental(**kwargs))
+
+    def test_first_scan_reports_all_files_added(self):
+        diff = self._scan()
+        self.assertIsInstance(diff, ScanDiff)
+        self.assertEqual(sorted(diff.added), [Path("main.py"), Path("pkg/util.py")])
+        self.assertEqual(len(diff.result.files), 2)
+
+    def test_rescan_detects_changes(self):
+        scanner = WorkspaceScanner(str(self.workspace), index_path=self.index_path)
+        first = self._scan(scanner)
+        unchanged = self._scan(scanner)
+        self.assertFalse(unchanged.has_changes)
+        self.assertIs(unchanged.result, first.result)
+
+        (self.workspace / "pkg" / "new.py").write_text("Y = 2\n")
+        util = self.workspace / "pkg" / "util.py"
+        util.write_text("X = 12345\n")
+        os.utime(util, ns=(util.stat().st_atime_ns, util.stat().st_mtime_ns + 10**9))
+        (self.workspace / "main.py").unlink()
+        diff = self._scan(scanner)
+        self.assertEqual(diff.added, [Path("pkg/new.py")])
+        self.assertEqual(diff.modified, [Path("pkg/util.py")])
+        self.assertEqual(diff.removed, [Path("main.py")])
+
+    def test_index_persists_across_instances(self):
+        self._scan()
+        diff = self._scan()
+        self.assertFalse(diff.has_changes)
+        self.assertEqual(len(diff.result.files), 2)
+
+    def test_filters_apply_to_cached_index(self):
+        (self.workspace / "notes.txt").write_text("todo\n")
+        (self.workspace / "pkg" / "sub").mkdir()
+        (self.workspace / "pkg" / "sub" / "deep.py").write_text("Z = 3\n")
+        diff = self._scan(file_types=["py"], max_depth=1)
+        self.assertEqual(sorted(f.path for f in diff.result.files), [Path("main.py"), Path("pkg/util.py")])
+
+    def test_scan_workspace_skips_ignored_entries(self):
+        scanner = WorkspaceScanner(str(self.workspace), index_path=self.index_path, max_workers=2)
+        result = asyncio.run(scanner.scan_workspace())
+        self.assertEqual(sorted(f.path for f in result.files), [Path("main.py"), Path("pkg/util.py")])
+        self.assertEqual(result.file_types, {"py": 2})
+
+    def test_iter_files_streams_many_directories(self):
+        for i in range(20):
+            sub = self.workspace / "many" / f"d{i}"
+            sub.mkdir(parents=True)
+            (sub / "a.py").write_text("")
+            (sub / "b.txt").write_text("")
+        scanner = WorkspaceScanner(str(self.workspace), index_path=self.index_path, max_workers=4)
+        found = list(scanner.iter_files(file_types=["py"]))
+        self.assertEqual(len(found), 22)
+        self.assertTrue(all(f.content_type == "text/x-python" for f in found))
+
+    def test_iter_workspace_streams_then_uses_index(self):
+        scanner = WorkspaceScanner(str(self.workspace), index_path=self.index_path)
+
+        async def collect():
+            batches = [batch async for batch in scanner.iter_workspace(batch_size=1)]
+            if scanner._index_warmup is not None:
+                await scanner._index_warmup
+            return batches
+
+        cold = asyncio.run(collect())
+        self.assertEqual(sorted(f.path for batch in cold for f in batch), [Path("main.py"), Path("pkg/util.py")])
+        self.assertTrue(all(len(batch) == 1 for batch in cold))
+        self.assertTrue(scanner.index.is_warm(scanner._ignore_signature()))
+
+        warm = asyncio.run(collect())
+        self.assertEqual(sorted(f.path for batch in warm for f in batch), [Path("main.py"), Path("pkg/util.py")])
+
+    def test_iter_workspace_can_stop_early(self):
+        for i in range(50):
+            (self.workspace / f"dir{i}").mkdir()
+            (self.workspace / f"dir{i}" / "x.py").write_text("")
+        scanner = WorkspaceScanner(str(self.workspace), index_path=self.index_path, max_workers=2)
+
+        async def first_batch():
+            async for batch in scanner.iter_workspace(batch_size=1):
+                return batch
+
+        self.assertEqual(len(asyncio.run(first_batch())), 1)
+        self.assertIsNone(scanner._index_warmup)
+
+    def test_scan_history_is_bounded(self):
+        scanner = WorkspaceScanner(str(self.workspace), index_path=self.index_path, history_limit=2)
+        for _ in range(4):
+            asyncio.run(scanner.scan_workspace())
+        self.assertEqual(len(scanner.scan_history), 2)
+
 if __name__ == '__main__':
     unittest.main()